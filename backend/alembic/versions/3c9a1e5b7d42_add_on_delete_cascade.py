@@ -0,0 +1,49 @@
+"""add on delete cascade to foreign keys
+
+Revision ID: 3c9a1e5b7d42
+Revises: 0f4670d615b9
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1e5b7d42'
+down_revision: Union[str, None] = '0f4670d615b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (テーブル, カラム, 参照先テーブル)。制約名は PostgreSQL の既定命名 <table>_<column>_fkey
+# 初期マイグレーションの外部キーには名前がないため、SQLite（テーブルを作り直す batch
+# モード）では命名規約で同じ名前を付けてから削除する
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+FOREIGN_KEYS = [
+    ('stages', 'event_id', 'events'),
+    ('seat_groups', 'stage_id', 'stages'),
+    ('ticket_types', 'seat_group_id', 'seat_groups'),
+    ('reservations', 'ticket_type_id', 'ticket_types'),
+    ('reservations', 'user_id', 'users'),
+]
+
+
+def _recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    for table, column, referent in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(
+                name, referent, [column], ['id'], ondelete=ondelete
+            )
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
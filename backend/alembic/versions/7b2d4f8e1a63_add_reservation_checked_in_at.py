@@ -0,0 +1,26 @@
+"""add reservations.checked_in_at
+
+Revision ID: 7b2d4f8e1a63
+Revises: 3c9a1e5b7d42
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d4f8e1a63'
+down_revision: Union[str, None] = '3c9a1e5b7d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservations', sa.Column('checked_in_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reservations', 'checked_in_at')
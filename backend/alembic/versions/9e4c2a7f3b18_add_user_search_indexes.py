@@ -0,0 +1,45 @@
+"""add user search indexes
+
+Revision ID: 9e4c2a7f3b18
+Revises: 7b2d4f8e1a63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4c2a7f3b18'
+down_revision: Union[str, None] = '7b2d4f8e1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_INDEXES = {
+    'ix_users_email_search': 'email',
+    'ix_users_nickname_search': 'nickname',
+}
+
+
+def upgrade() -> None:
+    # PostgreSQL だけ、部分一致 (LIKE '%q%') に効く pg_trgm の GIN インデックスを作る
+    # SQLite には部分一致や前方一致優先の並べ替えに使えるインデックスがないため作らない
+    # （検索は全件走査になる。開発・テスト用の規模では問題にならない）
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in SEARCH_INDEXES.items():
+        op.create_index(
+            name,
+            'users',
+            [sa.text(f'lower({column}) gin_trgm_ops')],
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    # 以前の版で SQLite に作った lower() のインデックスも消せるよう、方言を問わず消す
+    for name in SEARCH_INDEXES:
+        op.drop_index(name, table_name='users', if_exists=True)
@@ -0,0 +1,35 @@
+"""add reservation query indexes
+
+Revision ID: c5f1d8a2e946
+Revises: 9e4c2a7f3b18
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1d8a2e946'
+down_revision: Union[str, None] = '9e4c2a7f3b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_seat_groups_stage_id', 'seat_groups', ['stage_id'])
+    op.create_index('ix_reservations_created_at_id', 'reservations', ['created_at', 'id'])
+    op.create_index(
+        'ix_reservations_ticket_type_id_created_at', 'reservations', ['ticket_type_id', 'created_at']
+    )
+    op.create_index(
+        'ix_reservations_user_id_created_at', 'reservations', ['user_id', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_user_id_created_at', table_name='reservations')
+    op.drop_index('ix_reservations_ticket_type_id_created_at', table_name='reservations')
+    op.drop_index('ix_reservations_created_at_id', table_name='reservations')
+    op.drop_index('ix_seat_groups_stage_id', table_name='seat_groups')
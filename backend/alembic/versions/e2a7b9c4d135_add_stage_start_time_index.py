@@ -0,0 +1,25 @@
+"""add stages.start_time index
+
+Revision ID: e2a7b9c4d135
+Revises: c5f1d8a2e946
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7b9c4d135'
+down_revision: Union[str, None] = 'c5f1d8a2e946'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stages_start_time', 'stages', ['start_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stages_start_time', table_name='stages')
@@ -0,0 +1,194 @@
+# backend/availability.py
+"""座席残数のリアルタイム配信ブローカーと残席サマリーキャッシュ。
+
+残席数を変更するルートは commit 後に notify_capacity_change() を呼ぶ。
+更新はステージ単位で COALESCE_INTERVAL 秒ごとにまとめてから、そのステージを
+購読している全接続（SSE）へ配信する。購読者は asyncio ループ上の軽量な
+オブジェクトで、DB セッションは保持しない。
+同じフックで残席サマリーのキャッシュも無効化する。
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any
+
+# ステージ単位で更新をまとめる間隔（秒）
+COALESCE_INTERVAL = 0.2
+# 更新が無いときに送るキープアライブの間隔（秒）
+KEEPALIVE_INTERVAL = 15.0
+# 残席サマリーをキャッシュする時間（秒）
+SUMMARY_CACHE_TTL = 2.0
+
+
+class Subscription:
+    """1 接続分の購読。未送信の更新を seat_group_id 単位で保持する。"""
+
+    def __init__(self, stage_id: int):
+        self.stage_id = stage_id
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._event = asyncio.Event()
+
+    def push(self, updates: dict[int, dict[str, Any]]) -> None:
+        # 読み出し前に届いた更新は同じ SeatGroup なら最新値で上書きする
+        self._pending.update(updates)
+        self._event.set()
+
+    async def next(self, timeout: float) -> list[dict[str, Any]] | None:
+        """次の更新をまとめて返す。timeout 秒以内に更新が無ければ None。"""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except TimeoutError:
+                return None
+        self._event.clear()
+        updates, self._pending = self._pending, {}
+        return [updates[key] for key in sorted(updates)]
+
+
+class AvailabilityBroadcaster:
+    """残席数の変更をステージ単位でまとめて購読者へ配信する。
+
+    publish() はどのスレッドからでも呼べる（同期ルートはスレッドプールで動く）。
+    購読・配信は start() で渡されたイベントループ上でのみ行う。
+    """
+
+    def __init__(self, interval: float = COALESCE_INTERVAL):
+        self._interval = interval
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._pending: dict[int, dict[int, dict[str, Any]]] = {}
+        self._flush_scheduled = False
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self._loop = loop or asyncio.get_running_loop()
+
+    def stop(self) -> None:
+        self._loop = None
+        with self._lock:
+            self._pending.clear()
+            self._flush_scheduled = False
+        self._subscribers.clear()
+
+    def subscribe(self, stage_id: int) -> Subscription:
+        subscription = Subscription(stage_id)
+        self._subscribers.setdefault(stage_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.stage_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.stage_id]
+
+    def subscriber_count(self, stage_id: int | None = None) -> int:
+        if stage_id is not None:
+            return len(self._subscribers.get(stage_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(
+        self,
+        stage_id: int,
+        seat_group_id: int,
+        capacity: int,
+        total_capacity: int | None,
+    ) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        with self._lock:
+            self._pending.setdefault(stage_id, {})[seat_group_id] = {
+                "id": seat_group_id,
+                "capacity": capacity,
+                "total_capacity": total_capacity,
+            }
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            loop.call_soon_threadsafe(loop.call_later, self._interval, self._flush)
+        except RuntimeError:
+            # ループ終了後の publish は捨てる
+            with self._lock:
+                self._flush_scheduled = False
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        for stage_id, updates in pending.items():
+            for subscription in self._subscribers.get(stage_id, ()):
+                subscription.push(updates)
+
+
+class AvailabilityCache:
+    """イベント単位の残席サマリーを短時間だけ保持するプロセス内キャッシュ。
+
+    無効化は同一プロセス内でのみ伝わるため、他ワーカーでの変更は TTL で吸収する。
+    """
+
+    def __init__(self, ttl: float = SUMMARY_CACHE_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[float, Any]] = {}
+        self._stage_events: dict[int, int] = {}
+
+    def get_many(self, event_ids: list[int]) -> tuple[dict[int, Any], list[int]]:
+        """キャッシュ済みの値と、取得が必要なイベントIDを返す。"""
+        now = time.monotonic()
+        hits: dict[int, Any] = {}
+        misses: list[int] = []
+        with self._lock:
+            for event_id in event_ids:
+                entry = self._entries.get(event_id)
+                if entry is not None and entry[0] > now:
+                    hits[event_id] = entry[1]
+                else:
+                    misses.append(event_id)
+        return hits, misses
+
+    def put(self, event_id: int, stage_ids: list[int], value: Any) -> None:
+        with self._lock:
+            self._entries[event_id] = (time.monotonic() + self._ttl, value)
+            for stage_id in stage_ids:
+                self._stage_events[stage_id] = event_id
+
+    def invalidate_event(self, event_id: int) -> None:
+        with self._lock:
+            self._entries.pop(event_id, None)
+
+    def invalidate_stage(self, stage_id: int) -> None:
+        with self._lock:
+            event_id = self._stage_events.pop(stage_id, None)
+            if event_id is not None:
+                self._entries.pop(event_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stage_events.clear()
+
+
+availability_broadcaster = AvailabilityBroadcaster()
+availability_cache = AvailabilityCache()
+
+
+# 残席数が変わった SeatGroup を配信キューに積み、サマリーを無効化する（commit 後に呼ぶこと）
+def notify_capacity_change(*seat_groups: Any) -> None:
+    for seat_group in seat_groups:
+        availability_cache.invalidate_stage(seat_group.stage_id)
+        availability_broadcaster.publish(
+            seat_group.stage_id,
+            seat_group.id,
+            seat_group.capacity,
+            seat_group.total_capacity,
+        )
+
+
+# SSE のイベント文字列を組み立てる
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,134 @@
+# backend/benchmarks/bench_event_delete.py
+"""大規模イベント削除のベンチマーク。
+
+1 イベントにステージ・シートグループ・チケットタイプ・予約を大量に投入し、
+CrudEvent.delete（DELETE /events/{id} と同じ経路）の所要時間とメモリを測る。
+
+    cd backend
+    uv run python -m benchmarks.bench_event_delete --reservations 50000
+
+--database-url を省略すると一時ディレクトリの SQLite を使う。
+指定したデータベースのテーブルは作り直されるので本番 DB には向けないこと。
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import config  # noqa: E402,F401  SQLite の外部キー有効化リスナーを登録する
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from crud.event import CrudEvent  # noqa: E402
+from models import Base, Event, Stage, SeatGroup, TicketType, Reservation, User  # noqa: E402
+
+
+def seed(db: Session, args: argparse.Namespace) -> int:
+    """ベンチマーク用のイベントを一括投入し、イベントIDを返す。"""
+    event_id = db.scalars(
+        insert(Event).returning(Event.id), [{"name": "bench", "description": "bench"}]
+    ).one()
+    base = datetime(2030, 1, 1, 10, 0)
+    stage_ids = db.scalars(
+        insert(Stage).returning(Stage.id, sort_by_parameter_order=True),
+        [
+            {
+                "event_id": event_id,
+                "start_time": base + timedelta(hours=i),
+                "end_time": base + timedelta(hours=i, minutes=90),
+            }
+            for i in range(args.stages)
+        ],
+    ).all()
+    seat_group_ids = db.scalars(
+        insert(SeatGroup).returning(SeatGroup.id, sort_by_parameter_order=True),
+        [
+            {"stage_id": stage_id, "name": f"G{i}", "capacity": 0, "total_capacity": 0}
+            for stage_id in stage_ids
+            for i in range(args.seat_groups)
+        ],
+    ).all()
+    ticket_type_ids = db.scalars(
+        insert(TicketType).returning(TicketType.id, sort_by_parameter_order=True),
+        [
+            {"seat_group_id": seat_group_id, "type_name": f"T{i}", "price": 1000 + i}
+            for seat_group_id in seat_group_ids
+            for i in range(args.ticket_types)
+        ],
+    ).all()
+    user_ids = db.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {
+                "email": f"bench{i}@example.com",
+                "password_hash": "x",
+                "nickname": f"bench{i}",
+                "is_admin": False,
+            }
+            for i in range(args.users)
+        ],
+    ).all()
+    now = datetime(2029, 12, 1)
+    for start in range(0, args.reservations, 10_000):
+        db.execute(
+            insert(Reservation),
+            [
+                {
+                    "ticket_type_id": ticket_type_ids[i % len(ticket_type_ids)],
+                    "user_id": user_ids[i % len(user_ids)],
+                    "num_attendees": 1 + i % 4,
+                    "is_paid": i % 2 == 0,
+                    "created_at": now,
+                }
+                for i in range(start, min(start + 10_000, args.reservations))
+            ],
+        )
+    db.commit()
+    return event_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--stages", type=int, default=20)
+    parser.add_argument("--seat-groups", type=int, default=5)
+    parser.add_argument("--ticket-types", type=int, default=3)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--reservations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = args.database_url or f"sqlite:///{tmpdir}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as db:
+            started = time.perf_counter()
+            event_id = seed(db, args)
+            print(f"seed: {time.perf_counter() - started:.2f}s")
+
+        with Session(engine) as db:
+            tracemalloc.start()
+            started = time.perf_counter()
+            CrudEvent(db).delete(event_id)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            remaining = db.scalar(select(func.count()).select_from(Reservation))
+
+        print(
+            f"delete event: {elapsed * 1000:.1f}ms, "
+            f"peak python memory {peak / 1024:.0f}KiB, "
+            f"reservations left {remaining}"
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
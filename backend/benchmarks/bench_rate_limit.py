@@ -0,0 +1,60 @@
+# backend/benchmarks/bench_rate_limit.py
+"""レート制限の判定 1 回あたりの所要時間のベンチマーク。
+
+キーの決定（トークンの検証済みキャッシュを含む）とストアでの判定を、
+メモリと SQLite のストアそれぞれで測る。1 プロセスで測るため、SQLite のファイルを
+複数のワーカーで共有したときのロック待ちは含まない。
+
+    cd backend
+    uv run python -m benchmarks.bench_rate_limit --requests 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from starlette.requests import Request  # noqa: E402
+
+from rate_limit import MemoryStore, RateLimiter, SqliteStore  # noqa: E402
+from routes.auth import create_access_token  # noqa: E402
+
+
+def make_request(access_token: str | None, host: str) -> Request:
+    headers = []
+    if access_token is not None:
+        headers.append((b"cookie", f'access_token="Bearer {access_token}"'.encode()))
+    return Request(
+        {"type": "http", "method": "GET", "path": "/events", "headers": headers, "client": (host, 0)}
+    )
+
+
+def run(name: str, limiter: RateLimiter, requests: list[Request]) -> None:
+    started = time.perf_counter()
+    for request in requests:
+        limiter.check(limiter.key(request), limiter.cost(request.method, "/events"))
+    elapsed = time.perf_counter() - started
+    print(f"{name}: {elapsed / len(requests) * 1e6:.1f}µs per decision")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": str(i + 1)}) for i in range(args.users)]
+    requests = [
+        make_request(tokens[i % args.users] if i % 2 else None, f"10.0.{i % 250}.{i % 200}")
+        for i in range(args.requests)
+    ]
+    # 予算で弾かれても判定のコストは同じなので、上限は十分大きくしておく
+    run("memory", RateLimiter(MemoryStore(), per_minute=10**9), requests)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run("sqlite", RateLimiter(SqliteStore(f"{tmpdir}/rate_limit.sqlite3"), per_minute=10**9), requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# backend/benchmarks/bench_reconciliation.py
+"""振込照合エンジンのベンチマーク。
+
+未払い予約と振込明細を乱数で生成し、reconcile() の所要時間を測る（DB は使わない）。
+
+    cd backend
+    uv run python -m benchmarks.bench_reconciliation --lines 5000 --reservations 50000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from reconciliation import OpenReservation, StatementLine, reconcile  # noqa: E402
+
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+PRICES = [1000, 1500, 2000, 3000, 3500, 5000]
+
+
+def random_name(rng: random.Random) -> str:
+    return "".join(rng.choice(KANA) for _ in range(rng.randint(3, 8)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--reservations", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [random_name(rng) for _ in range(args.users)]
+    reservations = [
+        OpenReservation(
+            reservation_id=i + 1,
+            user_id=(user_id := rng.randrange(args.users)),
+            nickname=names[user_id],
+            amount=rng.choice(PRICES) * rng.randint(1, 4),
+            created_at=datetime(2025, 5, 1),
+        )
+        for i in range(args.reservations)
+    ]
+    lines = []
+    for i in range(args.lines):
+        # 半数は実在する予約への振込、残りは無関係な振込
+        if i % 2 == 0:
+            target = rng.choice(reservations)
+            amount, payer_name = target.amount, target.nickname
+        else:
+            amount, payer_name = rng.choice(PRICES) * rng.randint(1, 4), random_name(rng)
+        lines.append(
+            StatementLine(line=i + 2, amount=amount, payer_name=payer_name, date=date(2025, 5, 10))
+        )
+
+    started = time.perf_counter()
+    results = reconcile(lines, reservations)
+    elapsed = time.perf_counter() - started
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(f"reconcile: {elapsed:.3f}s for {args.lines} lines / {args.reservations} reservations")
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# backend/benchmarks/calibrate_argon2.py
+"""argon2id パラメータの較正ツール。
+
+この環境でハッシュ化の所要時間を測り、1 回のハッシュ化が --target-ms 以内に
+収まる範囲で最も強いパラメータ（メモリを優先し、残りを反復回数に回す）を推奨する。
+
+    cd backend
+    uv run python -m benchmarks.calibrate_argon2 --target-ms 250 --max-memory-mib 64
+
+出力された ARGON2_* を環境変数（.env）に設定すると、既存ユーザーのハッシュは
+ログイン成功時に順次新しいパラメータへ移行する。
+"""
+import argparse
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from argon2 import PasswordHasher  # noqa: E402
+
+import config  # noqa: E402
+
+# OWASP の推奨最小値（m=19MiB, t=2）を下回るパラメータは推奨しない
+MIN_MEMORY_KIB = 19 * 1024
+MIN_TIME_COST = 2
+
+Measure = Callable[[int, int, int], float]
+
+
+def measure_hash(time_cost: int, memory_cost: int, parallelism: int, rounds: int = 5) -> float:
+    """指定パラメータでのハッシュ化の所要時間の中央値（ミリ秒）を返す。"""
+    hasher = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def recommend(
+    target_ms: float, max_memory_kib: int, parallelism: int, measure: Measure = measure_hash
+) -> tuple[int, int, float]:
+    """target_ms 以内に収まる (time_cost, memory_cost, 所要時間ms) を返す。
+
+    メモリは max_memory_kib から半分ずつ下げて time_cost=MIN_TIME_COST で収まる値を探し、
+    残った時間で time_cost を増やす。最小値でも収まらない場合は最小値を返す。
+    """
+    memory_cost = max_memory_kib
+    elapsed = measure(MIN_TIME_COST, memory_cost, parallelism)
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        elapsed = measure(MIN_TIME_COST, memory_cost, parallelism)
+    time_cost = MIN_TIME_COST
+    if elapsed > target_ms:
+        return time_cost, memory_cost, elapsed
+    # 所要時間は time_cost にほぼ比例するため、見積もってから実測で確かめる
+    per_pass = elapsed / MIN_TIME_COST
+    candidate = max(MIN_TIME_COST, int(target_ms // per_pass))
+    while candidate > time_cost:
+        candidate_elapsed = measure(candidate, memory_cost, parallelism)
+        if candidate_elapsed <= target_ms:
+            return candidate, memory_cost, candidate_elapsed
+        candidate -= 1
+    return time_cost, memory_cost, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--parallelism", type=int, default=config.ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    current = measure_hash(
+        config.ARGON2_TIME_COST, config.ARGON2_MEMORY_COST, config.ARGON2_PARALLELISM
+    )
+    print(
+        f"current: t={config.ARGON2_TIME_COST} m={config.ARGON2_MEMORY_COST}KiB "
+        f"p={config.ARGON2_PARALLELISM} -> {current:.1f}ms"
+    )
+    time_cost, memory_cost, elapsed = recommend(
+        args.target_ms, args.max_memory_mib * 1024, args.parallelism
+    )
+    if elapsed > args.target_ms:
+        print(f"warning: minimum parameters take {elapsed:.1f}ms (> {args.target_ms}ms)")
+    print(f"recommended: t={time_cost} m={memory_cost}KiB p={args.parallelism} -> {elapsed:.1f}ms")
+    # 同時にハッシュ化できる数はワーカー数まで。1 ワーカーあたり memory_cost のメモリを使う
+    print(
+        f"peak memory with PASSWORD_HASH_WORKERS={config.PASSWORD_HASH_WORKERS}: "
+        f"{memory_cost * config.PASSWORD_HASH_WORKERS // 1024}MiB"
+    )
+    print()
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
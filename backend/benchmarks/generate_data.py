@@ -0,0 +1,310 @@
+# backend/benchmarks/generate_data.py
+"""ベンチマーク・ステージング用の合成データ生成。
+
+イベント・ステージ・シートグループ・チケットタイプ・ユーザー・予約を指定した件数だけ
+Core の一括 INSERT で投入する。人気はイベントごとに偏らせ（Zipf 分布）、人数や
+支払・入場の状態も実際に近い割合にする。シートグループの残席数は投入した予約の
+人数と整合させる（capacity = total_capacity - 予約人数の合計）。
+パスワードハッシュは全ユーザーで同じものを 1 回だけ計算して使う。
+
+    cd backend
+    uv run python -m benchmarks.generate_data --database-url sqlite:///synthetic.db \\
+        --create-tables --events 200 --users 100000 --reservations 1000000
+
+--database-url を省略すると環境変数 DATABASE_URL を使う。既存のデータは消さずに追記する。
+"""
+import argparse
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///synthetic.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import config  # noqa: E402,F401  SQLite の外部キー有効化リスナーを登録する
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from models import Base, Event, Stage, SeatGroup, TicketType, Reservation, User  # noqa: E402
+from security import hash_password  # noqa: E402
+
+BATCH_SIZE = 10_000
+SEAT_GROUP_NAMES = ["S席", "A席", "B席", "C席", "立見"]
+TICKET_TYPE_NAMES = ["一般", "学生", "シニア", "子供", "招待"]
+# 1 予約あたりの人数とその割合
+ATTENDEES = [1, 2, 3, 4, 5, 6]
+ATTENDEE_WEIGHTS = [45, 30, 10, 8, 4, 3]
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+
+@dataclass
+class Volumes:
+    events: int = 100
+    stages_per_event: int = 3
+    seat_groups_per_stage: int = 3
+    ticket_types_per_seat_group: int = 2
+    users: int = 10_000
+    reservations: int = 100_000
+
+
+def _zipf_weights(rng: random.Random, n: int, s: float = 1.0) -> list[float]:
+    # 順位をシャッフルした Zipf 分布の重み（ID 順に人気が並ばないようにする）
+    weights = [1 / (rank + 1) ** s for rank in range(n)]
+    rng.shuffle(weights)
+    return weights
+
+
+def _ticket_type_name(type_rank: int) -> str:
+    # 同じシートグループ内で一意にするため、名前が一巡したら番号を付ける（一般2, 学生2, ...）
+    n = len(TICKET_TYPE_NAMES)
+    name = TICKET_TYPE_NAMES[type_rank % n]
+    return name if type_rank < n else f"{name}{type_rank // n + 1}"
+
+
+def _insert_returning_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    ids: list[int] = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        ids.extend(
+            db.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                rows[start : start + BATCH_SIZE],
+            ).all()
+        )
+    return ids
+
+
+def generate(
+    db: Session,
+    volumes: Volumes,
+    password_hash: str,
+    seed: int = 0,
+    now: datetime | None = None,
+) -> dict[str, float]:
+    """合成データを投入してコミットし、テーブルごとの所要時間（秒）を返す。"""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    timings: dict[str, float] = {}
+
+    # --- 予約の割り当てを先にメモリ上で決め、シートグループの残席数を確定させる ---
+    started = time.perf_counter()
+    event_weights = _zipf_weights(rng, volumes.events)
+    event_starts = [
+        now + timedelta(days=rng.randint(-180, 365), hours=rng.choice([10, 13, 18]) - now.hour)
+        for _ in range(volumes.events)
+    ]
+    # ステージ: (イベントの添字, 開始日時)
+    stages = [
+        (event_index, event_starts[event_index] + timedelta(days=day))
+        for event_index in range(volumes.events)
+        for day in range(volumes.stages_per_event)
+    ]
+    # シートグループ: ステージの添字。席のランクが高いほど売れやすく高い
+    seat_groups = [
+        stage_index
+        for stage_index in range(len(stages))
+        for _ in range(volumes.seat_groups_per_stage)
+    ]
+    # チケットタイプ: (シートグループの添字, 種別の順位, 価格, 重み)
+    ticket_types = []
+    for seat_group_index, stage_index in enumerate(seat_groups):
+        rank = seat_group_index % volumes.seat_groups_per_stage
+        base_price = 8000 - 1500 * rank
+        seat_group_weight = (
+            event_weights[stages[stage_index][0]] * rng.uniform(0.5, 1.5) / (rank + 1)
+        )
+        for type_rank in range(volumes.ticket_types_per_seat_group):
+            ticket_types.append(
+                (
+                    seat_group_index,
+                    type_rank,
+                    max(500, base_price - 1000 * type_rank),
+                    # 一般券が大半を占める
+                    seat_group_weight * (0.7 if type_rank == 0 else 0.3 / type_rank),
+                )
+            )
+
+    ticket_type_choices = (
+        rng.choices(
+            range(len(ticket_types)),
+            cum_weights=list(accumulate(tt[3] for tt in ticket_types)),
+            k=volumes.reservations,
+        )
+        if ticket_types
+        else []
+    )
+    # 予約の多いユーザーと少ないユーザーがいるよう、ユーザーも偏らせる
+    user_choices = rng.choices(
+        range(volumes.users),
+        cum_weights=list(accumulate(_zipf_weights(rng, volumes.users, 0.5))),
+        k=volumes.reservations if volumes.users else 0,
+    )
+    attendees = rng.choices(ATTENDEES, weights=ATTENDEE_WEIGHTS, k=volumes.reservations)
+    reserved = [0] * len(seat_groups)
+    for ticket_type_index, num_attendees in zip(ticket_type_choices, attendees):
+        reserved[ticket_types[ticket_type_index][0]] += num_attendees
+    timings["plan"] = time.perf_counter() - started
+
+    # --- 投入 ---
+    started = time.perf_counter()
+    event_ids = _insert_returning_ids(
+        db,
+        Event,
+        [
+            {"name": f"合成イベント {i + 1}", "description": "合成データ"}
+            for i in range(volumes.events)
+        ],
+    )
+    stage_ids = _insert_returning_ids(
+        db,
+        Stage,
+        [
+            {
+                "event_id": event_ids[event_index],
+                "start_time": start_time,
+                "end_time": start_time + timedelta(hours=2),
+            }
+            for event_index, start_time in stages
+        ],
+    )
+    seat_group_rows = []
+    for seat_group_index, stage_index in enumerate(seat_groups):
+        rank = seat_group_index % volumes.seat_groups_per_stage
+        # 2 割は完売、それ以外は予約人数に 0〜50% の空きを足した定員にする
+        spare = 0 if rng.random() < 0.2 else rng.randint(0, max(10, reserved[seat_group_index] // 2))
+        total_capacity = reserved[seat_group_index] + spare
+        seat_group_rows.append(
+            {
+                "stage_id": stage_ids[stage_index],
+                "name": SEAT_GROUP_NAMES[rank % len(SEAT_GROUP_NAMES)],
+                "capacity": spare,
+                "total_capacity": total_capacity,
+            }
+        )
+    seat_group_ids = _insert_returning_ids(db, SeatGroup, seat_group_rows)
+    ticket_type_ids = _insert_returning_ids(
+        db,
+        TicketType,
+        [
+            {
+                "seat_group_id": seat_group_ids[seat_group_index],
+                "type_name": _ticket_type_name(type_rank),
+                "price": price,
+            }
+            for seat_group_index, type_rank, price, _ in ticket_types
+        ],
+    )
+    timings["events"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    first_user = (db.scalar(select(func.max(User.id))) or 0) + 1
+    user_ids = _insert_returning_ids(
+        db,
+        User,
+        [
+            {
+                "email": f"user{first_user + i}@synthetic.example.com",
+                "password_hash": password_hash,
+                "nickname": "".join(rng.choice(KANA) for _ in range(rng.randint(2, 6))),
+                "is_admin": False,
+            }
+            for i in range(volumes.users)
+        ],
+    )
+    timings["users"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    # ORM の一括 INSERT は NULL を含む列の有無で文を分けるため、Core の executemany で入れる
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        # ランダムな順序で伸びる索引のページが追い出されないよう、キャッシュを 256MiB に広げる
+        connection.exec_driver_sql("PRAGMA cache_size = -262144")
+    reservation_table = Reservation.__table__
+    booking_window = timedelta(days=90).total_seconds()
+    random_ = rng.random
+    for start in range(0, volumes.reservations, BATCH_SIZE):
+        rows = []
+        for i in range(start, min(start + BATCH_SIZE, volumes.reservations)):
+            ticket_type_index = ticket_type_choices[i]
+            stage_start = stages[seat_groups[ticket_types[ticket_type_index][0]]][1]
+            past = stage_start < now
+            # 予約は開始日時（未来のステージなら現在）までの 90 日間に分布させる
+            created_at = min(stage_start, now) - timedelta(seconds=random_() * booking_window)
+            is_paid = random_() < (0.95 if past else 0.6)
+            checked_in_at = (
+                stage_start - timedelta(seconds=random_() * 1800)
+                if past and is_paid and random_() < 0.9
+                else None
+            )
+            rows.append(
+                {
+                    "ticket_type_id": ticket_type_ids[ticket_type_index],
+                    "user_id": user_ids[user_choices[i]],
+                    "num_attendees": attendees[i],
+                    "is_paid": is_paid,
+                    "created_at": created_at,
+                    "checked_in_at": checked_in_at,
+                }
+            )
+        connection.execute(insert(reservation_table), rows)
+    db.commit()
+    timings["reservations"] = time.perf_counter() - started
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ["DATABASE_URL"])
+    parser.add_argument("--create-tables", action="store_true", help="テーブルがなければ作成する")
+    parser.add_argument("--events", type=int, default=Volumes.events)
+    parser.add_argument("--stages-per-event", type=int, default=Volumes.stages_per_event)
+    parser.add_argument("--seat-groups-per-stage", type=int, default=Volumes.seat_groups_per_stage)
+    parser.add_argument(
+        "--ticket-types-per-seat-group", type=int, default=Volumes.ticket_types_per_seat_group
+    )
+    parser.add_argument("--users", type=int, default=Volumes.users)
+    parser.add_argument("--reservations", type=int, default=Volumes.reservations)
+    parser.add_argument("--password", default="userpassword", help="全ユーザー共通のパスワード")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    # 予約はチケットタイプとユーザーに割り当てるため、上位の階層がすべて 1 件以上必要
+    if args.reservations:
+        missing = [
+            option
+            for option, value in (
+                ("--events", args.events),
+                ("--stages-per-event", args.stages_per_event),
+                ("--seat-groups-per-stage", args.seat_groups_per_stage),
+                ("--ticket-types-per-seat-group", args.ticket_types_per_seat_group),
+                ("--users", args.users),
+            )
+            if value < 1
+        ]
+        if missing:
+            parser.error(f"--reservations requires {', '.join(missing)} to be at least 1")
+
+    volumes = Volumes(
+        events=args.events,
+        stages_per_event=args.stages_per_event,
+        seat_groups_per_stage=args.seat_groups_per_stage,
+        ticket_types_per_seat_group=args.ticket_types_per_seat_group,
+        users=args.users,
+        reservations=args.reservations,
+    )
+    engine = create_engine(args.database_url)
+    if args.create_tables:
+        Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        timings = generate(db, volumes, hash_password(args.password), seed=args.seed)
+    elapsed = time.perf_counter() - started
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds:.2f}s")
+    print(f"total: {elapsed:.2f}s ({args.reservations / elapsed:,.0f} reservations/s)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# backend/checkin.py
+"""チェックイン用トークンの発行・検証と、オフライン用マニフェストの符号化。
+
+トークンは "<reservation_id>.<署名>" 形式の短い文字列で、QR コードにそのまま載せる。
+署名は SECRET_KEY から導出した鍵による HMAC-SHA256 の先頭 12 バイトを base64url で
+表したもので、検証に DB アクセスは要らない。
+
+マニフェストは入場端末がオフラインで照合するためのバイナリで、全て little-endian:
+
+    ヘッダー (16 バイト)
+        magic       4s   b"KKCM"
+        version     B    MANIFEST_VERSION
+        flags       B    予約 (0)
+        reserved    H    0
+        stage_id    I
+        count       I    予約数 n
+    reservation_ids  n × uint32  昇順（二分探索用）
+    num_attendees    n × uint16
+    status           n × uint8   bit0: 支払済み / bit1: チェックイン済み
+"""
+import base64
+import hashlib
+import hmac
+import struct
+import sys
+from array import array
+from collections.abc import Iterable
+
+from config import SECRET_KEY
+
+_KEY = hmac.new(SECRET_KEY.encode("utf-8"), b"kakuho-checkin-token", hashlib.sha256).digest()
+_SIGNATURE_BYTES = 12
+
+
+def _sign(reservation_id: int) -> str:
+    digest = hmac.new(_KEY, str(reservation_id).encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:_SIGNATURE_BYTES]).decode("ascii")
+
+
+def create_checkin_token(reservation_id: int) -> str:
+    """予約IDに対するチェックイントークンを返す。"""
+    return f"{reservation_id}.{_sign(reservation_id)}"
+
+
+def verify_checkin_token(token: str) -> int | None:
+    """署名が正しければ予約IDを、そうでなければ None を返す。"""
+    reservation_part, _, signature = token.partition(".")
+    if not (reservation_part.isascii() and reservation_part.isdigit()):
+        return None
+    if len(reservation_part) > 18 or reservation_part != str(int(reservation_part)):
+        return None
+    reservation_id = int(reservation_part)
+    if not signature.isascii() or not hmac.compare_digest(signature, _sign(reservation_id)):
+        return None
+    return reservation_id
+
+
+MANIFEST_MAGIC = b"KKCM"
+MANIFEST_VERSION = 1
+_MANIFEST_HEADER = struct.Struct("<4sBBHII")
+STATUS_PAID = 0x01
+STATUS_CHECKED_IN = 0x02
+
+
+def encode_manifest(
+    stage_id: int, rows: Iterable[tuple[int, int, bool, bool]]
+) -> bytes:
+    """(reservation_id, num_attendees, is_paid, checked_in) の行をマニフェストに符号化する。
+
+    rows は reservation_id の昇順で渡すこと。
+    """
+    reservation_ids = array("I")
+    num_attendees = array("H")
+    status = array("B")
+    for reservation_id, attendees, is_paid, checked_in in rows:
+        reservation_ids.append(reservation_id)
+        num_attendees.append(min(attendees, 0xFFFF))
+        status.append((STATUS_PAID if is_paid else 0) | (STATUS_CHECKED_IN if checked_in else 0))
+    header = _MANIFEST_HEADER.pack(
+        MANIFEST_MAGIC, MANIFEST_VERSION, 0, 0, stage_id, len(reservation_ids)
+    )
+    # array は実行環境のバイト順で書き出すため、big-endian 環境では反転する
+    if sys.byteorder == "big":
+        reservation_ids.byteswap()
+        num_attendees.byteswap()
+    return header + reservation_ids.tobytes() + num_attendees.tobytes() + status.tobytes()
+
+
+def decode_manifest(data: bytes) -> tuple[int, list[tuple[int, int, int]]]:
+    """マニフェストを (stage_id, [(reservation_id, num_attendees, status), ...]) に戻す。"""
+    magic, version, _, _, stage_id, count = _MANIFEST_HEADER.unpack_from(data)
+    if magic != MANIFEST_MAGIC or version != MANIFEST_VERSION:
+        raise ValueError("Unsupported manifest")
+    offset = _MANIFEST_HEADER.size
+    reservation_ids = struct.unpack_from(f"<{count}I", data, offset)
+    offset += 4 * count
+    num_attendees = struct.unpack_from(f"<{count}H", data, offset)
+    offset += 2 * count
+    status = struct.unpack_from(f"<{count}B", data, offset)
+    return stage_id, list(zip(reservation_ids, num_attendees, status))
@@ -1,7 +1,13 @@
 # backend/config.py
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pydantic_settings import BaseSettings
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from pool_metrics import MeteredQueuePool, pool_metrics
 
 
 class Settings(BaseSettings):
@@ -14,6 +20,38 @@ class Settings(BaseSettings):
     ADMIN_PASSWORD: str = "admin"
     CORS_ORIGINS: str = "http://localhost:5173"
     RESET_DB: bool = False
+    # カレンダーの日付の区切りに使うタイムゾーン（DB の日時は UTC）
+    CALENDAR_TIMEZONE: str = "Asia/Tokyo"
+    # 認証ユーザーキャッシュ（どちらかが 0 なら無効）
+    USER_CACHE_TTL: float = 10.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    # パスワードのハッシュ化・検証を行うスレッド数と、それを超えて待たせる最大数
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+    # argon2id のパラメータ（python -m benchmarks.calibrate_argon2 で推奨値を求める）
+    # 変更すると既存ハッシュはログイン成功時に新しいパラメータで再ハッシュされる
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    # 無効化されたトークンの一覧を DB から読み直す間隔（秒）
+    # 他のワーカーでのログアウトは最大この秒数だけ遅れて反映される
+    TOKEN_REVOCATION_REFRESH_INTERVAL: float = 2.0
+    # レート制限の 1 分あたりの予算（ルートごとのコストを消費する）と状態の保存先
+    # 保存先は "memory"（ワーカーごと）か、同じホストのワーカーで共有する SQLite ファイルのパス
+    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_STORAGE: str = "memory"
+    # DB コネクションプール（ワーカーごと）。(pool_size + max_overflow) × ワーカー数が
+    # DB の max_connections を超えないようにする。利用状況は /admin/metrics の db_pool で見る
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # 空き接続を待つ最大秒数
+    DB_POOL_RECYCLE: int = -1  # この秒数より古い接続は張り直す（-1 で無効）
+    DB_POOL_PRE_PING: bool = False  # 取得時に接続の生存を確認する
+    # 1 文あたりの実行時間の上限（ミリ秒、0 で無効）。PostgreSQL のみ
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # gunicorn の複数ワーカーの /metrics を合算するための書き出し先（空なら合算しない）と書き出し間隔（秒）
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0
 
     model_config = {"env_file": ".env"}
 
@@ -29,9 +67,53 @@ ADMIN_EMAIL = settings.ADMIN_EMAIL
 ADMIN_PASSWORD = settings.ADMIN_PASSWORD
 CORS_ORIGINS = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")]
 RESET_DB = settings.RESET_DB
+CALENDAR_TIMEZONE = settings.CALENDAR_TIMEZONE
+USER_CACHE_TTL = settings.USER_CACHE_TTL
+USER_CACHE_MAX_SIZE = settings.USER_CACHE_MAX_SIZE
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS
+PASSWORD_HASH_QUEUE_LIMIT = settings.PASSWORD_HASH_QUEUE_LIMIT
+ARGON2_TIME_COST = settings.ARGON2_TIME_COST
+ARGON2_MEMORY_COST = settings.ARGON2_MEMORY_COST
+ARGON2_PARALLELISM = settings.ARGON2_PARALLELISM
+TOKEN_REVOCATION_REFRESH_INTERVAL = settings.TOKEN_REVOCATION_REFRESH_INTERVAL
+RATE_LIMIT_PER_MINUTE = settings.RATE_LIMIT_PER_MINUTE
+RATE_LIMIT_STORAGE = settings.RATE_LIMIT_STORAGE
+METRICS_MULTIPROC_DIR = settings.METRICS_MULTIPROC_DIR
+METRICS_FLUSH_INTERVAL = settings.METRICS_FLUSH_INTERVAL
+
+# SQLite は接続ごとに外部キー制約を有効化する（ON DELETE CASCADE を効かせるため）
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 
 # エンジン作成
-engine = create_engine(settings.DATABASE_URL)
+def _engine_options(url: str) -> dict:
+    database_url = make_url(url)
+    backend = database_url.get_backend_name()
+    # インメモリの SQLite は接続ごとに別の DB になるため、プールの設定は適用しない
+    if backend == "sqlite" and database_url.database in (None, "", ":memory:"):
+        return {}
+    options: dict = {
+        "poolclass": MeteredQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+pool_metrics.attach(engine.pool)
 
 # セッションファクトリを定義
 SessionLocal = sessionmaker(bind=engine)
@@ -44,3 +126,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 集計用の読み取り専用スナップショット接続を取得する関数
+# PostgreSQL では REPEATABLE READ / READ ONLY の別トランザクションで実行し、予約の書き込みを妨げない
+# それ以外（テストの SQLite など）ではセッションの接続をそのまま使う
+# isolated=True の場合はどの DB でもセッションとは別の接続を使う（レスポンス後も読み続けるストリーミング用）
+@contextmanager
+def read_only_snapshot(db: Session, isolated: bool = False) -> Iterator[Connection]:
+    bind = db.get_bind()
+    is_postgresql = bind.dialect.name == "postgresql"
+    if not is_postgresql and not isolated:
+        yield db.connection()
+        return
+    options = (
+        {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+        if is_postgresql
+        else {}
+    )
+    with bind.connect().execution_options(**options) as connection:
+        with connection.begin():
+            yield connection
@@ -0,0 +1,40 @@
+# backend/crud/calendar.py
+from datetime import datetime
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+from models import Event, Stage
+
+
+class CrudCalendar:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # 開始日時が [start, end) に含まれるステージをイベント名付きで開始日時順に読み取り
+    # stages.start_time のインデックスによる範囲検索 1 回で取得する
+    def read_stages(self, start: datetime, end: datetime) -> list[Row]:
+        return self.db.execute(
+            select(
+                Stage.id,
+                Stage.start_time,
+                Stage.end_time,
+                Stage.event_id,
+                Event.name.label("event_name"),
+            )
+            .join(Event, Event.id == Stage.event_id)
+            .where(Stage.start_time >= start, Stage.start_time < end)
+            .order_by(Stage.start_time, Stage.id)
+        ).all()
+
+    # ステージのあるイベントを最初のステージの開始日時・最後のステージの終了日時と共に読み取り
+    def read_event_periods(self) -> list[Row]:
+        return self.db.execute(
+            select(
+                Event.id,
+                Event.name,
+                Event.description,
+                func.min(Stage.start_time).label("start_time"),
+                func.max(Stage.end_time).label("end_time"),
+            )
+            .join(Stage, Stage.event_id == Event.id)
+            .group_by(Event.id, Event.name, Event.description)
+        ).all()
@@ -1,9 +1,22 @@
 # backend/crud/event.py
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 from crud.base import BaseCRUD
-from models import Event, Stage
-from schemas import EventCreate, EventUpdate, EventResponse, EventTimeResponse
-from datetime import datetime
+from models import Event, Stage, SeatGroup, TicketType
+from schemas import (
+    EventCreate,
+    EventUpdate,
+    EventResponse,
+    EventTimeResponse,
+    EventAvailabilityResponse,
+    StageAvailabilityResponse,
+    EventDuplicate,
+    EventTreeResponse,
+    StageTreeResponse,
+    SeatGroupTreeResponse,
+    TicketTypeResponse,
+)
+from datetime import datetime, timedelta
 
 
 class CrudEvent(BaseCRUD[Event, EventResponse]):
@@ -25,3 +38,196 @@ class CrudEvent(BaseCRUD[Event, EventResponse]):
         start_time = min([stage.start_time for stage in stages])
         end_time = max([stage.end_time for stage in stages])
         return EventTimeResponse(start_time=start_time, end_time=end_time)
+
+    # イベントごと・ステージごとの残席数と総席数を 1 本の集計クエリで取得するメソッド
+    # 存在しないイベントIDは結果に含まれない
+    def read_availability(self, event_ids: list[int]) -> list[EventAvailabilityResponse]:
+        if not event_ids:
+            return []
+        rows = (
+            self.db.query(
+                Event.id,
+                Stage.id,
+                func.coalesce(func.sum(SeatGroup.capacity), 0),
+                func.coalesce(
+                    func.sum(func.coalesce(SeatGroup.total_capacity, SeatGroup.capacity)),
+                    0,
+                ),
+            )
+            .outerjoin(Stage, Stage.event_id == Event.id)
+            .outerjoin(SeatGroup, SeatGroup.stage_id == Stage.id)
+            .filter(Event.id.in_(event_ids))
+            .group_by(Event.id, Stage.id, Stage.start_time)
+            .order_by(Event.id, Stage.start_time)
+            .all()
+        )
+        stages_by_event: dict[int, list[StageAvailabilityResponse]] = {}
+        for event_id, stage_id, remaining, total in rows:
+            stages = stages_by_event.setdefault(event_id, [])
+            if stage_id is None:
+                continue
+            stages.append(
+                StageAvailabilityResponse(
+                    stage_id=stage_id,
+                    remaining=remaining,
+                    total=total,
+                    sold_out=total > 0 and remaining <= 0,
+                )
+            )
+        availability = []
+        for event_id, stages in stages_by_event.items():
+            remaining = sum(stage.remaining for stage in stages)
+            total = sum(stage.total for stage in stages)
+            availability.append(
+                EventAvailabilityResponse(
+                    event_id=event_id,
+                    remaining=remaining,
+                    total=total,
+                    sold_out=total > 0 and remaining <= 0,
+                    stages=stages,
+                )
+            )
+        return availability
+
+    # イベントをステージ・シートグループ・チケットタイプごと複製するメソッド
+    # 各階層は 1 回の SELECT と 1 回の一括 INSERT ... RETURNING で処理し、全体を 1 トランザクションで commit する
+    # 残席数は総定員に戻し、予約は複製しない
+    def duplicate(self, event_id: int, data: EventDuplicate) -> EventTreeResponse:
+        source = self.read_by_id(event_id)
+        shift = timedelta(days=data.shift_days)
+        try:
+            new_event = self.db.scalars(
+                insert(Event).returning(Event),
+                [
+                    {
+                        "name": data.name or f"{source.name}のコピー"[:100],
+                        "description": source.description,
+                    }
+                ],
+            ).one()
+
+            stages = self.db.execute(
+                select(Stage.id, Stage.start_time, Stage.end_time)
+                .where(Stage.event_id == event_id)
+                .order_by(Stage.id)
+            ).all()
+            stage_map: dict[int, Stage] = {}
+            if stages:
+                new_stages = self.db.scalars(
+                    insert(Stage).returning(Stage, sort_by_parameter_order=True),
+                    [
+                        {
+                            "event_id": new_event.id,
+                            "start_time": stage.start_time + shift,
+                            "end_time": stage.end_time + shift,
+                        }
+                        for stage in stages
+                    ],
+                ).all()
+                stage_map = {
+                    stage.id: new_stage for stage, new_stage in zip(stages, new_stages)
+                }
+
+            seat_groups = self.db.execute(
+                select(
+                    SeatGroup.id,
+                    SeatGroup.stage_id,
+                    SeatGroup.name,
+                    func.coalesce(SeatGroup.total_capacity, SeatGroup.capacity),
+                )
+                .join(Stage, Stage.id == SeatGroup.stage_id)
+                .where(Stage.event_id == event_id)
+                .order_by(SeatGroup.id)
+            ).all()
+            seat_group_map: dict[int, SeatGroup] = {}
+            if seat_groups:
+                new_seat_groups = self.db.scalars(
+                    insert(SeatGroup).returning(SeatGroup, sort_by_parameter_order=True),
+                    [
+                        {
+                            "stage_id": stage_map[stage_id].id,
+                            "name": name,
+                            "capacity": total_capacity,
+                            "total_capacity": total_capacity,
+                        }
+                        for _, stage_id, name, total_capacity in seat_groups
+                    ],
+                ).all()
+                seat_group_map = {
+                    seat_group.id: new_seat_group
+                    for seat_group, new_seat_group in zip(seat_groups, new_seat_groups)
+                }
+
+            ticket_types = self.db.execute(
+                select(TicketType.seat_group_id, TicketType.type_name, TicketType.price)
+                .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+                .join(Stage, Stage.id == SeatGroup.stage_id)
+                .where(Stage.event_id == event_id)
+                .order_by(TicketType.id)
+            ).all()
+            new_ticket_types: list[TicketType] = []
+            if ticket_types:
+                new_ticket_types = self.db.scalars(
+                    insert(TicketType).returning(TicketType, sort_by_parameter_order=True),
+                    [
+                        {
+                            "seat_group_id": seat_group_map[seat_group_id].id,
+                            "type_name": type_name,
+                            "price": price,
+                        }
+                        for seat_group_id, type_name, price in ticket_types
+                    ],
+                ).all()
+
+            tree = self._build_tree(
+                new_event,
+                list(stage_map.values()),
+                list(seat_group_map.values()),
+                new_ticket_types,
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return tree
+
+    # 複製結果をツリー形式のレスポンスに組み立てる
+    @staticmethod
+    def _build_tree(
+        event: Event,
+        stages: list[Stage],
+        seat_groups: list[SeatGroup],
+        ticket_types: list[TicketType],
+    ) -> EventTreeResponse:
+        ticket_types_by_seat_group: dict[int, list[TicketTypeResponse]] = {}
+        for ticket_type in ticket_types:
+            ticket_types_by_seat_group.setdefault(ticket_type.seat_group_id, []).append(
+                TicketTypeResponse.model_validate(ticket_type)
+            )
+        seat_groups_by_stage: dict[int, list[SeatGroupTreeResponse]] = {}
+        for seat_group in seat_groups:
+            seat_groups_by_stage.setdefault(seat_group.stage_id, []).append(
+                SeatGroupTreeResponse(
+                    id=seat_group.id,
+                    stage_id=seat_group.stage_id,
+                    name=seat_group.name,
+                    capacity=seat_group.capacity,
+                    total_capacity=seat_group.total_capacity,
+                    ticket_types=ticket_types_by_seat_group.get(seat_group.id, []),
+                )
+            )
+        return EventTreeResponse(
+            id=event.id,
+            name=event.name,
+            description=event.description,
+            stages=[
+                StageTreeResponse(
+                    id=stage.id,
+                    event_id=stage.event_id,
+                    start_time=stage.start_time,
+                    end_time=stage.end_time,
+                    seat_groups=seat_groups_by_stage.get(stage.id, []),
+                )
+                for stage in stages
+            ],
+        )
@@ -0,0 +1,96 @@
+# backend/crud/export.py
+from collections.abc import Iterator, Sequence
+from sqlalchemy import Row, Select, select
+from sqlalchemy.orm import Session
+from config import read_only_snapshot
+from models import Stage, SeatGroup, TicketType, Reservation, User
+
+# サーバーサイドカーソルから 1 回に取り出す行数
+EXPORT_BATCH_SIZE = 1000
+
+RESERVATION_COLUMNS = [
+    "reservation_id",
+    "created_at",
+    "stage_id",
+    "stage_start_time",
+    "seat_group",
+    "ticket_type",
+    "price",
+    "num_attendees",
+    "amount",
+    "is_paid",
+    "user_id",
+    "nickname",
+    "email",
+]
+
+ATTENDEE_COLUMNS = [
+    "reservation_id",
+    "nickname",
+    "email",
+    "seat_group",
+    "ticket_type",
+    "num_attendees",
+    "is_paid",
+]
+
+
+class CrudExport:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # サーバーサイドカーソルで結果を EXPORT_BATCH_SIZE 行ずつ返す
+    # セッションとは別の接続を使うため、レスポンス送信中もリクエストのセッションに依存しない
+    def _stream(self, query: Select) -> Iterator[Sequence[Row]]:
+        with read_only_snapshot(self.db, isolated=True) as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=EXPORT_BATCH_SIZE
+            ).execute(query)
+            yield from result.partitions()
+
+    # イベントの予約一覧（RESERVATION_COLUMNS の順）
+    def iter_event_reservations(self, event_id: int) -> Iterator[Sequence[Row]]:
+        query = (
+            select(
+                Reservation.id,
+                Reservation.created_at,
+                Stage.id,
+                Stage.start_time,
+                SeatGroup.name,
+                TicketType.type_name,
+                TicketType.price,
+                Reservation.num_attendees,
+                TicketType.price * Reservation.num_attendees,
+                Reservation.is_paid,
+                User.id,
+                User.nickname,
+                User.email,
+            )
+            .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+            .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+            .join(Stage, Stage.id == SeatGroup.stage_id)
+            .join(User, User.id == Reservation.user_id)
+            .where(Stage.event_id == event_id)
+            .order_by(Stage.start_time, Reservation.id)
+        )
+        return self._stream(query)
+
+    # ステージの来場者一覧（ATTENDEE_COLUMNS の順）
+    def iter_stage_attendees(self, stage_id: int) -> Iterator[Sequence[Row]]:
+        query = (
+            select(
+                Reservation.id,
+                User.nickname,
+                User.email,
+                SeatGroup.name,
+                TicketType.type_name,
+                Reservation.num_attendees,
+                Reservation.is_paid,
+            )
+            .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+            .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+            .join(User, User.id == Reservation.user_id)
+            .where(SeatGroup.stage_id == stage_id)
+            .order_by(SeatGroup.id, Reservation.id)
+        )
+        return self._stream(query)
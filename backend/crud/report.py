@@ -0,0 +1,116 @@
+# backend/crud/report.py
+from sqlalchemy import false, func, select
+from sqlalchemy.orm import Session
+from config import read_only_snapshot
+from models import Stage, SeatGroup, TicketType, Reservation
+from schemas import (
+    SalesSummary,
+    EventReportResponse,
+    StageReport,
+    SeatGroupReport,
+    TicketTypeReport,
+)
+
+
+# 1 行分の集計値を上位階層のサマリーへ加算する
+def _accumulate(
+    summary: SalesSummary, is_paid: bool, reservations: int, attendees: int, revenue: float
+) -> None:
+    summary.reservations += reservations
+    summary.attendees += attendees
+    summary.revenue += revenue
+    if is_paid:
+        summary.paid_reservations += reservations
+        summary.paid_attendees += attendees
+        summary.paid_revenue += revenue
+    else:
+        summary.unpaid_reservations += reservations
+        summary.unpaid_attendees += attendees
+        summary.unpaid_revenue += revenue
+
+
+class CrudReport:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # イベントの売上レポートを取得するメソッド
+    # ステージ > シートグループ > チケットタイプ × 支払状況 で集計する 1 本のクエリから組み立てる
+    # 予約の無いチケットタイプも 0 件として含める
+    def read_event_report(self, event_id: int) -> EventReportResponse:
+        is_paid = func.coalesce(Reservation.is_paid, false())
+        query = (
+            select(
+                Stage.id,
+                Stage.start_time,
+                SeatGroup.id,
+                SeatGroup.name,
+                TicketType.id,
+                TicketType.type_name,
+                TicketType.price,
+                is_paid,
+                func.count(Reservation.id),
+                func.coalesce(func.sum(Reservation.num_attendees), 0),
+                func.coalesce(func.sum(TicketType.price * Reservation.num_attendees), 0),
+            )
+            .select_from(Stage)
+            .outerjoin(SeatGroup, SeatGroup.stage_id == Stage.id)
+            .outerjoin(TicketType, TicketType.seat_group_id == SeatGroup.id)
+            .outerjoin(Reservation, Reservation.ticket_type_id == TicketType.id)
+            .where(Stage.event_id == event_id)
+            .group_by(
+                Stage.id,
+                Stage.start_time,
+                SeatGroup.id,
+                SeatGroup.name,
+                TicketType.id,
+                TicketType.type_name,
+                TicketType.price,
+                is_paid,
+            )
+            .order_by(Stage.start_time, SeatGroup.id, TicketType.id)
+        )
+        with read_only_snapshot(self.db) as connection:
+            rows = connection.execute(query).all()
+
+        report = EventReportResponse(event_id=event_id)
+        stages: dict[int, StageReport] = {}
+        seat_groups: dict[int, SeatGroupReport] = {}
+        ticket_types: dict[int, TicketTypeReport] = {}
+        for (
+            stage_id,
+            start_time,
+            seat_group_id,
+            seat_group_name,
+            ticket_type_id,
+            type_name,
+            price,
+            paid,
+            reservations,
+            attendees,
+            revenue,
+        ) in rows:
+            stage = stages.get(stage_id)
+            if stage is None:
+                stage = stages[stage_id] = StageReport(stage_id=stage_id, start_time=start_time)
+                report.stages.append(stage)
+            if seat_group_id is None:
+                continue
+            seat_group = seat_groups.get(seat_group_id)
+            if seat_group is None:
+                seat_group = seat_groups[seat_group_id] = SeatGroupReport(
+                    seat_group_id=seat_group_id, name=seat_group_name
+                )
+                stage.seat_groups.append(seat_group)
+            if ticket_type_id is None:
+                continue
+            ticket_type = ticket_types.get(ticket_type_id)
+            if ticket_type is None:
+                ticket_type = ticket_types[ticket_type_id] = TicketTypeReport(
+                    ticket_type_id=ticket_type_id, type_name=type_name, price=price
+                )
+                seat_group.ticket_types.append(ticket_type)
+            if reservations == 0:
+                continue
+            for summary in (ticket_type, seat_group, stage, report):
+                _accumulate(summary, bool(paid), reservations, attendees, float(revenue))
+        return report
@@ -1,9 +1,23 @@
 # backend/crud/reservation.py
+from sqlalchemy import DateTime, Integer, Select, and_, column, or_, select, update, values
 from sqlalchemy.orm import Session
 from crud.base import BaseCRUD
-from models import Reservation
-from schemas import ReservationCreate, ReservationUpdate, ReservationResponse
+from models import Event, Reservation, TicketType, SeatGroup, Stage, User
+from schemas import (
+    ReservationFilter,
+    ReservationDetailResponse,
+    ReservationDetailEvent,
+    ReservationDetailStage,
+    ReservationDetailSeatGroup,
+    ReservationDetailTicketType,
+    ReservationDetailUser,
+    ReservationCreate,
+    ReservationUpdate,
+    ReservationResponse,
+    CheckInResponse,
+)
 from datetime import datetime, timezone
+from reconciliation import OpenReservation
 
 
 class CrudReservation(BaseCRUD[Reservation, ReservationResponse]):
@@ -47,6 +61,96 @@ class CrudReservation(BaseCRUD[Reservation, ReservationResponse]):
             for reservation in reservations
         ]
 
+    # 条件に合う予約を keyset ページングで読み取るメソッド
+    # order は "created_at" / "-created_at" / "id" / "-id"、after は前ページ末尾の (並べ替えキー, id)
+    # 上位の階層での絞り込みは必要な分だけ JOIN して 1 回のクエリで行う
+    def query(
+        self,
+        filters: ReservationFilter,
+        order: str,
+        limit: int,
+        after: tuple[datetime | int, int] | None = None,
+    ) -> list[ReservationResponse]:
+        statement = select(Reservation)
+        hierarchy = (filters.event_id, filters.stage_id, filters.seat_group_id)
+        if any(value is not None for value in hierarchy):
+            statement = statement.join(TicketType, TicketType.id == Reservation.ticket_type_id)
+        if filters.event_id is not None or filters.stage_id is not None:
+            statement = statement.join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+        if filters.event_id is not None:
+            statement = statement.join(Stage, Stage.id == SeatGroup.stage_id)
+        statement = _paginate(_filter(statement, filters), order, limit, after)
+        reservations = self.db.scalars(statement).all()
+        return [
+            ReservationResponse.model_validate(reservation)
+            for reservation in reservations
+        ]
+
+    # 予約にイベント・ステージ・シートグループ・チケットタイプ・ユーザーを結合して読み取るメソッド
+    # 画面表示に必要な列だけを 1 回の JOIN で取得する
+    def query_details(
+        self,
+        filters: ReservationFilter,
+        order: str,
+        limit: int | None = None,
+        after: tuple[datetime | int, int] | None = None,
+    ) -> list[ReservationDetailResponse]:
+        statement = (
+            select(
+                Reservation.id,
+                Reservation.num_attendees,
+                Reservation.is_paid,
+                Reservation.created_at,
+                Reservation.checked_in_at,
+                Event.id.label("event_id"),
+                Event.name.label("event_name"),
+                Stage.id.label("stage_id"),
+                Stage.start_time.label("stage_start_time"),
+                Stage.end_time.label("stage_end_time"),
+                SeatGroup.id.label("seat_group_id"),
+                SeatGroup.name.label("seat_group_name"),
+                TicketType.id.label("ticket_type_id"),
+                TicketType.type_name.label("ticket_type_name"),
+                TicketType.price.label("ticket_type_price"),
+                User.id.label("user_id"),
+                User.nickname.label("user_nickname"),
+                User.email.label("user_email"),
+            )
+            .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+            .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+            .join(Stage, Stage.id == SeatGroup.stage_id)
+            .join(Event, Event.id == Stage.event_id)
+            .join(User, User.id == Reservation.user_id)
+        )
+        statement = _paginate(_filter(statement, filters), order, limit, after)
+        return [
+            ReservationDetailResponse(
+                id=row.id,
+                num_attendees=row.num_attendees,
+                is_paid=bool(row.is_paid),
+                created_at=row.created_at,
+                checked_in_at=row.checked_in_at,
+                event=ReservationDetailEvent(id=row.event_id, name=row.event_name),
+                stage=ReservationDetailStage(
+                    id=row.stage_id,
+                    start_time=row.stage_start_time,
+                    end_time=row.stage_end_time,
+                ),
+                seat_group=ReservationDetailSeatGroup(
+                    id=row.seat_group_id, name=row.seat_group_name
+                ),
+                ticket_type=ReservationDetailTicketType(
+                    id=row.ticket_type_id,
+                    type_name=row.ticket_type_name,
+                    price=row.ticket_type_price,
+                ),
+                user=ReservationDetailUser(
+                    id=row.user_id, nickname=row.user_nickname, email=row.user_email
+                ),
+            )
+            for row in self.db.execute(statement)
+        ]
+
     def create(
         self, ticket_type_id: int, user_id: int, data: ReservationCreate
     ) -> ReservationResponse:
@@ -68,3 +172,181 @@ class CrudReservation(BaseCRUD[Reservation, ReservationResponse]):
         self.db.commit()
         self.db.refresh(reservation)
         return ReservationResponse.model_validate(reservation)
+
+    # 振込照合用に未払い予約を金額（price × num_attendees）とニックネーム付きで読み取るメソッド
+    def read_open_for_reconciliation(self) -> list[OpenReservation]:
+        rows = self.db.execute(
+            select(
+                Reservation.id,
+                Reservation.user_id,
+                User.nickname,
+                TicketType.price * Reservation.num_attendees,
+                Reservation.created_at,
+            )
+            .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+            .join(User, User.id == Reservation.user_id)
+            .where(or_(Reservation.is_paid.is_(False), Reservation.is_paid.is_(None)))
+            .order_by(Reservation.id)
+        )
+        return [OpenReservation(*row) for row in rows]
+
+    # 支払状況を一括で更新するメソッド
+    # 残席数には影響しないため、UPDATE 1 回と commit 1 回で反映し、更新した予約IDを返す
+    def update_paid(self, reservation_ids: list[int], is_paid: bool) -> list[int]:
+        updated_ids = self.db.scalars(
+            update(Reservation)
+            .where(Reservation.id.in_(reservation_ids))
+            .values(is_paid=is_paid)
+            .returning(Reservation.id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        self.db.commit()
+        return sorted(updated_ids)
+
+    # チェックインを行うメソッド
+    # 未チェックインの場合のみ更新する条件付き UPDATE 1 回で反映するため、複数端末が同時に
+    # 同じ予約を読み取っても 1 回だけ成功し、他は重複スキャンとして扱われる
+    # 予約が存在しない場合は None を返す
+    def check_in(self, reservation_id: int) -> CheckInResponse | None:
+        checked_in = self.db.execute(
+            update(Reservation)
+            .where(Reservation.id == reservation_id, Reservation.checked_in_at.is_(None))
+            .values(checked_in_at=datetime.now(timezone.utc))
+            .returning(
+                Reservation.num_attendees, Reservation.is_paid, Reservation.checked_in_at
+            ),
+            execution_options={"synchronize_session": False},
+        ).first()
+        self.db.commit()
+        if checked_in is not None:
+            return CheckInResponse(
+                reservation_id=reservation_id,
+                num_attendees=checked_in.num_attendees,
+                is_paid=bool(checked_in.is_paid),
+                checked_in_at=checked_in.checked_in_at,
+                already_checked_in=False,
+            )
+        reservation = self.read_by_id(reservation_id)
+        if reservation is None:
+            return None
+        return CheckInResponse(
+            reservation_id=reservation_id,
+            num_attendees=reservation.num_attendees,
+            is_paid=bool(reservation.is_paid),
+            checked_in_at=reservation.checked_in_at,
+            already_checked_in=True,
+        )
+
+    # ステージに属する予約のID・人数・支払状況・チェックイン状況を予約ID順で取得するメソッド
+    def read_stage_manifest(self, stage_id: int) -> list[tuple[int, int, bool, bool]]:
+        rows = self.db.execute(
+            select(
+                Reservation.id,
+                Reservation.num_attendees,
+                Reservation.is_paid,
+                Reservation.checked_in_at.is_not(None),
+            )
+            .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+            .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+            .where(SeatGroup.stage_id == stage_id)
+            .order_by(Reservation.id)
+        ).all()
+        return [
+            (reservation_id, num_attendees, bool(is_paid), bool(checked_in))
+            for reservation_id, num_attendees, is_paid, checked_in in rows
+        ]
+
+    # オフラインで記録したチェックインを一括反映するメソッド
+    # scans は {予約ID: スキャン日時}。ステージ外・チェックイン済みの予約は 1 回の UPDATE の条件で除外する
+    # 反映した予約IDと、反映されなかった予約の既存チェックイン日時（ステージ外・存在しない予約は含まない）を返す
+    def bulk_check_in(
+        self, stage_id: int, scans: dict[int, datetime]
+    ) -> tuple[list[int], dict[int, datetime | None]]:
+        stage_ticket_types = (
+            select(TicketType.id)
+            .join(SeatGroup, SeatGroup.id == TicketType.seat_group_id)
+            .where(SeatGroup.stage_id == stage_id)
+        )
+        scan_values = values(
+            column("id", Integer), column("scanned_at", DateTime), name="scans"
+        ).data(list(scans.items())).cte("scans")
+        applied = self.db.scalars(
+            update(Reservation)
+            .where(
+                Reservation.id == scan_values.c.id,
+                Reservation.checked_in_at.is_(None),
+                Reservation.ticket_type_id.in_(stage_ticket_types),
+            )
+            .values(checked_in_at=scan_values.c.scanned_at)
+            .returning(Reservation.id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        self.db.commit()
+        applied_ids = set(applied)
+        rest = [reservation_id for reservation_id in scans if reservation_id not in applied_ids]
+        existing: dict[int, datetime | None] = {}
+        if rest:
+            existing = dict(
+                self.db.execute(
+                    select(Reservation.id, Reservation.checked_in_at).where(
+                        Reservation.id.in_(rest),
+                        Reservation.ticket_type_id.in_(stage_ticket_types),
+                    )
+                ).all()
+            )
+        return sorted(applied_ids), existing
+
+
+# 予約検索の条件を WHERE 句にする
+# 上位の階層の条件は TicketType / SeatGroup / Stage が JOIN 済みであること
+def _filter(statement: Select, filters: ReservationFilter) -> Select:
+    if filters.event_id is not None:
+        statement = statement.where(Stage.event_id == filters.event_id)
+    if filters.stage_id is not None:
+        statement = statement.where(SeatGroup.stage_id == filters.stage_id)
+    if filters.seat_group_id is not None:
+        statement = statement.where(TicketType.seat_group_id == filters.seat_group_id)
+    if filters.ticket_type_id is not None:
+        statement = statement.where(Reservation.ticket_type_id == filters.ticket_type_id)
+    if filters.user_id is not None:
+        statement = statement.where(Reservation.user_id == filters.user_id)
+    if filters.is_paid:
+        statement = statement.where(Reservation.is_paid.is_(True))
+    elif filters.is_paid is not None:
+        # is_paid が NULL の予約は未払いとして扱う（read_open_for_reconciliation と同じ）
+        statement = statement.where(
+            or_(Reservation.is_paid.is_(False), Reservation.is_paid.is_(None))
+        )
+    if filters.created_from is not None:
+        statement = statement.where(Reservation.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        statement = statement.where(Reservation.created_at < filters.created_to)
+    return statement
+
+
+# 並べ替えと keyset ページングを適用する（同じ並べ替えキーは id で順序を確定させる）
+def _paginate(
+    statement: Select,
+    order: str,
+    limit: int | None,
+    after: tuple[datetime | int, int] | None,
+) -> Select:
+    descending = order.startswith("-")
+    key = Reservation.created_at if order.lstrip("-") == "created_at" else Reservation.id
+    if after is not None:
+        after_key, after_id = after
+        if descending:
+            statement = statement.where(
+                or_(key < after_key, and_(key == after_key, Reservation.id < after_id))
+            )
+        else:
+            statement = statement.where(
+                or_(key > after_key, and_(key == after_key, Reservation.id > after_id))
+            )
+    if descending:
+        statement = statement.order_by(key.desc(), Reservation.id.desc())
+    else:
+        statement = statement.order_by(key, Reservation.id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
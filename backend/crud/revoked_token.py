@@ -0,0 +1,51 @@
+# backend/crud/revoked_token.py
+from datetime import datetime
+from sqlalchemy import Row, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import RevokedToken
+
+
+class CrudRevokedToken:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # 個別のトークンを無効化（同じ jti が登録済みなら何もしない）
+    def revoke_token(self, jti: str, user_id: int | None, expires_at: datetime) -> RevokedToken | None:
+        row = RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at)
+        self.db.add(row)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        self.db.refresh(row)
+        return row
+
+    # ユーザーの revoked_at より前に発行された全トークンを無効化
+    def revoke_user(self, user_id: int, revoked_at: datetime, expires_at: datetime) -> RevokedToken:
+        row = RevokedToken(user_id=user_id, revoked_at=revoked_at, expires_at=expires_at)
+        self.db.add(row)
+        self.db.commit()
+        self.db.refresh(row)
+        return row
+
+    # id が after_id より大きい行を id 順に読み取り
+    def read_after(self, after_id: int) -> list[Row]:
+        return self.db.execute(
+            select(
+                RevokedToken.id,
+                RevokedToken.jti,
+                RevokedToken.user_id,
+                RevokedToken.revoked_at,
+                RevokedToken.expires_at,
+            )
+            .where(RevokedToken.id > after_id)
+            .order_by(RevokedToken.id)
+        ).all()
+
+    # 対象のトークンが失効済みの行を削除
+    def delete_expired(self, now: datetime) -> int:
+        result = self.db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        self.db.commit()
+        return result.rowcount
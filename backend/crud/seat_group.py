@@ -1,8 +1,15 @@
 # backend/crud/seat_group.py
+from fastapi import HTTPException
+from sqlalchemy import Integer, column, func, select, update, values
 from sqlalchemy.orm import Session
 from crud.base import BaseCRUD
 from models import SeatGroup
-from schemas import SeatGroupCreate, SeatGroupUpdate, SeatGroupResponse
+from schemas import (
+    SeatGroupCreate,
+    SeatGroupUpdate,
+    SeatGroupResponse,
+    SeatGroupCapacityAdjustment,
+)
 
 
 class CrudSeatGroup(BaseCRUD[SeatGroup, SeatGroupResponse]):
@@ -23,3 +30,67 @@ class CrudSeatGroup(BaseCRUD[SeatGroup, SeatGroupResponse]):
 
     def update(self, seat_group_id: int, data: SeatGroupUpdate) -> SeatGroupResponse:
         return super().update(seat_group_id, data)
+
+    # 複数SeatGroupの残席数を増減で一括調整するメソッド
+    # 販売済み数（total_capacity - capacity）を保ったまま capacity と total_capacity を同じだけ動かす
+    # 対象行を id 順にロックし、1 回の UPDATE ... FROM (VALUES ...) と 1 回の commit で反映する
+    def adjust_capacities(
+        self, stage_id: int, adjustments: list[SeatGroupCapacityAdjustment]
+    ) -> list[SeatGroupResponse]:
+        ids = sorted(adjustment.seat_group_id for adjustment in adjustments)
+        try:
+            locked = {
+                row.id: row
+                for row in self.db.execute(
+                    select(SeatGroup.id, SeatGroup.capacity, SeatGroup.total_capacity)
+                    .where(SeatGroup.stage_id == stage_id, SeatGroup.id.in_(ids))
+                    .order_by(SeatGroup.id)
+                    .with_for_update()
+                )
+            }
+            missing = [seat_group_id for seat_group_id in ids if seat_group_id not in locked]
+            if missing:
+                raise HTTPException(
+                    status_code=404, detail=f"SeatGroup not found in stage: {missing}"
+                )
+            deltas = []
+            for adjustment in adjustments:
+                row = locked[adjustment.seat_group_id]
+                total = row.total_capacity if row.total_capacity is not None else row.capacity
+                delta = (
+                    adjustment.delta
+                    if adjustment.delta is not None
+                    else adjustment.total_capacity - total
+                )
+                if row.capacity + delta < 0:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"SeatGroup {row.id} の総定員を販売済み数 {total - row.capacity} 未満にはできません",
+                    )
+                deltas.append((adjustment.seat_group_id, delta))
+            adjustment_values = values(
+                column("id", Integer), column("delta", Integer), name="adjustments"
+            ).data(deltas).cte("adjustments")
+            self.db.execute(
+                update(SeatGroup)
+                .where(SeatGroup.id == adjustment_values.c.id)
+                .values(
+                    capacity=SeatGroup.capacity + adjustment_values.c.delta,
+                    total_capacity=func.coalesce(SeatGroup.total_capacity, SeatGroup.capacity)
+                    + adjustment_values.c.delta,
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            seat_groups = (
+                self.db.query(SeatGroup)
+                .filter(SeatGroup.id.in_(ids))
+                .order_by(SeatGroup.id)
+                .populate_existing()
+                .all()
+            )
+            result = [SeatGroupResponse.model_validate(seat_group) for seat_group in seat_groups]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result
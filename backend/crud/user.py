@@ -1,10 +1,13 @@
 # backend/crud/user.py
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, func, or_, select, update
 from sqlalchemy.orm import Session
 from crud.base import BaseCRUD
-from models import User
-from schemas import UserCreate, UserUpdate, UserResponse
-from security import hash_password, needs_rehash, verify_password
+from models import User, Reservation, TicketType, SeatGroup
+from schemas import UserCreate, UserUpdate, UserResponse, SeatGroupResponse
+from security import hash_password, is_legacy_hash, needs_rehash, verify_password_async
+from user_cache import user_cache
 
 
 class CrudUser(BaseCRUD[User, UserResponse]):
@@ -16,21 +19,88 @@ class CrudUser(BaseCRUD[User, UserResponse]):
         user = self.db.query(User).filter(User.email == email).first()
         return user
 
-    # パスワードの検証を行う関数
-    def authenticate_user(self, email: str, password: str) -> UserResponse:
-        user = self.read_by_email(email)
+    # 複数IDで読み取り
+    def read_by_ids(self, user_ids: list[int]) -> list[User]:
+        return self.db.query(User).filter(User.id.in_(user_ids)).all()
+
+    # メールアドレス・ニックネームの部分一致（大文字小文字を区別しない）で検索するメソッド
+    # 前方一致したユーザーを先に並べ、次ページの有無を判定するため limit + 1 件取得する
+    def search(self, query: str, limit: int, offset: int) -> tuple[list[UserResponse], bool]:
+        term = query.lower()
+        email = func.lower(User.email)
+        nickname = func.lower(User.nickname)
+        prefix_match = or_(
+            email.startswith(term, autoescape=True),
+            nickname.startswith(term, autoescape=True),
+        )
+        users = self.db.scalars(
+            select(User)
+            .where(
+                or_(
+                    email.contains(term, autoescape=True),
+                    nickname.contains(term, autoescape=True),
+                )
+            )
+            .order_by(case((prefix_match, 0), else_=1), email, User.id)
+            .limit(limit + 1)
+            .offset(offset)
+        ).all()
+        has_more = len(users) > limit
+        return [UserResponse.model_validate(user) for user in users[:limit]], has_more
+
+    # パスワードの検証を行う関数。bcrypt や旧パラメータの argon2 ハッシュなら、再ハッシュ
+    # 対象として検証に使ったハッシュも返す（再ハッシュはレスポンス後にジョブで行う）
+    # 検証は専用プールの完了を await で待ち、DB の読み取りはスレッドプールで行う
+    async def authenticate_user(
+        self, email: str, password: str
+    ) -> tuple[UserResponse, str | None]:
+        user = await run_in_threadpool(self.read_by_email, email)
         if user is None:
             raise HTTPException(status_code=400, detail="User not found")
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             raise HTTPException(status_code=400, detail="Incorrect password")
-        # 既存 bcrypt ハッシュは検証成功時に argon2 へ段階移行
-        if needs_rehash(user.password_hash):
-            user.password_hash = hash_password(password)
-            self.db.commit()
-        return UserResponse.model_validate(user)
+        stale_hash = user.password_hash if needs_rehash(user.password_hash) else None
+        return UserResponse.model_validate(user), stale_hash
+
+    # パスワードを現在の設定で再ハッシュする。検証後にパスワードが変更されていれば
+    # 上書きしないよう、ハッシュが old_hash のままの場合だけ更新する
+    def rehash_password(self, user_id: int, old_hash: str, password: str) -> bool:
+        if not needs_rehash(old_hash):
+            return False
+        new_hash = hash_password(password)
+        result = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    # パスワードハッシュの形式ごとの件数（bcrypt / 旧パラメータの argon2 / 現在の設定）
+    def count_password_hashes(self, batch_size: int = 1000) -> dict[str, int]:
+        counts = {"bcrypt": 0, "outdated_argon2": 0, "current": 0}
+        last_id = 0
+        while True:
+            rows = self.db.execute(
+                select(User.id, User.password_hash)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return counts
+            for _, password_hash in rows:
+                if is_legacy_hash(password_hash):
+                    counts["bcrypt"] += 1
+                elif needs_rehash(password_hash):
+                    counts["outdated_argon2"] += 1
+                else:
+                    counts["current"] += 1
+            last_id = rows[-1][0]
 
-    def create(self, data: UserCreate) -> UserResponse:
-        hashed_password = hash_password(data.password)
+    # password_hash を渡した場合はそれを使う（エンドポイントでは非同期に計算して渡す）
+    def create(self, data: UserCreate, password_hash: str | None = None) -> UserResponse:
+        hashed_password = password_hash or hash_password(data.password)
         user_data = data.model_dump()
         user_data["password_hash"] = hashed_password
         del user_data["password"]
@@ -40,15 +110,74 @@ class CrudUser(BaseCRUD[User, UserResponse]):
         self.db.refresh(user)
         return UserResponse.model_validate(user)
 
-    def update(self, user_id: int, data: UserUpdate) -> UserResponse:
+    def update(
+        self, user_id: int, data: UserUpdate, password_hash: str | None = None
+    ) -> UserResponse:
         user = self.read_by_id(user_id)
         update_data = data.model_dump()
         if update_data.get("password") is not None:
-            update_data["password_hash"] = hash_password(update_data["password"])
+            update_data["password_hash"] = password_hash or hash_password(update_data["password"])
             del update_data["password"]
         for key, value in update_data.items():
             if value is not None:
                 setattr(user, key, value)
         self.db.commit()
+        user_cache.invalidate(user_id)
         self.db.refresh(user)
         return UserResponse.model_validate(user)
+
+    def delete(self, user_id: int) -> None:
+        super().delete(user_id)
+        user_cache.invalidate(user_id)
+
+    # ユーザーを予約ごとまとめて削除し、予約分の残席数を SeatGroup に戻すメソッド
+    # 返却数は SeatGroup 単位で集計して 1 回の UPDATE で戻し、全体を 1 回の commit で反映する
+    # 残席数を戻した SeatGroup を返す
+    def delete_with_reservations(self, user_ids: list[int]) -> list[SeatGroupResponse]:
+        try:
+            restored = (
+                select(
+                    TicketType.seat_group_id.label("seat_group_id"),
+                    func.sum(Reservation.num_attendees).label("num_attendees"),
+                )
+                .join(TicketType, TicketType.id == Reservation.ticket_type_id)
+                .where(Reservation.user_id.in_(user_ids))
+                .group_by(TicketType.seat_group_id)
+                .subquery("restored")
+            )
+            # デッドロック回避のため SeatGroup は id 順にロックする
+            seat_group_ids = self.db.scalars(
+                select(SeatGroup.id)
+                .where(SeatGroup.id.in_(select(restored.c.seat_group_id)))
+                .order_by(SeatGroup.id)
+                .with_for_update()
+            ).all()
+            if seat_group_ids:
+                self.db.execute(
+                    update(SeatGroup)
+                    .where(SeatGroup.id == restored.c.seat_group_id)
+                    .values(capacity=SeatGroup.capacity + restored.c.num_attendees),
+                    execution_options={"synchronize_session": False},
+                )
+            self.db.execute(
+                delete(Reservation).where(Reservation.user_id.in_(user_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            self.db.execute(
+                delete(User).where(User.id.in_(user_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            seat_groups = (
+                self.db.query(SeatGroup)
+                .filter(SeatGroup.id.in_(seat_group_ids))
+                .order_by(SeatGroup.id)
+                .populate_existing()
+                .all()
+            )
+            result = [SeatGroupResponse.model_validate(seat_group) for seat_group in seat_groups]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        user_cache.invalidate(*user_ids)
+        return result
@@ -0,0 +1,348 @@
+# backend/http_metrics.py
+"""ルートごとのリクエスト数・レイテンシ・DB 時間の計測と Prometheus 形式での出力。
+
+MetricsMiddleware がリクエストごとにルート（テンプレート化されたパス）・メソッド・
+ステータスを記録し、SQLAlchemy の before/after_cursor_execute イベントで、その
+リクエスト中に実行したクエリの数と時間を数える。
+
+集計はワーカープロセス内でスレッドごとのシャードに行い、シャードのロックは
+出力時以外は競合しない。gunicorn で複数ワーカーを動かす場合は
+METRICS_MULTIPROC_DIR を指定すると、各ワーカーが METRICS_FLUSH_INTERVAL 秒ごとに
+累計値をそのディレクトリへ書き出し、/metrics は全ワーカーの値を合算して返す。
+終了したワーカーのファイルも累計値として残すため、ディレクトリはデプロイ
+（gunicorn の起動）ごとに空にすること。
+"""
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import METRICS_FLUSH_INTERVAL, METRICS_MULTIPROC_DIR
+
+# レイテンシのヒストグラムのバケット（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# ルーティングされなかったリクエストのルート名（パスをそのままラベルにしない）
+UNMATCHED_ROUTE = "unmatched"
+# ラベルにそのまま使うメソッド。それ以外は OTHER_METHOD にまとめる（系列数を抑える）
+STANDARD_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"}
+)
+OTHER_METHOD = "other"
+
+
+class _Series:
+    """1 系列（メソッド・ルート）のヒストグラムと DB の累計。"""
+
+    __slots__ = ("buckets", "count", "sum", "db_queries", "db_seconds", "db_buckets")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.db_buckets = [0] * len(BUCKETS)
+
+
+def _observe(buckets: list[int], value: float) -> None:
+    # 出力時に累積するため、ここでは該当する最初のバケットだけ数える
+    for index, bound in enumerate(BUCKETS):
+        if value <= bound:
+            buckets[index] += 1
+            return
+
+
+class _Shard:
+    __slots__ = ("lock", "series", "statuses")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series: dict[tuple[str, str], _Series] = {}
+        self.statuses: dict[tuple[str, str, str], int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db_queries: int,
+        db_seconds: float,
+    ) -> None:
+        shard = self._shard()
+        status_key = (method, route, str(status))
+        with shard.lock:
+            series = shard.series.get((method, route))
+            if series is None:
+                series = shard.series[(method, route)] = _Series()
+            series.count += 1
+            series.sum += seconds
+            _observe(series.buckets, seconds)
+            series.db_queries += db_queries
+            series.db_seconds += db_seconds
+            _observe(series.db_buckets, db_seconds)
+            shard.statuses[status_key] = shard.statuses.get(status_key, 0) + 1
+
+    def snapshot(self) -> dict:
+        """全シャードを合算した累計値を JSON にできる形で返す。"""
+        series: dict[str, dict] = {}
+        statuses: dict[str, int] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            with shard.lock:
+                for (method, route), values in shard.series.items():
+                    merged = series.setdefault(
+                        json.dumps([method, route]), _empty_series()
+                    )
+                    _merge_series(merged, _series_to_dict(values))
+                for key, count in shard.statuses.items():
+                    status_key = json.dumps(list(key))
+                    statuses[status_key] = statuses.get(status_key, 0) + count
+        return {"series": series, "statuses": statuses}
+
+    def clear(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                with shard.lock:
+                    shard.series.clear()
+                    shard.statuses.clear()
+
+
+def _empty_series() -> dict:
+    return {
+        "buckets": [0] * len(BUCKETS),
+        "count": 0,
+        "sum": 0.0,
+        "db_queries": 0,
+        "db_seconds": 0.0,
+        "db_buckets": [0] * len(BUCKETS),
+    }
+
+
+def _series_to_dict(series: _Series) -> dict:
+    return {
+        "buckets": list(series.buckets),
+        "count": series.count,
+        "sum": series.sum,
+        "db_queries": series.db_queries,
+        "db_seconds": series.db_seconds,
+        "db_buckets": list(series.db_buckets),
+    }
+
+
+def _merge_series(into: dict, other: dict) -> None:
+    for key in ("count", "sum", "db_queries", "db_seconds"):
+        into[key] += other[key]
+    for key in ("buckets", "db_buckets"):
+        into[key] = [a + b for a, b in zip(into[key], other[key])]
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    merged: dict = {"series": {}, "statuses": {}}
+    for snapshot in snapshots:
+        for key, values in snapshot["series"].items():
+            _merge_series(merged["series"].setdefault(key, _empty_series()), values)
+        for key, count in snapshot["statuses"].items():
+            merged["statuses"][key] = merged["statuses"].get(key, 0) + count
+    return merged
+
+
+class MultiprocessExporter:
+    """各ワーカーの累計値をディレクトリに書き出し、全ワーカー分を読み込む。"""
+
+    def __init__(self, directory: str, flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._next_flush = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        # fork 後のワーカーごとに別のファイルにする
+        return self.directory / f"worker-{os.getpid()}.json"
+
+    def maybe_flush(self, registry: MetricsRegistry) -> None:
+        if self.directory is None or time.monotonic() < self._next_flush:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_flush = time.monotonic() + self.flush_interval
+            self.flush(registry)
+        finally:
+            self._lock.release()
+
+    def flush(self, registry: MetricsRegistry) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(registry.snapshot()))
+        # 読み込み側が書きかけのファイルを見ないよう、置き換えで反映する
+        os.replace(temporary, path)
+
+    def collect(self, registry: MetricsRegistry) -> dict:
+        if self.directory is None:
+            return registry.snapshot()
+        own = registry.snapshot()
+        snapshots = [own]
+        own_path = self.path
+        for path in self.directory.glob("worker-*.json"):
+            if path == own_path:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return merge_snapshots(snapshots)
+
+
+registry = MetricsRegistry()
+exporter = MultiprocessExporter(METRICS_MULTIPROC_DIR)
+
+# リクエスト中の DB クエリ数と時間（[件数, 秒]）。スレッドプールで実行される同期の
+# エンドポイントにもコンテキストが引き継がれるため、同じリストに加算される
+_db_usage: ContextVar[list | None] = ContextVar("db_usage", default=None)
+
+
+# 開始時刻は文ごとの実行コンテキストに持たせる。文が失敗して after_cursor_execute が
+# 呼ばれなくても、コンテキストと一緒に捨てられるため接続に残らない
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _db_usage.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    usage = _db_usage.get()
+    started = getattr(context, "_metrics_started", None)
+    if usage is None or started is None:
+        return
+    usage[0] += 1
+    usage[1] += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """リクエストごとにルート・ステータス・所要時間・DB の利用を記録する ASGI ミドルウェア。"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        usage = [0, 0.0]
+        token = _db_usage.set(usage)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _db_usage.reset(token)
+            route = scope.get("route")
+            method = scope["method"]
+            registry.observe(
+                method if method in STANDARD_METHODS else OTHER_METHOD,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - started,
+                usage[0],
+                usage[1],
+            )
+            exporter.maybe_flush(registry)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram(
+    lines: list[str], name: str, labels: dict, buckets: list[int], total: float, count: int
+) -> None:
+    cumulative = 0
+    for bound, bucket in zip(BUCKETS, buckets):
+        cumulative += bucket
+        lines.append(f"{name}_bucket{_labels(**labels, le=repr(bound))} {cumulative}")
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {count}')
+    lines.append(f"{name}_sum{_labels(**labels)} {total}")
+    lines.append(f"{name}_count{_labels(**labels)} {count}")
+
+
+def render(snapshot: dict) -> str:
+    """集計値を Prometheus のテキスト形式（0.0.4）にする。"""
+    series = sorted((tuple(json.loads(key)), values) for key, values in snapshot["series"].items())
+    statuses = sorted((tuple(json.loads(key)), count) for key, count in snapshot["statuses"].items())
+    lines = [
+        "# HELP http_requests_total Total HTTP requests by route and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in statuses:
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+    lines += [
+        "# HELP http_request_duration_seconds HTTP request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), values in series:
+        _histogram(
+            lines,
+            "http_request_duration_seconds",
+            {"method": method, "route": route},
+            values["buckets"],
+            values["sum"],
+            values["count"],
+        )
+    lines += [
+        "# HELP http_request_db_queries_total Database queries executed while handling requests.",
+        "# TYPE http_request_db_queries_total counter",
+    ]
+    for (method, route), values in series:
+        lines.append(
+            f"http_request_db_queries_total{_labels(method=method, route=route)} {values['db_queries']}"
+        )
+    lines += [
+        "# HELP http_request_db_duration_seconds Database time per request by route.",
+        "# TYPE http_request_db_duration_seconds histogram",
+    ]
+    for (method, route), values in series:
+        _histogram(
+            lines,
+            "http_request_db_duration_seconds",
+            {"method": method, "route": route},
+            values["db_buckets"],
+            values["db_seconds"],
+            values["count"],
+        )
+    return "\n".join(lines) + "\n"
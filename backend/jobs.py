@@ -0,0 +1,140 @@
+# backend/jobs.py
+"""プロセス内の小さなバックグラウンドジョブ実行器。
+
+レスポンス送信後に回したい処理（ログイン時の再ハッシュなど）や、管理者が起動する
+集計処理を専用スレッドで実行する。失敗したジョブは指数バックオフで再試行する。
+状態はプロセス内にだけ保持し、直近 MAX_FINISHED_JOBS 件の完了ジョブを残す。
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# 同時に実行するジョブ数
+JOB_WORKERS = 2
+# 1 ジョブあたりの最大試行回数と、再試行までの初回待ち時間（秒、試行ごとに倍）
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+# 状態を保持する完了ジョブ数
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    """1 件のジョブの状態。"""
+
+    def __init__(self, job_id: int, name: str, max_attempts: int):
+        self.id = job_id
+        self.name = name
+        self.max_attempts = max_attempts
+        # pending / running / succeeded / failed / cancelled
+        self.status = "pending"
+        self.attempts = 0
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self._done = threading.Event()
+        self._future: Future | None = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """完了（成功・失敗・取り消し）まで待つ。timeout 秒以内に完了すれば True。"""
+        return self._done.wait(timeout)
+
+
+class JobRunner:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff: float = RETRY_BACKOFF,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: OrderedDict[int, Job] = OrderedDict()
+
+    def submit(
+        self, name: str, func: Callable[..., Any], *args, max_attempts: int | None = None
+    ) -> Job:
+        """func(*args) をバックグラウンドで実行するジョブを登録して返す。"""
+        with self._lock:
+            job = Job(next(self._ids), name, max_attempts or self.max_attempts)
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="job"
+                )
+            job._future = self._executor.submit(self._run, job, func, args)
+        return job
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        """保持しているジョブを登録順に返す。"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = {"pending": 0, "running": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"workers": self.workers, **counts}
+
+    def shutdown(self) -> None:
+        """実行器を止める。実行中のジョブは完了まで待たない。次の submit で作り直す。
+
+        まだ始まっていないジョブは取り消し、cancelled として完了扱いにする。
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        now = datetime.now(timezone.utc)
+        for job in self.list():
+            if job._future is not None and job._future.cancelled():
+                job.status = "cancelled"
+                job.finished_at = now
+                job._done.set()
+        self._prune()
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple) -> None:
+        job.status = "running"
+        while True:
+            job.attempts += 1
+            try:
+                job.result = func(*args)
+                job.status = "succeeded"
+                break
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                if job.attempts >= job.max_attempts:
+                    logger.error(f"Job {job.name} ({job.id}) failed: {job.error}")
+                    job.status = "failed"
+                    break
+                time.sleep(self.backoff * 2 ** (job.attempts - 1))
+        job.finished_at = datetime.now(timezone.utc)
+        job._done.set()
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job._done.is_set()]
+            for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[job_id]
+
+
+job_runner = JobRunner()
@@ -1,7 +1,6 @@
 # backend/main.py
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from config import (
     SessionLocal,
@@ -15,26 +14,24 @@ from routes.seat_group import seat_group_router
 from routes.ticket_type import ticket_type_router
 from routes.reservation import reservation_router
 from routes.user import user_router
+from routes.availability import availability_router
+from routes.export import export_router
+from routes.checkin import checkin_router
+from routes.calendar import calendar_router
+from routes.reconciliation import reconciliation_router
+from routes.metrics import metrics_router
+from routes.jobs import jobs_router
+from availability import availability_broadcaster
+from rate_limit import rate_limit
+from http_metrics import MetricsMiddleware
+from jobs import job_runner
 from sample_data import initialize_sample_data
 from contextlib import asynccontextmanager
 import logging
 import os
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.middleware import SlowAPIMiddleware
-from slowapi.errors import RateLimitExceeded
 
 logger = logging.getLogger(__name__)
 
-# レート制限設定（デフォルト: 60リクエスト/分 / テスト時は無効）
-_rate_limit_enabled = os.getenv("TESTING", "false").lower() != "true"
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["60/minute"],
-    enabled=_rate_limit_enabled,
-)
-
-
 # ライフスパン
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -48,25 +45,21 @@ async def lifespan(app: FastAPI):
     finally:
         db.close()
 
+    # 残席配信はこのイベントループ上で行う
+    availability_broadcaster.start()
     yield
+    availability_broadcaster.stop()
+    job_runner.shutdown()
     logger.info("アプリケーションを終了します。")
 
 
-app = FastAPI(lifespan=lifespan)
-app.state.limiter = limiter
-app.add_exception_handler(
-    RateLimitExceeded,
-    lambda request, exc: JSONResponse(
-        status_code=429,
-        content={"detail": "リクエストが多すぎます。しばらく待ってから再試行してください。"},
-    ),
-)
+# レート制限はルートごとのコストで全ルートに掛ける（rate_limit.py）
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(rate_limit)])
 
 # データベース初期化(sqliteの場合)
 # Base.metadata.create_all(bind=engine)
 
 # CORS設定
-app.add_middleware(SlowAPIMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -75,6 +68,9 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+# ルートごとのリクエスト数・レイテンシの計測（最も外側で全体の時間を測る）
+app.add_middleware(MetricsMiddleware)
+
 # ルーターの追加
 app.include_router(auth_router)
 app.include_router(event_router)
@@ -83,6 +79,13 @@ app.include_router(seat_group_router)
 app.include_router(ticket_type_router)
 app.include_router(reservation_router)
 app.include_router(user_router)
+app.include_router(availability_router)
+app.include_router(export_router)
+app.include_router(checkin_router)
+app.include_router(calendar_router)
+app.include_router(reconciliation_router)
+app.include_router(metrics_router)
+app.include_router(jobs_router)
 
 
 @app.head("/health")
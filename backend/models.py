@@ -6,7 +6,9 @@ from sqlalchemy import (
     DateTime,
     Float,
     Boolean,
+    Index,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base
@@ -23,15 +25,21 @@ class Event(Base):
     name = Column(String, nullable=False)
     description = Column(String)
     # リレーション: イベントには複数のステージが紐付く
-    stages = relationship("Stage", back_populates="event", cascade="all, delete-orphan")
+    # 子テーブルの削除は DB 側の ON DELETE CASCADE に任せ、ORM では読み込まない（passive_deletes）
+    stages = relationship(
+        "Stage",
+        back_populates="event",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class Stage(Base):
     __tablename__ = "stages"
 
     id = Column(Integer, primary_key=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
-    start_time = Column(DateTime, nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    start_time = Column(DateTime, nullable=False, index=True)  # カレンダーの期間検索用
     end_time = Column(DateTime, nullable=False)
 
     # 同イベント内でのstart_timeは一意である
@@ -40,14 +48,21 @@ class Stage(Base):
     # リレーション: ステージはイベントに紐付いている
     event = relationship("Event", back_populates="stages")
     # リレーション: ステージには複数のシートグループがある
-    seat_groups = relationship("SeatGroup", back_populates="stage", cascade="all, delete-orphan")
+    seat_groups = relationship(
+        "SeatGroup",
+        back_populates="stage",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class SeatGroup(Base):
     __tablename__ = "seat_groups"
 
     id = Column(Integer, primary_key=True)
-    stage_id = Column(Integer, ForeignKey("stages.id"), nullable=False)
+    stage_id = Column(
+        Integer, ForeignKey("stages.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     name = Column(String, nullable=True)
     capacity = Column(Integer, nullable=False)
     total_capacity = Column(Integer, nullable=True)  # 総定員（不変）。capacity は残席数として使用
@@ -55,14 +70,19 @@ class SeatGroup(Base):
     # リレーション: シートグループはステージに紐付いている
     stage = relationship("Stage", back_populates="seat_groups")
     # リレーション: シートグループには複数のチケットタイプがある
-    ticket_types = relationship("TicketType", back_populates="seat_group", cascade="all, delete-orphan")
+    ticket_types = relationship(
+        "TicketType",
+        back_populates="seat_group",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class TicketType(Base):
     __tablename__ = "ticket_types"
 
     id = Column(Integer, primary_key=True)
-    seat_group_id = Column(Integer, ForeignKey("seat_groups.id"), nullable=False)
+    seat_group_id = Column(Integer, ForeignKey("seat_groups.id", ondelete="CASCADE"), nullable=False)
     type_name = Column(String, nullable=False, default="一般")
     price = Column(Float, nullable=False)
 
@@ -72,18 +92,31 @@ class TicketType(Base):
     # リレーション: チケットタイプはステージに紐付いている
     seat_group = relationship("SeatGroup", back_populates="ticket_types")
     # リレーション: チケットタイプには複数の予約がある
-    reservations = relationship("Reservation", back_populates="ticket_type", cascade="all, delete-orphan")
+    reservations = relationship(
+        "Reservation",
+        back_populates="ticket_type",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class Reservation(Base):
     __tablename__ = "reservations"
 
     id = Column(Integer, primary_key=True)
-    ticket_type_id = Column(Integer, ForeignKey("ticket_types.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    ticket_type_id = Column(Integer, ForeignKey("ticket_types.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     num_attendees = Column(Integer, nullable=False)
     is_paid = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    checked_in_at = Column(DateTime, nullable=True)  # 入場済みの場合のみ日時が入る
+
+    # 予約検索の絞り込み・keyset ページング用（id は並べ替えの同値判定に使う）
+    __table_args__ = (
+        Index("ix_reservations_created_at_id", "created_at", "id"),
+        Index("ix_reservations_ticket_type_id_created_at", "ticket_type_id", "created_at"),
+        Index("ix_reservations_user_id_created_at", "user_id", "created_at"),
+    )
 
     # リレーション: 予約はチケットタイプに紐付いている
     ticket_type = relationship("TicketType", back_populates="reservations")
@@ -100,5 +133,44 @@ class User(Base):
     nickname = Column(String)
     is_admin = Column(Boolean, default=False)
 
+    # ユーザー検索（小文字化した部分一致）用の pg_trgm の GIN インデックス
+    # SQLite には部分一致に使えるインデックスがないため、PostgreSQL でだけ作る
+    __table_args__ = (
+        Index(
+            "ix_users_email_search",
+            func.lower(email).label("email_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"email_lower": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_nickname_search",
+            func.lower(nickname).label("nickname_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"nickname_lower": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # リレーション: ユーザーは複数の予約を持つ
-    reservations = relationship("Reservation", back_populates="user", cascade="all, delete-orphan")
+    reservations = relationship(
+        "Reservation",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class RevokedToken(Base):
+    """無効化されたアクセストークン。
+
+    jti があれば個別のトークン（ログアウト）、jti が NULL なら user_id のユーザーが
+    revoked_at より前に発行された全トークン（管理者による強制ログアウト）を表す。
+    expires_at を過ぎた行は対象のトークンも失効しているため削除してよい。
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(32), nullable=True, unique=True)
+    user_id = Column(Integer, nullable=True)
+    revoked_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,105 @@
+# backend/pool_metrics.py
+"""DB コネクションプールの利用状況の計測。
+
+接続の取得待ち時間は QueuePool.connect() を包んで測り（満杯で待った時間と、
+新しい接続を張った時間を含む）、使用中・オーバーフローの接続数はプールの
+checkout / checkin イベントで追う。ワーカー数に対するプールの大きさを決めるため、
+待ち時間が伸びていないか、使用中の最大数が pool_size + max_overflow に
+張り付いていないかを見る。値はプロセスごと。
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.in_use = 0
+            self.max_in_use = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, pool: Pool) -> None:
+        """プールにイベントリスナーを登録する。"""
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def stats(self, pool: Pool) -> dict[str, int | float | str]:
+        with self._lock:
+            stats: dict[str, int | float | str] = {
+                "pool": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0
+                ),
+                "max_wait_ms": self.wait_max * 1000,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                {
+                    "pool_size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(0, pool.overflow()),
+                }
+            )
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """接続の取得にかかった時間を pool_metrics に記録する QueuePool。"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
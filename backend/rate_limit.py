@@ -0,0 +1,258 @@
+# backend/rate_limit.py
+"""ルートごとのコストで重み付けしたレート制限。
+
+各クライアントは RATE_LIMIT_PER_MINUTE 単位/分の予算を持ち、リクエストごとに
+ルートのコスト（ROUTE_COSTS、既定は 1）を消費する。argon2 を使うログインや
+行ロックを取る予約作成は、一覧の取得より多く消費する。判定は GCRA
+（理論到着時刻だけを保持するトークンバケット）で、キー 1 件あたり数値 1 個で済む。
+
+キーは認証済みならユーザーID、そうでなければ接続元 IP アドレス。
+状態の保存先は RATE_LIMIT_STORAGE で選ぶ:
+
+    memory            ワーカープロセス内の dict（ワーカーごとに別々に数える）
+    <ファイルパス>     SQLite ファイル。同じホストの全ワーカーで共有する
+                      （/dev/shm などメモリ上のファイルシステムに置くとよい）
+
+ルートの判定はルーティング後に行う必要があるため、アプリ全体の依存関係として
+組み込み、テンプレート化されたパス（/events/{event_id} など）でコストを引く。
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import jwt
+from fastapi import HTTPException, Request
+from jwt.exceptions import PyJWTError
+
+from config import ALGORITHM, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_STORAGE, SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+# (メソッド, パスのテンプレート) -> 1 リクエストで消費する単位数
+# パスはルートに登録したテンプレートと完全に一致させる（一致しなければ DEFAULT_COST になる）
+ROUTE_COSTS: dict[tuple[str, str], int] = {
+    ("HEAD", "/health"): 0,
+    ("POST", "/token"): 10,
+    ("POST", "/signup"): 10,
+    ("PUT", "/users/{user_id}"): 5,
+    ("POST", "/ticket_types/{ticket_type_id}/reservations"): 5,
+    ("POST", "/reservations/paid"): 5,
+    ("POST", "/reservations/reconcile"): 20,
+    ("GET", "/events/{event_id}/reservations.csv"): 10,
+    ("GET", "/stages/{stage_id}/attendees.csv"): 10,
+    ("GET", "/events/{event_id}/report"): 5,
+    ("POST", "/events/{event_id}/duplicate"): 10,
+    ("POST", "/stages/{stage_id}/checkin-sync"): 5,
+    ("POST", "/users/bulk_delete"): 10,
+    ("DELETE", "/events/{event_id}"): 10,
+}
+DEFAULT_COST = 1
+
+# 検証済みトークン -> (ユーザーID, 有効期限) の保持数
+MAX_TOKEN_CACHE = 10000
+# 期限切れの状態を掃除する間隔（秒）と、1 回の掃除で消す SQLite の行数の上限
+PRUNE_INTERVAL = 60.0
+PRUNE_BATCH = 1000
+# SQLite のロック待ちの上限（ミリ秒）。判定はイベントループ上で行うため、
+# 他のワーカーとの競合で待つのはこの時間までとし、超えたら許可する
+SQLITE_BUSY_TIMEOUT_MS = 5
+
+
+class MemoryStore:
+    """ワーカープロセス内で状態を持つストア。"""
+
+    def __init__(self):
+        self._tats: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, now: float, increment: float, burst: float) -> float | None:
+        """許可なら None、拒否なら再試行までの秒数を返す。"""
+        with self._lock:
+            tat = max(self._tats.get(key, now), now) + increment
+            if tat - now > burst:
+                return tat - now - burst
+            self._tats[key] = tat
+            return None
+
+    def prune(self, now: float) -> bool:
+        """期限切れの状態を消す。消し残しがあれば True を返す。"""
+        with self._lock:
+            self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        return False
+
+
+class SqliteStore:
+    """SQLite ファイルで状態を持ち、同じホストのワーカー間で共有するストア。
+
+    判定は UPSERT 1 文で行い、SQLite のファイルロックで他のワーカーと直列化する。
+    ロック待ちは SQLITE_BUSY_TIMEOUT_MS で打ち切り、判定できなければ許可する。
+    接続はスレッドごとに持つ。
+    """
+
+    _UPSERT = (
+        "INSERT INTO rate_limits (key, tat) VALUES (?1, ?2 + ?3) "
+        "ON CONFLICT (key) DO UPDATE SET tat = max(tat, ?2) + ?3 "
+        "WHERE max(tat, ?2) + ?3 - ?2 <= ?4 "
+        "RETURNING tat"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, isolation_level=None, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            # 状態は失われても制限が一時的に緩むだけなので、fsync は行わない
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+            )
+            # 期限切れの行の掃除を全件走査にしない
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limits_tat ON rate_limits (tat)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def acquire(self, key: str, now: float, increment: float, burst: float) -> float | None:
+        try:
+            connection = self._connection()
+            if connection.execute(self._UPSERT, (key, now, increment, burst)).fetchone():
+                return None
+            tat = connection.execute(
+                "SELECT tat FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            # ストアの障害でサービス全体を止めないよう、判定できなければ許可する
+            logger.warning(f"Rate limit store error: {e}")
+            return None
+        return max(tat[0], now) + increment - now - burst if tat else increment - burst
+
+    def prune(self, now: float) -> bool:
+        """期限切れの行を PRUNE_BATCH 件まで消す。消し残しがあれば True を返す。"""
+        # 書き込みロックを長く持たないよう、1 回に消す件数を抑える
+        try:
+            deleted = self._connection().execute(
+                "DELETE FROM rate_limits WHERE key IN "
+                "(SELECT key FROM rate_limits WHERE tat <= ? LIMIT ?)",
+                (now, PRUNE_BATCH),
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limit store error: {e}")
+            return False
+        return deleted >= PRUNE_BATCH
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: MemoryStore | SqliteStore,
+        per_minute: int = RATE_LIMIT_PER_MINUTE,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.per_minute = per_minute
+        self.enabled = enabled
+        # 1 単位あたりの間隔と、まとめて使える上限（1 分間分）
+        self.interval = 60.0 / per_minute
+        self.burst = 60.0
+        self._tokens: dict[str, tuple[int, float]] = {}
+        self._next_prune = 0.0
+        self.allowed = 0
+        self.rejected = 0
+
+    def key(self, request: Request) -> str:
+        """認証済みならユーザーID、そうでなければ接続元 IP をキーにする。"""
+        access_token = request.cookies.get("access_token")
+        if access_token is not None:
+            user_id = self._user_id(access_token)
+            if user_id is not None:
+                return f"user:{user_id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    def _user_id(self, access_token: str) -> int | None:
+        # 署名の検証は数十µs かかるため、検証済みのトークンは有効期限まで覚えておく
+        now = time.time()
+        cached = self._tokens.get(access_token)
+        if cached is not None:
+            return cached[0] if cached[1] > now else None
+        try:
+            payload = jwt.decode(
+                access_token.removeprefix("Bearer "), SECRET_KEY, algorithms=[ALGORITHM]
+            )
+            user_id = int(payload["sub"])
+        except (PyJWTError, KeyError, ValueError, TypeError):
+            return None
+        if len(self._tokens) >= MAX_TOKEN_CACHE:
+            self._tokens = {}
+        self._tokens[access_token] = (user_id, float(payload.get("exp", now)))
+        return user_id
+
+    def cost(self, method: str, path: str) -> int:
+        return ROUTE_COSTS.get((method, path), DEFAULT_COST)
+
+    def check(self, key: str, cost: int) -> float | None:
+        """cost 単位を消費できれば None、できなければ再試行までの秒数を返す。"""
+        now = time.time()
+        if now >= self._next_prune:
+            self._next_prune = now + PRUNE_INTERVAL
+            # 消し残しがあれば、続きは次のリクエストで消す
+            if self.store.prune(now):
+                self._next_prune = now
+        # 1 分間の予算を超えるコストは予算いっぱいとして扱う（永久に拒否しない）
+        increment = min(cost * self.interval, self.burst)
+        retry_after = self.store.acquire(key, now, increment, self.burst)
+        if retry_after is None:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return retry_after
+
+    def stats(self) -> dict[str, int | float | str]:
+        return {
+            "storage": type(self.store).__name__,
+            "per_minute": self.per_minute,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def create_store(storage: str) -> MemoryStore | SqliteStore:
+    if storage == "memory":
+        return MemoryStore()
+    return SqliteStore(storage)
+
+
+# テスト時は無効
+rate_limiter = RateLimiter(
+    create_store(RATE_LIMIT_STORAGE),
+    enabled=os.getenv("TESTING", "false").lower() != "true",
+)
+
+
+# アプリ全体の依存関係として、ルーティング後・エンドポイントの前に判定する
+# スレッドプールへの受け渡しを避けるため async で実行する。ストアの処理は競合がなければ
+# 数十µs で、SQLite のロック待ちも SQLITE_BUSY_TIMEOUT_MS で打ち切るため、ループを長く止めない
+async def rate_limit(request: Request) -> None:
+    if not rate_limiter.enabled:
+        return
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    cost = rate_limiter.cost(request.method, path)
+    if cost == 0:
+        return
+    retry_after = rate_limiter.check(rate_limiter.key(request), cost)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="リクエストが多すぎます。しばらく待ってから再試行してください。",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
@@ -0,0 +1,319 @@
+# backend/reconciliation.py
+"""銀行振込の明細と未払い予約の照合。
+
+明細 CSV（amount, payer_name, date 列）を読み込み、未払い予約の金額
+（price × num_attendees）とユーザーのニックネームで照合する。
+
+照合は金額をキーにしたブロック単位で行う。未払い予約を一度だけ走査して
+金額ごとのブロックに振り分け、ブロック内では名前の bigram の転置インデックスで
+候補を絞るため、明細 1 行あたりの照合は全件の総当たりにならない。候補には予約
+単体に加え、複数の未払い予約を持つユーザーの合計額（まとめて振り込まれた場合）も
+含める。名前の類似度は NFKC 正規化・かな統一した文字列の SequenceMatcher で測る。
+"""
+import csv
+import heapq
+import io
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from difflib import SequenceMatcher
+
+# 自動で支払済みにする名前の類似度の下限
+MATCH_THRESHOLD = 0.6
+# 1 位と 2 位の候補の類似度がこれより近い場合は自動で確定しない
+AMBIGUITY_MARGIN = 0.1
+# 確認が必要な明細に返す候補数
+MAX_CANDIDATES = 3
+# 明細 1 行あたり名前の類似度を精密に測る候補数
+MAX_RESCORE = 3
+# 1 回に取り込める明細の行数
+MAX_STATEMENT_LINES = 20000
+
+STATEMENT_COLUMNS = ("amount", "payer_name", "date")
+
+# 振込名義に付く法人格の略号や区切り記号（NFKC 正規化後の表記）
+_NAME_NOISE = re.compile(r"\(カ\)|\(ユ\)|カ\)|\(カ|ユ\)|\(ユ|[\s・.,()\-‐]")
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(ord("ぁ"), ord("ゖ") + 1)}
+
+
+@dataclass(frozen=True, slots=True)
+class StatementLine:
+    line: int
+    amount: float
+    payer_name: str
+    date: date
+
+
+@dataclass(frozen=True, slots=True)
+class OpenReservation:
+    reservation_id: int
+    user_id: int
+    nickname: str | None
+    amount: float
+    created_at: datetime | None
+
+
+@dataclass(slots=True)
+class Candidate:
+    reservation_ids: list[int]
+    user_id: int
+    nickname: str | None
+    score: float
+
+
+@dataclass(slots=True)
+class LineResult:
+    statement: StatementLine
+    # matched: 自動で確定 / review: 要確認 / unmatched: 同額の未払い予約なし
+    status: str
+    reservation_ids: list[int] = field(default_factory=list)
+    score: float | None = None
+    candidates: list[Candidate] = field(default_factory=list)
+
+
+class StatementError(ValueError):
+    """明細 CSV の形式が不正な場合に送出する。"""
+
+
+def parse_statement(content: bytes) -> list[StatementLine]:
+    """明細 CSV を読み込む。UTF-8（BOM 可）以外は Shift_JIS (cp932) として扱う。"""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        try:
+            text = content.decode("cp932")
+        except UnicodeDecodeError:
+            raise StatementError("Unsupported encoding")
+    reader = csv.DictReader(io.StringIO(text))
+    if reader.fieldnames is None or not set(STATEMENT_COLUMNS) <= {
+        name.strip() for name in reader.fieldnames
+    }:
+        raise StatementError(f"CSV must have columns: {', '.join(STATEMENT_COLUMNS)}")
+    lines = []
+    for row in reader:
+        row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+        if not any(row.values()):
+            continue
+        if len(lines) >= MAX_STATEMENT_LINES:
+            raise StatementError(f"At most {MAX_STATEMENT_LINES} lines can be imported")
+        line_number = reader.line_num
+        try:
+            amount = float(row["amount"].replace(",", "").replace("¥", "").replace("円", ""))
+            transfer_date = _parse_date(row["date"])
+        except ValueError:
+            raise StatementError(f"Invalid amount or date on line {line_number}")
+        # float は inf・nan・負の数も受け付けるため、照合できない金額はここで弾く
+        if not (math.isfinite(amount) and amount >= 0):
+            raise StatementError(f"Invalid amount or date on line {line_number}")
+        lines.append(
+            StatementLine(
+                line=line_number,
+                amount=amount,
+                payer_name=row["payer_name"],
+                date=transfer_date,
+            )
+        )
+    return lines
+
+
+def _parse_date(value: str) -> date:
+    return date.fromisoformat(value.replace("/", "-"))
+
+
+def normalize_name(name: str | None) -> str:
+    """全角・半角とひらがな・カタカナを揃え、空白や記号を除いた比較用の名前を返す。"""
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKC", name)
+    # ひらがなをカタカナに揃える（振込名義はカタカナ）
+    return _NAME_NOISE.sub("", name.translate(_HIRAGANA_TO_KATAKANA)).lower()
+
+
+def _amount_key(amount: float) -> int:
+    # 浮動小数点の誤差を避けるため 1/100 単位の整数で比較する
+    return round(amount * 100)
+
+
+def _created_on(created_at: datetime | None) -> date:
+    # 作成日時のない予約は振込日との前後を判定できないため、どの振込日の明細とも照合する
+    return created_at.date() if created_at is not None else date.min
+
+
+def _similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def _grams(name: str) -> frozenset[str]:
+    # 2 文字ずつの部分文字列（1 文字の名前はその文字）
+    if len(name) < 2:
+        return frozenset((name,)) if name else frozenset()
+    return frozenset(name[i : i + 2] for i in range(len(name) - 1))
+
+
+class _Block:
+    """同額の候補と、名前の bigram から候補を引く転置インデックス。
+
+    明細 1 行あたり SequenceMatcher で測るのは bigram の一致率（Dice 係数）が高い
+    上位 MAX_RESCORE 件だけにし、同額の候補が多くても照合が線形に遅くならないようにする。
+    """
+
+    __slots__ = ("candidates", "postings")
+
+    def __init__(self):
+        # (reservation_ids, user_id, nickname, 正規化済みニックネーム, bigram, 最新の予約日)
+        self.candidates: list[tuple] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+
+    def add(
+        self,
+        reservation_ids: list[int],
+        user_id: int,
+        nickname: str | None,
+        normalized: str,
+        grams: frozenset[str],
+        created_on: date,
+    ) -> None:
+        index = len(self.candidates)
+        self.candidates.append((reservation_ids, user_id, nickname, normalized, grams, created_on))
+        for gram in grams:
+            self.postings[gram].append(index)
+
+    def search(self, payer: str, transfer_date: date) -> list[Candidate]:
+        """振込名義に近い候補を類似度の降順で返す。振込日より後に作成された予約は除く。"""
+        candidates = self.candidates
+        payer_grams = _grams(payer)
+        shared: Counter[int] = Counter()
+        for gram in payer_grams:
+            shared.update(self.postings.get(gram, ()))
+        if shared:
+            size = len(payer_grams)
+            ranked = heapq.nlargest(
+                MAX_RESCORE,
+                (index for index in shared if candidates[index][5] <= transfer_date),
+                key=lambda index: shared[index] / (size + len(candidates[index][4])),
+            )
+        elif len(candidates) <= MAX_CANDIDATES:
+            # 名前が全く一致しなくても、候補が少なければ確認用に返す
+            ranked = [
+                index for index in range(len(candidates)) if candidates[index][5] <= transfer_date
+            ]
+        else:
+            ranked = []
+        scored = [
+            Candidate(
+                reservation_ids=candidates[index][0],
+                user_id=candidates[index][1],
+                nickname=candidates[index][2],
+                score=round(_similarity(payer, candidates[index][3]), 3),
+            )
+            for index in ranked
+        ]
+        scored.sort(key=lambda candidate: (-candidate.score, candidate.reservation_ids))
+        return scored
+
+
+def build_blocks(
+    reservations: Iterable[OpenReservation], amounts: set[int] | None = None
+) -> dict[int, _Block]:
+    """未払い予約を金額ごとのブロックに振り分ける。
+
+    amounts（_amount_key の集合）を渡した場合は、その金額のブロックだけを作る。
+    """
+    blocks: dict[int, _Block] = defaultdict(_Block)
+    by_user: dict[int, list[OpenReservation]] = defaultdict(list)
+    # 同じユーザーの予約は同じニックネームなので、正規化は名前ごとに 1 回だけ行う
+    names: dict[str | None, tuple[str, frozenset[str]]] = {}
+
+    def name_key(nickname: str | None) -> tuple[str, frozenset[str]]:
+        key = names.get(nickname)
+        if key is None:
+            normalized = normalize_name(nickname)
+            key = names[nickname] = (normalized, _grams(normalized))
+        return key
+
+    for reservation in reservations:
+        by_user[reservation.user_id].append(reservation)
+        key = _amount_key(reservation.amount)
+        if amounts is not None and key not in amounts:
+            continue
+        blocks[key].add(
+            [reservation.reservation_id],
+            reservation.user_id,
+            reservation.nickname,
+            *name_key(reservation.nickname),
+            _created_on(reservation.created_at),
+        )
+    # 複数の未払い予約をまとめて振り込んだ場合の候補
+    for user_id, user_reservations in by_user.items():
+        if len(user_reservations) < 2:
+            continue
+        key = _amount_key(sum(r.amount for r in user_reservations))
+        if amounts is not None and key not in amounts:
+            continue
+        nickname = user_reservations[0].nickname
+        blocks[key].add(
+            sorted(r.reservation_id for r in user_reservations),
+            user_id,
+            nickname,
+            *name_key(nickname),
+            max(_created_on(r.created_at) for r in user_reservations),
+        )
+    return blocks
+
+
+def reconcile(
+    lines: list[StatementLine], reservations: Iterable[OpenReservation]
+) -> list[LineResult]:
+    """明細の各行を未払い予約と照合する。
+
+    同じ予約が複数の明細に一致した場合は類似度の高い明細を優先し、残りは要確認にする。
+    """
+    # 明細に現れる金額のブロックだけを作る
+    blocks = build_blocks(reservations, {_amount_key(line.amount) for line in lines})
+    results: list[LineResult] = []
+    for statement in lines:
+        block = blocks.get(_amount_key(statement.amount))
+        scored = block.search(normalize_name(statement.payer_name), statement.date) if block else []
+        if not scored:
+            results.append(LineResult(statement=statement, status="unmatched"))
+            continue
+        best = scored[0]
+        confident = best.score >= MATCH_THRESHOLD and (
+            len(scored) == 1 or best.score - scored[1].score >= AMBIGUITY_MARGIN
+        )
+        if confident:
+            results.append(
+                LineResult(
+                    statement=statement,
+                    status="matched",
+                    reservation_ids=best.reservation_ids,
+                    score=best.score,
+                    candidates=scored[:MAX_CANDIDATES],
+                )
+            )
+        else:
+            results.append(
+                LineResult(statement=statement, status="review", candidates=scored[:MAX_CANDIDATES])
+            )
+
+    # 同じ予約を取り合う明細は類似度の高い順に確定する
+    claimed: set[int] = set()
+    for result in sorted(
+        (result for result in results if result.status == "matched"),
+        key=lambda result: (-result.score, result.statement.line),
+    ):
+        if claimed.isdisjoint(result.reservation_ids):
+            claimed.update(result.reservation_ids)
+        else:
+            result.status = "review"
+            result.reservation_ids = []
+            result.score = None
+    return results
@@ -1,17 +1,23 @@
 # backend/routes/auth.py
-from fastapi import APIRouter, Cookie, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Cookie, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import datetime, timedelta, timezone
 import os
+import uuid
 import jwt
 from jwt.exceptions import PyJWTError as JWTError
 from pydantic import BaseModel
 
+from crud.revoked_token import CrudRevokedToken
 from crud.user import CrudUser
+from jobs import job_runner
 from config import get_db, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from schemas import UserResponse
+from security import PasswordHasherBusy
+from token_revocation import revocation_list
+from user_cache import user_cache
 
 
 class TokenData(BaseModel):
@@ -21,25 +27,45 @@ class TokenData(BaseModel):
 # アクセストークンを作成する関数
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (
-        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # jti はログアウト時の個別無効化、iat はユーザー単位の無効化の判定に使う
+    # iat は datetime で渡すと秒単位に切り捨てられるため、無効化の時刻と同じ精度で比べられる
+    # よう小数の UNIX 時刻で入れる（RFC 7519 の NumericDate は小数を許す）
+    to_encode.update({"exp": expire, "iat": now.timestamp(), "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# ログイン後の再ハッシュ（ジョブとして実行し、失敗時は再試行される）
+def rehash_password_job(
+    session_factory: sessionmaker, user_id: int, old_hash: str, password: str
+) -> bool:
+    db = session_factory()
+    try:
+        return CrudUser(db).rehash_password(user_id, old_hash, password)
+    finally:
+        db.close()
+
+
 # APIルーターの設定
 auth_router = APIRouter()
 
 
 # トークン発行エンドポイント（HttpOnly Cookie にセット）
+# パスワードの検証は専用プールの完了を await で待ち、リクエスト処理スレッドを占有しない
 @auth_router.post("/token")
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def login_for_access_token(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ) -> JSONResponse:
     crud_user = CrudUser(db)
     try:
-        user = crud_user.authenticate_user(form_data.username, form_data.password)
+        user, stale_hash = await crud_user.authenticate_user(
+            form_data.username, form_data.password
+        )
+    except PasswordHasherBusy:
+        raise
     except HTTPException:
         # M-KK-06: ユーザー列挙防止 — 失敗理由を統一
         raise HTTPException(status_code=400, detail="Invalid credentials")
@@ -57,6 +83,17 @@ def login_for_access_token(
         secure=os.getenv("COOKIE_SECURE", "false").lower() == "true",
         max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     )
+    # bcrypt や旧パラメータのハッシュはレスポンス送信後に再ハッシュする（ログインの待ち時間に含めない）
+    if stale_hash is not None:
+        background_tasks.add_task(
+            job_runner.submit,
+            "rehash_password",
+            rehash_password_job,
+            sessionmaker(bind=db.get_bind()),
+            user.id,
+            stale_hash,
+            form_data.password,
+        )
     return response
 
 
@@ -85,18 +122,25 @@ def get_current_user(
         token_data = TokenData(user_id=user_id)
     except JWTError:
         raise credentials_exception
-    crud_user = CrudUser(db)
-    # TODO: JWTのサーバー側無効化（ブラックリスト/Redis等）は未実装。
-    # 現在はトークン有効期限（ACCESS_TOKEN_EXPIRE_MINUTES）のみで管理。
-    # セキュリティ要件が高まった場合に実装を検討する。
     try:
         user_id_int = int(token_data.user_id)
     except (ValueError, TypeError):
         raise credentials_exception
+    # 無効化の判定はメモリ上の一覧で行う（DB は一定間隔で差分を読むだけ）
+    revocation_list.refresh_if_due(db)
+    if revocation_list.is_revoked(payload.get("jti"), user_id_int, payload.get("iat")):
+        raise credentials_exception
+    # キャッシュにあれば users テーブルを読まない（更新・削除時に無効化される）
+    cached = user_cache.get(user_id_int)
+    if cached is not None:
+        return cached
+    crud_user = CrudUser(db)
     user = crud_user.read_by_id(user_id_int)
     if user is None:
         raise credentials_exception
-    return UserResponse.model_validate(user)
+    current_user = UserResponse.model_validate(user)
+    user_cache.put(current_user)
+    return current_user
 
 
 # 現在のユーザー情報を取得するエンドポイント
@@ -105,9 +149,29 @@ def read_users_me(current_user: UserResponse = Depends(get_current_user)):
     return current_user
 
 
-# ログアウトエンドポイント（Cookie を削除）
+# ログアウトエンドポイント（トークンを無効化して Cookie を削除）
 @auth_router.post("/logout")
-def logout() -> JSONResponse:
+def logout(
+    access_token: str | None = Cookie(default=None), db: Session = Depends(get_db)
+) -> JSONResponse:
+    if access_token is not None:
+        try:
+            payload = jwt.decode(
+                access_token.removeprefix("Bearer "), SECRET_KEY, algorithms=[ALGORITHM]
+            )
+        except JWTError:
+            # 不正・期限切れのトークンは無効化するまでもない
+            payload = {}
+        jti = payload.get("jti")
+        if jti is not None:
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            sub = payload.get("sub")
+            user_id = int(sub) if sub is not None and sub.isdigit() else None
+            crud_revoked_token = CrudRevokedToken(db)
+            # 対象のトークンが失効した行はここで掃除し、テーブルを有効期限内の件数に保つ
+            crud_revoked_token.delete_expired(datetime.now(timezone.utc))
+            crud_revoked_token.revoke_token(jti, user_id, expires_at)
+            revocation_list.add_token(jti, expires_at)
     response = JSONResponse(content={"message": "Logged out"})
     response.delete_cookie("access_token")
     return response
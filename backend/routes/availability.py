@@ -0,0 +1,130 @@
+# backend/routes/availability.py
+from collections.abc import AsyncIterator
+from fastapi import Depends, APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from config import get_db
+from availability import (
+    KEEPALIVE_INTERVAL,
+    Subscription,
+    availability_broadcaster,
+    availability_cache,
+    format_sse,
+)
+from crud.event import CrudEvent
+from crud.seat_group import CrudSeatGroup
+from crud.stage import CrudStage
+from schemas import EventAvailabilityResponse
+
+availability_router = APIRouter()
+
+# 一括取得で指定できるイベント数の上限
+MAX_EVENT_IDS = 100
+
+
+# キャッシュを優先し、足りない分だけ集計クエリで取得する
+def read_availability(db: Session, event_ids: list[int]) -> list[EventAvailabilityResponse]:
+    event_ids = list(dict.fromkeys(event_ids))
+    hits, misses = availability_cache.get_many(event_ids)
+    if misses:
+        for availability in CrudEvent(db).read_availability(misses):
+            availability_cache.put(
+                availability.event_id,
+                [stage.stage_id for stage in availability.stages],
+                availability,
+            )
+            hits[availability.event_id] = availability
+    return [hits[event_id] for event_id in event_ids if event_id in hits]
+
+
+# 接続時点の残席スナップショットを取得する
+def _read_snapshot(db: Session, stage_id: int) -> dict | None:
+    if CrudStage(db).read_by_id(stage_id) is None:
+        return None
+    seat_groups = CrudSeatGroup(db).read_by_stage_id(stage_id)
+    return {
+        "stage_id": stage_id,
+        "seat_groups": [
+            {
+                "id": seat_group.id,
+                "capacity": seat_group.capacity,
+                "total_capacity": seat_group.total_capacity,
+            }
+            for seat_group in sorted(seat_groups, key=lambda sg: sg.id)
+        ],
+    }
+
+
+# SSE 本体: スナップショット送信後、まとめられた更新とキープアライブを流し続ける
+async def availability_event_stream(
+    subscription: Subscription,
+    snapshot: dict,
+    keepalive: float = KEEPALIVE_INTERVAL,
+) -> AsyncIterator[str]:
+    try:
+        yield format_sse("snapshot", snapshot)
+        while True:
+            updates = await subscription.next(keepalive)
+            if updates is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(
+                "capacity",
+                {"stage_id": subscription.stage_id, "seat_groups": updates},
+            )
+    finally:
+        availability_broadcaster.unsubscribe(subscription)
+
+
+# Stageの残席数をSSEで配信（管理者・ユーザー共通）
+@availability_router.get("/stages/{stage_id}/availability/stream")
+async def stream_stage_availability(
+    stage_id: int, db: Session = Depends(get_db)
+) -> StreamingResponse:
+    # スナップショット取得中の更新を取りこぼさないよう先に購読する
+    subscription = availability_broadcaster.subscribe(stage_id)
+    try:
+        snapshot = await run_in_threadpool(_read_snapshot, db, stage_id)
+    except Exception:
+        availability_broadcaster.unsubscribe(subscription)
+        raise
+    finally:
+        # 配信中は DB 接続を保持しない
+        db.close()
+    if snapshot is None:
+        availability_broadcaster.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Stage not found")
+    return StreamingResponse(
+        availability_event_stream(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Eventの残席サマリー取得（管理者・ユーザー共通）
+@availability_router.get(
+    "/events/{event_id}/availability", response_model=EventAvailabilityResponse
+)
+def read_event_availability(
+    event_id: int, db: Session = Depends(get_db)
+) -> EventAvailabilityResponse:
+    availability = read_availability(db, [event_id])
+    if not availability:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return availability[0]
+
+
+# 複数Eventの残席サマリー一括取得（管理者・ユーザー共通）
+# 存在しないイベントIDは結果から除外する
+@availability_router.get(
+    "/availability", response_model=list[EventAvailabilityResponse]
+)
+def read_events_availability(
+    event_ids: list[int] = Query(...), db: Session = Depends(get_db)
+) -> list[EventAvailabilityResponse]:
+    if len(event_ids) > MAX_EVENT_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"event_ids は {MAX_EVENT_IDS} 件まで指定できます"
+        )
+    return read_availability(db, event_ids)
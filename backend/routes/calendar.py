@@ -0,0 +1,82 @@
+# backend/routes/calendar.py
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+from fastapi import Depends, APIRouter, HTTPException, Query
+from sqlalchemy.orm import Session
+from config import CALENDAR_TIMEZONE, get_db
+from crud.calendar import CrudCalendar
+from schemas import (
+    CalendarDay,
+    CalendarEvent,
+    CalendarResponse,
+    CalendarStage,
+    EventPeriodResponse,
+    EventTimelineResponse,
+)
+
+calendar_router = APIRouter()
+
+# 1 回に取得できる最大日数
+MAX_CALENDAR_DAYS = 366
+
+
+# タイムゾーン付きの日時を DB と同じ UTC（タイムゾーンなし）にする
+def _to_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# 日付ごとのイベント・ステージ一覧取得（管理者・ユーザー共通）
+# from / to は CALENDAR_TIMEZONE の日付で、両端を含む
+@calendar_router.get("/calendar", response_model=CalendarResponse)
+def read_calendar(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+) -> CalendarResponse:
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Range must be at most {MAX_CALENDAR_DAYS} days"
+        )
+    tz = ZoneInfo(CALENDAR_TIMEZONE)
+    start = _to_utc(datetime.combine(date_from, time.min, tzinfo=tz))
+    end = _to_utc(datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz))
+
+    crud_calendar = CrudCalendar(db)
+    # ステージは開始日時順なので、日付・イベントの出現順もそのまま時系列になる
+    days: dict[date, dict[int, CalendarEvent]] = {}
+    for stage in crud_calendar.read_stages(start, end):
+        day = stage.start_time.replace(tzinfo=timezone.utc).astimezone(tz).date()
+        events = days.setdefault(day, {})
+        event = events.get(stage.event_id)
+        if event is None:
+            event = events[stage.event_id] = CalendarEvent(
+                event_id=stage.event_id, name=stage.event_name, stages=[]
+            )
+        event.stages.append(
+            CalendarStage(id=stage.id, start_time=stage.start_time, end_time=stage.end_time)
+        )
+    return CalendarResponse(
+        days=[CalendarDay(date=day, events=list(events.values())) for day, events in days.items()]
+    )
+
+
+# 開始前・開始済みに分けたイベント一覧取得（管理者・ユーザー共通）
+# 最初のステージの開始日時で判定する。ステージのないイベントはフロントエンドと同じく
+# どちらにも含めない
+@calendar_router.get("/calendar/events", response_model=EventTimelineResponse)
+def read_event_timeline(db: Session = Depends(get_db)) -> EventTimelineResponse:
+    now = _to_utc(datetime.now(timezone.utc))
+    crud_calendar = CrudCalendar(db)
+    future: list[EventPeriodResponse] = []
+    past: list[EventPeriodResponse] = []
+    for row in crud_calendar.read_event_periods():
+        period = EventPeriodResponse.model_validate(row, from_attributes=True)
+        if period.start_time > now:
+            future.append(period)
+        else:
+            past.append(period)
+    future.sort(key=lambda event: (event.start_time, event.id))
+    past.sort(key=lambda event: (event.start_time, event.id), reverse=True)
+    return EventTimelineResponse(future=future, past=past)
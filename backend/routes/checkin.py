@@ -0,0 +1,147 @@
+# backend/routes/checkin.py
+import hashlib
+from datetime import datetime, timezone
+from fastapi import Depends, APIRouter, Header, HTTPException, Response
+from sqlalchemy.orm import Session
+from config import get_db
+from checkin import create_checkin_token, encode_manifest, verify_checkin_token
+from schemas import (
+    CheckInConflict,
+    CheckInResponse,
+    CheckInSync,
+    CheckInSyncResponse,
+    CheckInTokenResponse,
+    UserResponse,
+)
+from crud.reservation import CrudReservation
+from crud.stage import CrudStage
+from routes.auth import check_admin, get_current_user
+
+checkin_router = APIRouter()
+
+
+# Reservationのチェックイントークン取得（管理者・ユーザー共通）
+# ユーザーは自分の予約のみ取得できる
+@checkin_router.get(
+    "/reservations/{reservation_id}/checkin-token", response_model=CheckInTokenResponse
+)
+def read_checkin_token(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    user: UserResponse = Depends(get_current_user),
+) -> CheckInTokenResponse:
+    reservation_crud = CrudReservation(db)
+    reservation = reservation_crud.read_by_id(reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    if not user.is_admin and reservation.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    return CheckInTokenResponse(
+        reservation_id=reservation_id, token=create_checkin_token(reservation_id)
+    )
+
+
+# チェックイン（管理者のみ）
+# 署名はDBを使わずに検証し、重複スキャンは already_checked_in=True で返す
+@checkin_router.post("/checkin/{token}", response_model=CheckInResponse)
+def check_in(
+    token: str,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> CheckInResponse:
+    reservation_id = verify_checkin_token(token)
+    if reservation_id is None:
+        raise HTTPException(status_code=400, detail="Invalid check-in token")
+    reservation_crud = CrudReservation(db)
+    checked_in = reservation_crud.check_in(reservation_id)
+    if checked_in is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return checked_in
+
+
+# 入場端末用のオフラインマニフェスト取得（管理者のみ）
+# 内容のハッシュを ETag にし、変化がなければ 304 を返す
+@checkin_router.get("/stages/{stage_id}/checkin-manifest")
+def read_checkin_manifest(
+    stage_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> Response:
+    crud_stage = CrudStage(db)
+    if crud_stage.read_by_id(stage_id) is None:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    reservation_crud = CrudReservation(db)
+    manifest = encode_manifest(stage_id, reservation_crud.read_stage_manifest(stage_id))
+    etag = f'"{hashlib.sha256(manifest).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=manifest, media_type="application/octet-stream", headers=headers)
+
+
+# オフラインで記録したチェックインの同期（管理者のみ）
+# 同じ予約の複数スキャンは最も早いものを採用し、反映できなかったものは conflicts で返す
+@checkin_router.post("/stages/{stage_id}/checkin-sync", response_model=CheckInSyncResponse)
+def sync_checkins(
+    stage_id: int,
+    data: CheckInSync,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> CheckInSyncResponse:
+    crud_stage = CrudStage(db)
+    if crud_stage.read_by_id(stage_id) is None:
+        raise HTTPException(status_code=404, detail="Stage not found")
+
+    now = datetime.now(timezone.utc)
+    conflicts: list[CheckInConflict] = []
+    scans: dict[int, datetime] = {}
+    tokens: dict[int, str] = {}
+    for scan in sorted(data.scans, key=lambda scan: _as_utc(scan.scanned_at)):
+        reservation_id = verify_checkin_token(scan.token)
+        if reservation_id is None:
+            conflicts.append(CheckInConflict(token=scan.token, reason="invalid_token"))
+            continue
+        if reservation_id in scans:
+            conflicts.append(
+                CheckInConflict(
+                    token=scan.token,
+                    reservation_id=reservation_id,
+                    reason="duplicate_scan",
+                    checked_in_at=scans[reservation_id],
+                )
+            )
+            continue
+        # 端末の時計が進んでいても未来のチェックイン日時は記録しない
+        scans[reservation_id] = min(_as_utc(scan.scanned_at), now)
+        tokens[reservation_id] = scan.token
+
+    applied: list[int] = []
+    if scans:
+        reservation_crud = CrudReservation(db)
+        applied, existing = reservation_crud.bulk_check_in(stage_id, scans)
+        applied_ids = set(applied)
+        for reservation_id, token in tokens.items():
+            if reservation_id in applied_ids:
+                continue
+            if reservation_id in existing:
+                conflicts.append(
+                    CheckInConflict(
+                        token=token,
+                        reservation_id=reservation_id,
+                        reason="already_checked_in",
+                        checked_in_at=existing[reservation_id],
+                    )
+                )
+            else:
+                conflicts.append(
+                    CheckInConflict(token=token, reservation_id=reservation_id, reason="not_found")
+                )
+    return CheckInSyncResponse(applied=applied, conflicts=conflicts)
+
+
+# タイムゾーンのない日時は UTC とみなす
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
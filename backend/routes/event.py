@@ -3,13 +3,18 @@ import logging
 from fastapi import Depends, APIRouter, HTTPException
 from sqlalchemy.orm import Session
 from config import get_db
+from availability import availability_cache
 from schemas import (
     EventCreate,
     EventUpdate,
     EventResponse,
     EventTimeResponse,
+    EventDuplicate,
+    EventTreeResponse,
+    EventReportResponse,
 )
 from crud.event import CrudEvent
+from crud.report import CrudReport
 from routes.auth import check_admin
 
 logger = logging.getLogger(__name__)
@@ -40,6 +45,20 @@ def read_event_duration(
     return duration
 
 
+# Eventの売上レポート取得（管理者のみ）
+@event_router.get("/events/{event_id}/report", response_model=EventReportResponse)
+def read_event_report(
+    event_id: int,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> EventReportResponse:
+    crud_event = CrudEvent(db)
+    if crud_event.read_by_id(event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    crud_report = CrudReport(db)
+    return crud_report.read_event_report(event_id)
+
+
 # Event一覧取得（管理者・ユーザー共通）
 @event_router.get("/events", response_model=list[EventResponse])
 def read_events(db: Session = Depends(get_db)) -> list[EventResponse]:
@@ -99,6 +118,7 @@ def delete_event(
         raise HTTPException(status_code=404, detail="Event not found")
     try:
         crud_event.delete(event_id)
+        availability_cache.invalidate_event(event_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Event not found")
     except HTTPException:
@@ -106,3 +126,25 @@ def delete_event(
     except Exception as e:
         logger.error(f"Unexpected error deleting event {event_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+# Event複製（管理者のみ）
+# ステージ以下をまとめて複製し、日時は shift_days 日ずらす
+@event_router.post("/events/{event_id}/duplicate", response_model=EventTreeResponse)
+def duplicate_event(
+    event_id: int,
+    data: EventDuplicate,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> EventTreeResponse:
+    crud_event = CrudEvent(db)
+    if crud_event.read_by_id(event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    try:
+        duplicated_event = crud_event.duplicate(event_id, data)
+        return duplicated_event
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error duplicating event {event_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -0,0 +1,81 @@
+# backend/routes/export.py
+import csv
+import io
+from collections.abc import Iterator, Sequence
+from fastapi import Depends, APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+from config import get_db
+from crud.event import CrudEvent
+from crud.export import ATTENDEE_COLUMNS, RESERVATION_COLUMNS, CrudExport
+from crud.stage import CrudStage
+from routes.auth import check_admin
+
+export_router = APIRouter()
+
+# 表計算ソフトで数式として解釈される先頭文字
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# CSV インジェクション対策: 数式として解釈される文字列の先頭に ' を付ける
+def _sanitize(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+# ヘッダーとバッチ単位の行を CSV 文字列として逐次返す
+# 先頭の BOM は Excel で UTF-8 の日本語を正しく開くため
+def _iter_csv(columns: list[str], batches: Iterator[Sequence[Row]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield "\ufeff" + buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_sanitize(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+
+def _csv_response(filename: str, content: Iterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        content,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Eventの予約一覧CSV（管理者のみ）
+@export_router.get("/events/{event_id}/reservations.csv")
+def export_event_reservations(
+    event_id: int,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> StreamingResponse:
+    crud_event = CrudEvent(db)
+    if crud_event.read_by_id(event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    crud_export = CrudExport(db)
+    return _csv_response(
+        f"event_{event_id}_reservations.csv",
+        _iter_csv(RESERVATION_COLUMNS, crud_export.iter_event_reservations(event_id)),
+    )
+
+
+# Stageの来場者一覧CSV（管理者のみ）
+@export_router.get("/stages/{stage_id}/attendees.csv")
+def export_stage_attendees(
+    stage_id: int,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> StreamingResponse:
+    crud_stage = CrudStage(db)
+    if crud_stage.read_by_id(stage_id) is None:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    crud_export = CrudExport(db)
+    return _csv_response(
+        f"stage_{stage_id}_attendees.csv",
+        _iter_csv(ATTENDEE_COLUMNS, crud_export.iter_stage_attendees(stage_id)),
+    )
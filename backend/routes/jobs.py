@@ -0,0 +1,40 @@
+# backend/routes/jobs.py
+from fastapi import Depends, APIRouter, HTTPException
+from sqlalchemy.orm import Session, sessionmaker
+from config import get_db
+from crud.user import CrudUser
+from jobs import job_runner
+from routes.auth import check_admin
+from schemas import JobResponse
+
+jobs_router = APIRouter()
+
+
+# パスワードハッシュの形式ごとの件数を数えるジョブ
+def count_password_hashes_job(session_factory: sessionmaker) -> dict[str, int]:
+    db = session_factory()
+    try:
+        return CrudUser(db).count_password_hashes()
+    finally:
+        db.close()
+
+
+# 残っている bcrypt ハッシュ数の集計を開始（管理者のみ）
+# 平文のパスワードがないと再ハッシュできないため、移行は各ユーザーの次回ログイン時に行われる
+@jobs_router.post("/admin/jobs/password-hashes", response_model=JobResponse, status_code=202)
+def start_password_hash_report(
+    db: Session = Depends(get_db), _: None = Depends(check_admin)
+):
+    return job_runner.submit(
+        "count_password_hashes", count_password_hashes_job, sessionmaker(bind=db.get_bind())
+    )
+
+
+# ジョブの状態の取得（管理者のみ）
+# ジョブはプロセス内で実行されるため、起動したワーカーのものだけが見える
+@jobs_router.get("/admin/jobs/{job_id}", response_model=JobResponse)
+def read_job(job_id: int, _: None = Depends(check_admin)):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
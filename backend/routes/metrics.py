@@ -0,0 +1,39 @@
+# backend/routes/metrics.py
+from typing import Any
+from fastapi import Depends, APIRouter
+from fastapi.responses import PlainTextResponse
+from config import engine
+from http_metrics import exporter, registry, render
+from jobs import job_runner
+from pool_metrics import pool_metrics
+from rate_limit import rate_limiter
+from routes.auth import check_admin
+from security import password_pool
+from token_revocation import revocation_list
+from user_cache import user_cache
+
+metrics_router = APIRouter()
+
+
+# プロセス内の実行状況の取得（管理者のみ）
+# 値はこのリクエストを処理したワーカープロセスのもの
+@metrics_router.get("/admin/metrics")
+def read_metrics(_: None = Depends(check_admin)) -> dict[str, Any]:
+    return {
+        "user_cache": user_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "jobs": job_runner.stats(),
+        "token_revocation": revocation_list.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "db_pool": pool_metrics.stats(engine.pool),
+    }
+
+
+# Prometheus 形式のメトリクス（ルートごとのリクエスト数・レイテンシ・DB 時間）
+# 認証なしで返すため、外部に公開する場合はリバースプロキシで制限すること
+@metrics_router.get("/metrics", include_in_schema=False)
+def read_prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        render(exporter.collect(registry)),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
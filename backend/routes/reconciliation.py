@@ -0,0 +1,64 @@
+# backend/routes/reconciliation.py
+from fastapi import Depends, APIRouter, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from config import get_db
+from crud.reservation import CrudReservation
+from reconciliation import StatementError, parse_statement, reconcile
+from schemas import ReconciliationCandidate, ReconciliationLine, ReconciliationResponse
+from routes.auth import check_admin
+
+reconciliation_router = APIRouter()
+
+# 取り込める明細ファイルの最大サイズ（バイト）
+MAX_STATEMENT_BYTES = 5 * 1024 * 1024
+
+
+# 銀行振込明細の照合（管理者のみ）
+# amount, payer_name, date 列の CSV を未払い予約と照合し、結果を返す
+# apply=true の場合は自動で確定した予約をまとめて支払済みにする
+@reconciliation_router.post("/reservations/reconcile", response_model=ReconciliationResponse)
+def reconcile_statement(
+    file: UploadFile = File(...),
+    apply: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> ReconciliationResponse:
+    content = file.file.read(MAX_STATEMENT_BYTES + 1)
+    if len(content) > MAX_STATEMENT_BYTES:
+        raise HTTPException(status_code=413, detail="Statement file is too large")
+    try:
+        lines = parse_statement(content)
+    except StatementError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    reservation_crud = CrudReservation(db)
+    results = reconcile(lines, reservation_crud.read_open_for_reconciliation())
+    applied_ids: list[int] = []
+    if apply:
+        matched_ids = [
+            reservation_id
+            for result in results
+            if result.status == "matched"
+            for reservation_id in result.reservation_ids
+        ]
+        if matched_ids:
+            applied_ids = reservation_crud.update_paid(matched_ids, True)
+    return ReconciliationResponse(
+        lines=[
+            ReconciliationLine(
+                line=result.statement.line,
+                amount=result.statement.amount,
+                payer_name=result.statement.payer_name,
+                date=result.statement.date,
+                status=result.status,
+                reservation_ids=result.reservation_ids,
+                score=result.score,
+                candidates=[
+                    ReconciliationCandidate.model_validate(candidate)
+                    for candidate in result.candidates
+                ],
+            )
+            for result in results
+        ],
+        applied_ids=applied_ids,
+    )
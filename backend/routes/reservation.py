@@ -1,15 +1,27 @@
 # backend/routes/reservation.py
+import base64
+import binascii
+import json
 import logging
-from fastapi import Depends, APIRouter, HTTPException
+from datetime import datetime, timezone
+from typing import Literal
+from fastapi import Depends, APIRouter, HTTPException, Query
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 from config import get_db
+from availability import notify_capacity_change
 from models import SeatGroup
 from schemas import (
     ReservationCreate,
     ReservationUpdate,
     ReservationResponse,
+    ReservationFilter,
+    ReservationPage,
+    ReservationDetailResponse,
+    ReservationDetailPage,
+    ReservationPaidUpdate,
+    ReservationPaidUpdateResponse,
     SeatGroupResponse,
     SeatGroupUpdate,
     UserResponse,
@@ -33,14 +45,139 @@ def check_capacity(seat_group: SeatGroupResponse, delta: int) -> None:
 
 
 # SeatGroupのcapacityを更新する
-def update_capacity(seat_group: SeatGroupResponse, delta: int, db: Session) -> None:
+def update_capacity(
+    seat_group: SeatGroupResponse, delta: int, db: Session
+) -> SeatGroupResponse:
     seat_group_crud = CrudSeatGroup(db)
-    seat_group_crud.update(
+    return seat_group_crud.update(
         seat_group.id, SeatGroupUpdate(capacity=seat_group.capacity + delta)
     )
 
 
+# ページングのカーソル（前ページ末尾の並べ替えキーと id）を不透明な文字列にする
+def encode_cursor(
+    reservation: ReservationResponse | ReservationDetailResponse, order: str
+) -> str:
+    if order.lstrip("-") == "created_at":
+        key = reservation.created_at.isoformat()
+    else:
+        key = reservation.id
+    payload = json.dumps([key, reservation.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str, order: str) -> tuple[datetime | int, int]:
+    try:
+        key, reservation_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if order.lstrip("-") == "created_at":
+            key = datetime.fromisoformat(key)
+        elif not isinstance(key, int):
+            raise ValueError(key)
+        if not isinstance(reservation_id, int):
+            raise ValueError(reservation_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key, reservation_id
+
+
+# タイムゾーン付きの日時は UTC に揃える
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# 予約検索の条件をクエリパラメータから組み立てる
+def reservation_filter(
+    event_id: int | None = None,
+    stage_id: int | None = None,
+    seat_group_id: int | None = None,
+    ticket_type_id: int | None = None,
+    user_id: int | None = None,
+    is_paid: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> ReservationFilter:
+    return ReservationFilter(
+        event_id=event_id,
+        stage_id=stage_id,
+        seat_group_id=seat_group_id,
+        ticket_type_id=ticket_type_id,
+        user_id=user_id,
+        is_paid=is_paid,
+        created_from=_as_utc(created_from),
+        created_to=_as_utc(created_to),
+    )
+
+
+ReservationOrder = Literal["created_at", "-created_at", "id", "-id"]
+
+
 # Reservation関連のエンドポイント
+# Reservation検索（管理者のみ）
+# 条件は全て AND で結合し、cursor で次ページを取得する
+# /reservations/{reservation_id} より先に登録する
+@reservation_router.get("/reservations/query", response_model=ReservationPage)
+def query_reservations(
+    filters: ReservationFilter = Depends(reservation_filter),
+    order: ReservationOrder = "-created_at",
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=200),
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> ReservationPage:
+    after = decode_cursor(cursor, order) if cursor is not None else None
+    reservation_crud = CrudReservation(db)
+    # 次ページの有無を判定するため 1 件多く取得する
+    reservations = reservation_crud.query(filters, order, limit + 1, after)
+    if len(reservations) <= limit:
+        return ReservationPage(items=reservations)
+    return ReservationPage(
+        items=reservations[:limit],
+        next_cursor=encode_cursor(reservations[limit - 1], order),
+    )
+
+
+# Reservation詳細の検索（管理者のみ）
+# イベント・ステージ等を結合した表示用の予約を返す。条件とページングは /reservations/query と同じ
+@reservation_router.get("/reservations/detailed", response_model=ReservationDetailPage)
+def query_reservation_details(
+    filters: ReservationFilter = Depends(reservation_filter),
+    order: ReservationOrder = "-created_at",
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=200),
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> ReservationDetailPage:
+    after = decode_cursor(cursor, order) if cursor is not None else None
+    reservation_crud = CrudReservation(db)
+    reservations = reservation_crud.query_details(filters, order, limit + 1, after)
+    if len(reservations) <= limit:
+        return ReservationDetailPage(items=reservations)
+    return ReservationDetailPage(
+        items=reservations[:limit],
+        next_cursor=encode_cursor(reservations[limit - 1], order),
+    )
+
+
+# Reservationの支払状況一括更新（管理者のみ）
+# 人数は変わらないため残席数の確認・更新は行わない
+@reservation_router.post("/reservations/paid", response_model=ReservationPaidUpdateResponse)
+def update_reservations_paid(
+    data: ReservationPaidUpdate,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> ReservationPaidUpdateResponse:
+    reservation_crud = CrudReservation(db)
+    reservation_ids = sorted(set(data.reservation_ids))
+    try:
+        updated_ids = reservation_crud.update_paid(reservation_ids, data.is_paid)
+        return ReservationPaidUpdateResponse(updated_ids=updated_ids)
+    except Exception as e:
+        logger.error(f"Unexpected error updating paid status {reservation_ids}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 # Reservation取得（管理者・ユーザー共通）
 @reservation_router.get(
     "/reservations/{reservation_id}", response_model=ReservationResponse
@@ -92,6 +229,29 @@ def read_reservations_by_user_id(
         raise HTTPException(status_code=403, detail="Permission denied")
 
 
+# Userに紐づくReservation詳細一覧取得（管理者・ユーザー共通）
+# イベント・ステージ等を結合した表示用の予約を新しい順に返す
+# ユーザーは自分の予約のみ取得できる
+@reservation_router.get(
+    "/users/{user_id}/reservations/detailed",
+    response_model=list[ReservationDetailResponse],
+)
+def read_reservation_details_by_user_id(
+    user_id: int,
+    db: Session = Depends(get_db),
+    user: UserResponse = Depends(get_current_user),
+) -> list[ReservationDetailResponse]:
+    if not user.is_admin and user_id != user.id:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    user_crud = CrudUser(db)
+    if user_crud.read_by_id(user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    reservation_crud = CrudReservation(db)
+    return reservation_crud.query_details(
+        ReservationFilter(user_id=user_id), "-created_at"
+    )
+
+
 # TicketTypeに紐づくReservation一覧取得（管理者・ユーザー共通）
 # 管理者は全てのチケットタイプの予約を取得できる
 # ユーザーは自分のidが紐づくチケットタイプの予約を取得できる
@@ -145,8 +305,9 @@ def create_reservation(
             raise HTTPException(status_code=404, detail="SeatGroup not found")
         seat_group = SeatGroupResponse.model_validate(seat_group_orm)
         check_capacity(seat_group, -reservation.num_attendees)
-        update_capacity(seat_group, -reservation.num_attendees, db)
+        updated_seat_group = update_capacity(seat_group, -reservation.num_attendees, db)
         created_reservation = reservation_crud.create(ticket_type_id, current_user.id, reservation)
+        notify_capacity_change(updated_seat_group)
         return created_reservation
     except HTTPException:
         db.rollback()
@@ -185,8 +346,10 @@ def update_reservation(
         if data.num_attendees is not None:
             delta = reservation.num_attendees - data.num_attendees
             check_capacity(seat_group, delta)
-            update_capacity(seat_group, delta, db)
+            seat_group = update_capacity(seat_group, delta, db)
         updated_reservation = reservation_crud.update(reservation_id, data)
+        if data.num_attendees is not None:
+            notify_capacity_change(seat_group)
         return updated_reservation
     except HTTPException:
         db.rollback()
@@ -216,8 +379,9 @@ def delete_reservation(
     try:
         ticket_type = ticket_type_crud.read_by_id(reservation.ticket_type_id)
         seat_group = seat_group_crud.read_by_id(ticket_type.seat_group_id)
-        update_capacity(seat_group, reservation.num_attendees, db)
+        updated_seat_group = update_capacity(seat_group, reservation.num_attendees, db)
         reservation_crud.delete(reservation_id)
+        notify_capacity_change(updated_seat_group)
     except HTTPException:
         db.rollback()
         raise
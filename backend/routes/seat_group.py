@@ -3,7 +3,13 @@ import logging
 from fastapi import Depends, APIRouter, HTTPException
 from sqlalchemy.orm import Session
 from config import get_db
-from schemas import SeatGroupCreate, SeatGroupUpdate, SeatGroupResponse
+from availability import availability_cache, notify_capacity_change
+from schemas import (
+    SeatGroupCreate,
+    SeatGroupUpdate,
+    SeatGroupResponse,
+    SeatGroupCapacityBulkUpdate,
+)
 from crud.seat_group import CrudSeatGroup
 from crud.stage import CrudStage
 from routes.auth import check_admin
@@ -65,6 +71,7 @@ def create_seat_group(
         raise HTTPException(status_code=404, detail="Stage not found")
     try:
         created_seat_group = seat_group_crud.create(stage_id, seat_group)
+        notify_capacity_change(created_seat_group)
         return created_seat_group
     except HTTPException:
         raise
@@ -73,6 +80,32 @@ def create_seat_group(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+# Stage内SeatGroupの残席数一括調整（管理者のみ）
+# 増減（delta）で適用するため、並行する予約による残席数の変化を上書きしない
+@seat_group_router.post(
+    "/stages/{stage_id}/seat_groups/capacity", response_model=list[SeatGroupResponse]
+)
+def adjust_seat_group_capacities(
+    stage_id: int,
+    data: SeatGroupCapacityBulkUpdate,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> list[SeatGroupResponse]:
+    stage_crud = CrudStage(db)
+    seat_group_crud = CrudSeatGroup(db)
+    if stage_crud.read_by_id(stage_id) is None:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    try:
+        adjusted_seat_groups = seat_group_crud.adjust_capacities(stage_id, data.adjustments)
+        notify_capacity_change(*adjusted_seat_groups)
+        return adjusted_seat_groups
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error adjusting capacities for stage {stage_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 # SeatGroup更新（管理者のみ）
 @seat_group_router.put("/seat_groups/{seat_group_id}", response_model=SeatGroupResponse)
 def update_seat_group(
@@ -86,6 +119,7 @@ def update_seat_group(
         raise HTTPException(status_code=404, detail="SeatGroup not found")
     try:
         updated_seat_group = seat_group_crud.update(seat_group_id, seat_group)
+        notify_capacity_change(updated_seat_group)
         return updated_seat_group
     except HTTPException:
         raise
@@ -102,10 +136,13 @@ def delete_seat_group(
     _: None = Depends(check_admin),
 ) -> None:
     seat_group_crud = CrudSeatGroup(db)
-    if seat_group_crud.read_by_id(seat_group_id) is None:
+    seat_group = seat_group_crud.read_by_id(seat_group_id)
+    if seat_group is None:
         raise HTTPException(status_code=404, detail="SeatGroup not found")
+    stage_id = seat_group.stage_id
     try:
         seat_group_crud.delete(seat_group_id)
+        availability_cache.invalidate_stage(stage_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="SeatGroup not found")
     except HTTPException:
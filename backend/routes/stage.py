@@ -4,6 +4,7 @@ from fastapi import Depends, APIRouter, HTTPException
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from config import get_db
+from availability import availability_cache
 from schemas import StageCreate, StageUpdate, StageResponse
 from crud.stage import CrudStage
 from crud.event import CrudEvent
@@ -60,6 +61,7 @@ def create_stage(
         raise HTTPException(status_code=404, detail="Event not found")
     try:
         created_stage = stage_crud.create(event_id, stage)
+        availability_cache.invalidate_event(event_id)
         return created_stage
     except IntegrityError:
         raise HTTPException(status_code=409, detail="Start time already exists")
@@ -104,6 +106,7 @@ def delete_stage(
         raise HTTPException(status_code=404, detail="Stage not found")
     try:
         stage_crud.delete(stage_id)
+        availability_cache.invalidate_event(stage.event_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Stage not found")
     except HTTPException:
@@ -1,43 +1,41 @@
 # backend/routes/user.py
 import logging
-from fastapi import Depends, APIRouter, HTTPException
+from datetime import datetime, timedelta, timezone
+from fastapi import Depends, APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from config import get_db
+from config import get_db, ACCESS_TOKEN_EXPIRE_MINUTES
+from availability import notify_capacity_change
 from schemas import (
     UserResponse,
     UserUpdate,
     UserCreate,
-    SeatGroupResponse,
-    SeatGroupUpdate,
+    UserBulkDelete,
+    UserBulkDeleteResponse,
+    UserSearchResponse,
 )
+from crud.revoked_token import CrudRevokedToken
 from crud.user import CrudUser
-from crud.reservation import CrudReservation
-from crud.ticket_type import CrudTicketType
-from crud.seat_group import CrudSeatGroup
 from routes.auth import check_admin, get_current_user
+from security import hash_password_async
+from token_revocation import revocation_list
 
 logger = logging.getLogger(__name__)
 
 user_router = APIRouter()
 
 
-# SeatGroupのcapacityを更新する
-def update_capacity(seat_group: SeatGroupResponse, delta: int, db: Session) -> None:
-    seat_group_crud = CrudSeatGroup(db)
-    seat_group_crud.update(
-        seat_group.id, SeatGroupUpdate(capacity=seat_group.capacity + delta)
-    )
-
-
 # User関連のエンドポイント
 # User登録
+# パスワードのハッシュ化は専用プールの完了を await で待ち、DB の操作はスレッドプールで行う
 @user_router.post("/signup", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)) -> UserResponse:
+async def create_user(user: UserCreate, db: Session = Depends(get_db)) -> UserResponse:
     user_crud = CrudUser(db)
-    if user_crud.read_by_email(user.email) is not None:
+    if await run_in_threadpool(user_crud.read_by_email, user.email) is not None:
         raise HTTPException(status_code=400, detail="Email already registered")
     try:
-        created_user = user_crud.create(user)
+        password_hash = await hash_password_async(user.password)
+        created_user = await run_in_threadpool(user_crud.create, user, password_hash)
         return created_user
     except HTTPException:
         raise
@@ -46,6 +44,24 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)) -> UserResponse
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+# User検索（管理者のみ）
+# メールアドレス・ニックネームの部分一致でページ単位に返す
+# /users/{user_id} より先に登録する
+@user_router.get("/users/search", response_model=UserSearchResponse)
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> UserSearchResponse:
+    user_crud = CrudUser(db)
+    users, has_more = user_crud.search(q, limit, offset)
+    return UserSearchResponse(
+        items=users, next_offset=offset + limit if has_more else None
+    )
+
+
 # User取得（管理者・ユーザー共通）
 @user_router.get("/users/{user_id}", response_model=UserResponse)
 def read_user(
@@ -77,8 +93,9 @@ def read_users(
 # User更新（管理者・ユーザー共通）
 # 管理者は全てのユーザーを更新できる
 # ユーザーは自分の情報のみ更新できる
+# パスワードを変更する場合は /signup と同じく非同期にハッシュ化する
 @user_router.put("/users/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user: UserUpdate,
     db: Session = Depends(get_db),
@@ -86,11 +103,14 @@ def update_user(
 ) -> UserResponse:
     user_crud = CrudUser(db)
     if current_user.is_admin or user_id == current_user.id:
-        update_user = user_crud.read_by_id(user_id)
+        update_user = await run_in_threadpool(user_crud.read_by_id, user_id)
         if update_user is None:
             raise HTTPException(status_code=404, detail="User not found")
         try:
-            updated_user = user_crud.update(user_id, user)
+            password_hash = (
+                await hash_password_async(user.password) if user.password is not None else None
+            )
+            updated_user = await run_in_threadpool(user_crud.update, user_id, user, password_hash)
             return updated_user
         except HTTPException:
             raise
@@ -114,9 +134,6 @@ def delete_user(
         raise HTTPException(status_code=403, detail="Permission denied")
 
     user_crud = CrudUser(db)
-    reservation_crud = CrudReservation(db)
-    ticket_type_crud = CrudTicketType(db)
-    seat_group_crud = CrudSeatGroup(db)
 
     # 削除対象のユーザーを取得
     delete_user = user_crud.read_by_id(user_id)
@@ -128,17 +145,61 @@ def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete an admin user")
 
     try:
-        reservations = reservation_crud.read_by_user_id(user_id)
-        for reservation in reservations:
-            ticket_type = ticket_type_crud.read_by_id(reservation.ticket_type_id)
-            seat_group = seat_group_crud.read_by_id(ticket_type.seat_group_id)
-            update_capacity(seat_group, reservation.num_attendees, db)
-            reservation_crud.delete(reservation.id)
-        user_crud.delete(user_id)
-    except ValueError:
-        raise HTTPException(status_code=404, detail="Resource not found")
+        restored_seat_groups = user_crud.delete_with_reservations([user_id])
+        notify_capacity_change(*restored_seat_groups)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Unexpected error deleting user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+# ユーザーの発行済みトークンを全て無効化（管理者のみ）
+# 無効化の行はこれ以前に発行されたトークンが全て失効する時刻まで残す
+@user_router.post("/users/{user_id}/revoke-tokens", status_code=204)
+def revoke_user_tokens(
+    user_id: int,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> None:
+    if CrudUser(db).read_by_id(user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    revoked_at = datetime.now(timezone.utc)
+    expires_at = revoked_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    try:
+        CrudRevokedToken(db).revoke_user(user_id, revoked_at, expires_at)
+    except Exception as e:
+        logger.error(f"Unexpected error revoking tokens of user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+    revocation_list.add_user(user_id, revoked_at, expires_at)
+
+
+# User一括削除（管理者のみ）
+# 指定ユーザーの予約分の残席数を戻してから、予約とユーザーをまとめて削除する
+@user_router.post("/users/bulk_delete", response_model=UserBulkDeleteResponse)
+def bulk_delete_users(
+    data: UserBulkDelete,
+    db: Session = Depends(get_db),
+    _: None = Depends(check_admin),
+) -> UserBulkDeleteResponse:
+    user_crud = CrudUser(db)
+    user_ids = sorted(set(data.user_ids))
+    users = user_crud.read_by_ids(user_ids)
+    found_ids = {user.id for user in users}
+    missing_ids = [user_id for user_id in user_ids if user_id not in found_ids]
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"User not found: {missing_ids}")
+    admin_ids = sorted(user.id for user in users if user.is_admin)
+    if admin_ids:
+        raise HTTPException(
+            status_code=400, detail=f"Cannot delete an admin user: {admin_ids}"
+        )
+    try:
+        restored_seat_groups = user_crud.delete_with_reservations(user_ids)
+        notify_capacity_change(*restored_seat_groups)
+        return UserBulkDeleteResponse(deleted_user_ids=user_ids)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error deleting users {user_ids}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
+from datetime import date, datetime
+from typing import Any, Literal
 
 
 # イベントのスキーマ
@@ -28,6 +29,57 @@ class EventTimeResponse(BaseModel):
     end_time: datetime
 
 
+# カレンダーのスキーマ
+class CalendarStage(BaseModel):
+    id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class CalendarEvent(BaseModel):
+    event_id: int
+    name: str
+    stages: list[CalendarStage]
+
+
+class CalendarDay(BaseModel):
+    date: date
+    events: list[CalendarEvent]
+
+
+class CalendarResponse(BaseModel):
+    days: list[CalendarDay]
+
+
+# ステージがない場合 start_time / end_time は None
+class EventPeriodResponse(EventResponse):
+    start_time: datetime
+    end_time: datetime
+
+
+class EventTimelineResponse(BaseModel):
+    # 開始前のイベント（開始日時の昇順）
+    future: list[EventPeriodResponse]
+    # 開始済みのイベント（開始日時の降順）
+    past: list[EventPeriodResponse]
+
+
+# 残席サマリーのスキーマ
+class StageAvailabilityResponse(BaseModel):
+    stage_id: int
+    remaining: int
+    total: int
+    sold_out: bool
+
+
+class EventAvailabilityResponse(BaseModel):
+    event_id: int
+    remaining: int
+    total: int
+    sold_out: bool
+    stages: list[StageAvailabilityResponse]
+
+
 # ステージのスキーマ
 class StageBase(BaseModel):
     start_time: datetime
@@ -76,6 +128,30 @@ class SeatGroupResponse(SeatGroupBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# 残席数の一括調整: delta（増減）か total_capacity（新しい総定員）のどちらか一方を指定する
+class SeatGroupCapacityAdjustment(BaseModel):
+    seat_group_id: int
+    delta: int | None = None
+    total_capacity: int | None = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_exactly_one(self) -> "SeatGroupCapacityAdjustment":
+        if (self.delta is None) == (self.total_capacity is None):
+            raise ValueError("delta と total_capacity のどちらか一方を指定してください")
+        return self
+
+
+class SeatGroupCapacityBulkUpdate(BaseModel):
+    adjustments: list[SeatGroupCapacityAdjustment] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def check_unique_seat_groups(self) -> "SeatGroupCapacityBulkUpdate":
+        ids = [adjustment.seat_group_id for adjustment in self.adjustments]
+        if len(ids) != len(set(ids)):
+            raise ValueError("seat_group_id が重複しています")
+        return self
+
+
 # チケットタイプのスキーマ
 class TicketTypeBase(BaseModel):
     type_name: str = Field(..., min_length=1, max_length=50)
@@ -98,6 +174,60 @@ class TicketTypeResponse(TicketTypeBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# イベント複製のスキーマ
+class EventDuplicate(BaseModel):
+    name: str | None = Field(None, min_length=1, max_length=100)
+    shift_days: int = Field(0, ge=-3650, le=3650)
+
+
+class SeatGroupTreeResponse(SeatGroupResponse):
+    ticket_types: list[TicketTypeResponse] = []
+
+
+class StageTreeResponse(StageResponse):
+    seat_groups: list[SeatGroupTreeResponse] = []
+
+
+class EventTreeResponse(EventResponse):
+    stages: list[StageTreeResponse] = []
+
+
+# 売上レポートのスキーマ
+class SalesSummary(BaseModel):
+    reservations: int = 0
+    attendees: int = 0
+    revenue: float = 0
+    paid_reservations: int = 0
+    paid_attendees: int = 0
+    paid_revenue: float = 0
+    unpaid_reservations: int = 0
+    unpaid_attendees: int = 0
+    unpaid_revenue: float = 0
+
+
+class TicketTypeReport(SalesSummary):
+    ticket_type_id: int
+    type_name: str
+    price: float
+
+
+class SeatGroupReport(SalesSummary):
+    seat_group_id: int
+    name: str | None = None
+    ticket_types: list[TicketTypeReport] = []
+
+
+class StageReport(SalesSummary):
+    stage_id: int
+    start_time: datetime
+    seat_groups: list[SeatGroupReport] = []
+
+
+class EventReportResponse(SalesSummary):
+    event_id: int
+    stages: list[StageReport] = []
+
+
 # 予約のスキーマ
 class ReservationBase(BaseModel):
     num_attendees: int = Field(..., ge=1)
@@ -118,10 +248,158 @@ class ReservationResponse(ReservationBase):
     user_id: int
     ticket_type_id: int
     is_paid: bool
+    checked_in_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    # is_paid が NULL の行は未払いとして返す
+    @field_validator("is_paid", mode="before")
+    @classmethod
+    def null_is_unpaid(cls, value: Any) -> Any:
+        return False if value is None else value
+
+
+class ReservationPaidUpdate(BaseModel):
+    reservation_ids: list[int] = Field(..., min_length=1, max_length=1000)
+    is_paid: bool
+
+
+class ReservationPaidUpdateResponse(BaseModel):
+    # 更新対象になった予約ID（存在しないIDは含まない）
+    updated_ids: list[int]
+
+
+# 振込照合のスキーマ
+class ReconciliationCandidate(BaseModel):
+    reservation_ids: list[int]
+    user_id: int
+    nickname: str | None = None
+    # 振込名義とニックネームの類似度（0〜1）
+    score: float
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class ReconciliationLine(BaseModel):
+    line: int
+    amount: float
+    payer_name: str
+    date: date
+    # matched: 自動で確定 / review: 要確認 / unmatched: 同額の未払い予約なし
+    status: Literal["matched", "review", "unmatched"]
+    reservation_ids: list[int]
+    score: float | None = None
+    candidates: list[ReconciliationCandidate]
+
+
+class ReconciliationResponse(BaseModel):
+    lines: list[ReconciliationLine]
+    # apply=true の場合に支払済みにした予約ID
+    applied_ids: list[int]
+
+
+# 予約検索の条件（指定した条件を全て満たす予約を返す）
+class ReservationFilter(BaseModel):
+    event_id: int | None = None
+    stage_id: int | None = None
+    seat_group_id: int | None = None
+    ticket_type_id: int | None = None
+    user_id: int | None = None
+    is_paid: bool | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
+class ReservationPage(BaseModel):
+    items: list[ReservationResponse]
+    # 次ページがなければ None
+    next_cursor: str | None = None
+
+
+# 予約詳細のスキーマ（予約に画面表示用の関連情報を結合したもの）
+class ReservationDetailEvent(BaseModel):
+    id: int
+    name: str
+
+
+class ReservationDetailStage(BaseModel):
+    id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class ReservationDetailSeatGroup(BaseModel):
+    id: int
+    name: str | None = None
+
+
+class ReservationDetailTicketType(BaseModel):
+    id: int
+    type_name: str
+    price: float
+
+
+class ReservationDetailUser(BaseModel):
+    id: int
+    nickname: str | None = None
+    email: str
+
+
+class ReservationDetailResponse(BaseModel):
+    id: int
+    num_attendees: int
+    is_paid: bool
+    created_at: datetime
+    checked_in_at: datetime | None = None
+    event: ReservationDetailEvent
+    stage: ReservationDetailStage
+    seat_group: ReservationDetailSeatGroup
+    ticket_type: ReservationDetailTicketType
+    user: ReservationDetailUser
+
+
+class ReservationDetailPage(BaseModel):
+    items: list[ReservationDetailResponse]
+    # 次ページがなければ None
+    next_cursor: str | None = None
+
+
+# チェックインのスキーマ
+class CheckInTokenResponse(BaseModel):
+    reservation_id: int
+    token: str
+
+
+class CheckInResponse(BaseModel):
+    reservation_id: int
+    num_attendees: int
+    is_paid: bool
+    checked_in_at: datetime
+    # 既にチェックイン済みだった場合（重複スキャン）は True
+    already_checked_in: bool
+
+
+class CheckInScan(BaseModel):
+    token: str = Field(..., max_length=64)
+    scanned_at: datetime
+
+
+class CheckInSync(BaseModel):
+    scans: list[CheckInScan] = Field(..., min_length=1, max_length=5000)
+
+
+class CheckInConflict(BaseModel):
+    token: str
+    reservation_id: int | None = None
+    reason: Literal["invalid_token", "not_found", "already_checked_in", "duplicate_scan"]
+    checked_in_at: datetime | None = None
+
+
+class CheckInSyncResponse(BaseModel):
+    applied: list[int]
+    conflicts: list[CheckInConflict]
+
+
 # ユーザーのスキーマ
 class UserBase(BaseModel):
     email: EmailStr
@@ -143,3 +421,31 @@ class UserResponse(UserBase):
     is_admin: bool
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserBulkDelete(BaseModel):
+    user_ids: list[int] = Field(..., min_length=1, max_length=500)
+
+
+class UserBulkDeleteResponse(BaseModel):
+    deleted_user_ids: list[int]
+
+
+class UserSearchResponse(BaseModel):
+    items: list[UserResponse]
+    # 次ページがなければ None
+    next_offset: int | None = None
+
+
+class JobResponse(BaseModel):
+    id: int
+    name: str
+    # pending / running / succeeded / failed / cancelled
+    status: str
+    attempts: int
+    result: Any = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
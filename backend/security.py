@@ -4,23 +4,169 @@
 argon2id を新規ハッシュ方式とし、verify は argon2 / bcrypt 両形式を prefix で
 自動判定する。bcrypt は既存ユーザー段階移行のためのフォールバック検証専用で、
 新規生成には使わない。
+
+ハッシュ化・検証は専用のスレッドプール（PASSWORD_HASH_WORKERS 本）で実行する。
+実行中と待ち行列の合計が PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT に
+達している場合は待たずに PasswordHasherBusy (503) を送出する。
+エンドポイントからは hash_password_async / verify_password_async を await して使う。
+待っている間はイベントループに戻るため、ログインが集中しても他のエンドポイントが
+使うリクエスト処理スレッド（anyio のスレッドプール）を占有しない。
+同期版の hash_password / verify_password は結果が出るまで呼び出し元のスレッドを
+止めるため、ジョブやスクリプトなどリクエスト処理の外で使う。
 """
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
 import bcrypt
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
+from fastapi import HTTPException
+
+from config import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    PASSWORD_HASH_QUEUE_LIMIT,
+    PASSWORD_HASH_WORKERS,
+)
 
-_ph = PasswordHasher()
+_ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
 _BCRYPT_PREFIX = "$2"  # bcrypt: $2a$ / $2b$ / $2x$ / $2y$
 _ARGON2_PREFIX = "$argon2"
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(HTTPException):
+    """パスワード処理の待ち行列が満杯のときに送出する。"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="混雑しています。しばらく待ってから再試行してください。",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordWorkerPool:
+    """パスワード処理専用の上限付きスレッドプール。
+
+    argon2 / bcrypt は計算中に GIL を解放するため、スレッドで並列に実行できる。
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self._wait_max = 0.0
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        """func をプールで実行し、終わるまで待って結果を返す。満杯なら PasswordHasherBusy を送出する。"""
+        self._admit()
+        try:
+            return self._executor.submit(self._timed, time.perf_counter(), func, *args).result()
+        finally:
+            self._release()
+
+    async def run_async(self, func: Callable[..., T], *args) -> T:
+        """run と同じだが、実行中はスレッドを止めずにイベントループへ戻る。"""
+        self._admit()
+        try:
+            future = self._executor.submit(self._timed, time.perf_counter(), func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # 呼び出し側がキャンセルされても、計算が終わるまでは枠を空けない
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _admit(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        with self._lock:
+            self.in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _timed(self, submitted: float, func: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self._wait_total += started - submitted
+                self._run_total += finished - started
+                self._wait_max = max(self._wait_max, started - submitted)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": self.in_flight - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": self._wait_total / completed * 1000,
+                "max_wait_ms": self._wait_max * 1000,
+                "avg_run_ms": self._run_total / completed * 1000,
+            }
+
+
+password_pool = PasswordWorkerPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
 
 def hash_password(plain: str) -> str:
     """平文パスワードを argon2id ハッシュにして返す。"""
-    return _ph.hash(plain)
+    return password_pool.run(_ph.hash, plain)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """argon2id または bcrypt ハッシュに対して平文を検証する。"""
+    return password_pool.run(_verify_password, plain, hashed)
+
+
+async def hash_password_async(plain: str) -> str:
+    """hash_password の非同期版。"""
+    return await password_pool.run_async(_ph.hash, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password の非同期版。"""
+    return await password_pool.run_async(_verify_password, plain, hashed)
+
+
+def _verify_password(plain: str, hashed: str) -> bool:
     if hashed.startswith(_ARGON2_PREFIX):
         try:
             return _ph.verify(hashed, plain)
@@ -34,6 +180,21 @@ def verify_password(plain: str, hashed: str) -> bool:
     return False
 
 
-def needs_rehash(hashed: str) -> bool:
-    """既存ハッシュが旧形式 (bcrypt) で、argon2 への再ハッシュ対象か判定する。"""
+def is_legacy_hash(hashed: str) -> bool:
+    """bcrypt（段階移行前の形式）のハッシュか判定する。"""
     return hashed.startswith(_BCRYPT_PREFIX)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """既存ハッシュが再ハッシュ対象か判定する。
+
+    bcrypt ハッシュと、現在の設定と異なるパラメータの argon2 ハッシュが対象。
+    """
+    if is_legacy_hash(hashed):
+        return True
+    if hashed.startswith(_ARGON2_PREFIX):
+        try:
+            return _ph.check_needs_rehash(hashed)
+        except InvalidHashError:
+            return False
+    return False
@@ -22,6 +22,8 @@ from fastapi.testclient import TestClient
 from models import Base
 from main import app
 from config import get_db
+from token_revocation import revocation_list
+from user_cache import user_cache
 
 
 # テスト用SQLiteインメモリDB
@@ -43,6 +45,16 @@ def override_get_db():
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """テストごとに DB を作り直すため、ID が再利用される認証ユーザーキャッシュと無効化リストを空にする"""
+    user_cache.clear()
+    revocation_list.clear()
+    yield
+    user_cache.clear()
+    revocation_list.clear()
+
+
 @pytest.fixture(scope="function")
 def db():
     """各テスト関数用のDBセッション"""
@@ -9,6 +9,14 @@ def login(client, email="auth@example.com", password="password123"):
     return client.post("/token", data={"username": email, "password": password})
 
 
+def wait_for_jobs():
+    """ログイン後にバックグラウンドで登録されたジョブの完了を待つ"""
+    from jobs import job_runner
+
+    for job in job_runner.list():
+        assert job.wait(5)
+
+
 def get_headers(client, email="auth@example.com", password="password123"):
     """ログインして Cookie をセット（Cookie 認証のため Authorization ヘッダー不要）"""
     login(client, email, password)
@@ -97,6 +105,89 @@ class TestLogout:
         resp = client.get("/users/me")
         assert resp.status_code == 401
 
+    def test_logged_out_token_is_rejected(self, client, db):
+        """ログアウト後に同じトークンを送っても認証されない"""
+        create_user(db)
+        login(client)
+        token = client.cookies["access_token"]
+        client.post("/logout")
+        client.cookies.set("access_token", token)
+        assert client.get("/users/me").status_code == 401
+        # 別のログインで発行したトークンは有効
+        client.cookies.clear()
+        login(client)
+        assert client.get("/users/me").status_code == 200
+
+
+class TestTokenRevocation:
+    """トークン無効化リストのテスト"""
+
+    def test_refresh_reads_revocations_from_other_workers(self, client, db):
+        """他のワーカーが書いた無効化は差分の読み込みで反映される"""
+        import jwt
+        from datetime import datetime, timezone
+        from config import ALGORITHM, SECRET_KEY
+        from crud.revoked_token import CrudRevokedToken
+        from token_revocation import revocation_list
+
+        user = create_user(db)
+        login(client)
+        assert client.get("/users/me").status_code == 200
+        token = client.cookies["access_token"].strip('"').removeprefix("Bearer ")
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+
+        CrudRevokedToken(db).revoke_token(payload["jti"], user.id, expires_at)
+        assert not revocation_list.is_revoked(payload["jti"], user.id, payload["iat"])
+        revocation_list.refresh(db)
+        assert revocation_list.is_revoked(payload["jti"], user.id, payload["iat"])
+        assert client.get("/users/me").status_code == 401
+
+    def test_admin_revokes_all_tokens_of_user(self, client, db):
+        admin = create_user(db, email="admin@example.com", is_admin=True)
+        user = create_user(db, email="user@example.com")
+        login(client, email="user@example.com")
+        user_token = client.cookies["access_token"]
+
+        login(client, email="admin@example.com")
+        resp = client.post(f"/users/{user.id}/revoke-tokens")
+        assert resp.status_code == 204
+        assert client.post("/users/99999/revoke-tokens").status_code == 404
+        # 管理者自身のトークンは有効なまま
+        assert client.get("/users/me").json()["id"] == admin.id
+
+        client.cookies.set("access_token", user_token)
+        assert client.get("/users/me").status_code == 401
+
+    def test_login_in_same_second_after_revocation(self, client, db):
+        create_user(db, email="admin@example.com", is_admin=True)
+        user = create_user(db, email="user@example.com")
+        login(client, email="admin@example.com")
+        assert client.post(f"/users/{user.id}/revoke-tokens").status_code == 204
+
+        client.cookies.clear()
+        login(client, email="user@example.com")
+        assert client.get("/users/me").json()["id"] == user.id
+
+    def test_token_issued_in_same_second_before_revocation(self):
+        """同じ秒のうちに発行・無効化したトークンは無効、その後に発行したものは有効"""
+        from datetime import datetime, timedelta, timezone
+        from token_revocation import TokenRevocationList
+
+        revocations = TokenRevocationList()
+        issued = datetime(2026, 1, 1, 12, 0, 0, 200000, tzinfo=timezone.utc)
+        revocations.add_user(1, issued + timedelta(milliseconds=300), issued + timedelta(hours=1))
+        relogin = issued + timedelta(milliseconds=500)
+        assert revocations.is_revoked(None, 1, issued.timestamp())
+        assert not revocations.is_revoked(None, 1, relogin.timestamp())
+        # 秒単位の iat を持つ以前のトークンは無効とみなす
+        assert revocations.is_revoked(None, 1, float(int(issued.timestamp())))
+
+    def test_revoke_tokens_requires_admin(self, client, db):
+        user = create_user(db)
+        login(client)
+        assert client.post(f"/users/{user.id}/revoke-tokens").status_code == 403
+
 
 class TestAdminCheck:
     """管理者権限チェックのテスト"""
@@ -213,6 +304,7 @@ class TestPasswordMigration:
         user = self._create_bcrypt_user(db, "migrate@example.com", "bcrypt-pass")
         resp = login(client, email="migrate@example.com", password="bcrypt-pass")
         assert resp.status_code == 200
+        wait_for_jobs()
 
         db.expire(user)
         refreshed = db.get(type(user), user.id)
@@ -247,3 +339,103 @@ class TestPasswordMigration:
         refreshed = db.get(User, user.id)
         # argon2 検証後は再ハッシュしない仕様（同一ハッシュが維持される）
         assert refreshed.password_hash == original_hash
+
+    def test_argon2_with_old_parameters_rehashed(self, client, db):
+        """設定と異なるパラメータの argon2 ハッシュはログイン成功時に再ハッシュされる"""
+        from argon2 import PasswordHasher
+        from models import User
+        from security import needs_rehash
+
+        old_hash = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash("old-params")
+        assert needs_rehash(old_hash)
+        user = User(email="old@example.com", password_hash=old_hash, nickname="旧", is_admin=False)
+        db.add(user)
+        db.commit()
+        resp = login(client, email="old@example.com", password="old-params")
+        assert resp.status_code == 200
+        wait_for_jobs()
+
+        db.expire(user)
+        refreshed = db.get(User, user.id)
+        assert refreshed.password_hash != old_hash
+        assert not needs_rehash(refreshed.password_hash)
+
+    def test_rehash_skipped_when_password_changed(self, db):
+        """検証後にパスワードが変更されていれば、再ハッシュで上書きしない"""
+        from crud.user import CrudUser
+
+        user = self._create_bcrypt_user(db, "changed@example.com", "bcrypt-pass")
+        old_hash = user.password_hash
+        user.password_hash = "$argon2id$changed"
+        db.commit()
+        assert CrudUser(db).rehash_password(user.id, old_hash, "bcrypt-pass") is False
+        db.expire(user)
+        assert user.password_hash == "$argon2id$changed"
+
+
+class TestPasswordWorkerPool:
+    """パスワード処理プールのテスト"""
+
+    def test_rejects_when_full(self):
+        import threading
+        from security import PasswordHasherBusy, PasswordWorkerPool
+
+        pool = PasswordWorkerPool(workers=1, queue_limit=0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        result = []
+        worker = threading.Thread(target=lambda: result.append(pool.run(block)))
+        worker.start()
+        assert started.wait(5)
+        with pytest.raises(PasswordHasherBusy):
+            pool.run(lambda: None)
+        release.set()
+        worker.join(5)
+        assert result == ["done"]
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["rejected"] == 1
+        assert stats["in_flight"] == 0
+        assert pool.run(lambda: "ok") == "ok"
+
+    def test_run_async_rejects_when_full(self):
+        import asyncio
+        import threading
+        from security import PasswordHasherBusy, PasswordWorkerPool
+
+        pool = PasswordWorkerPool(workers=1, queue_limit=0)
+        release = threading.Event()
+
+        async def main():
+            first = asyncio.ensure_future(pool.run_async(release.wait, 5))
+            await asyncio.sleep(0)
+            with pytest.raises(PasswordHasherBusy):
+                await pool.run_async(lambda: None)
+            release.set()
+            assert await first is True
+            assert await pool.run_async(lambda: "ok") == "ok"
+
+        asyncio.run(main())
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        assert stats["in_flight"] == 0
+
+    def test_login_returns_503_when_busy(self, client, db, monkeypatch):
+        from security import PasswordHasherBusy, password_pool
+
+        create_user(db)
+
+        async def busy(*args):
+            raise PasswordHasherBusy()
+
+        monkeypatch.setattr(password_pool, "run_async", busy)
+        resp = login(client)
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "1"
@@ -0,0 +1,120 @@
+# tests/test_availability_stream.py
+"""残席配信（SSE）のテスト"""
+import json
+from datetime import datetime
+
+from availability import AvailabilityBroadcaster, availability_broadcaster, format_sse
+from models import Event, Stage, SeatGroup, TicketType
+from routes.availability import availability_event_stream
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def make_chain(db, capacity=10):
+    """Event -> Stage -> SeatGroup -> TicketType を作成"""
+    event = Event(name="テストイベント", description="説明")
+    db.add(event)
+    db.commit()
+    stage = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 10, 0),
+        end_time=datetime(2025, 6, 1, 12, 0),
+    )
+    db.add(stage)
+    db.commit()
+    sg = SeatGroup(stage_id=stage.id, capacity=capacity, total_capacity=capacity)
+    db.add(sg)
+    db.commit()
+    tt = TicketType(seat_group_id=sg.id, type_name="一般", price=1000)
+    db.add(tt)
+    db.commit()
+    return stage, sg, tt
+
+
+def parse_sse(chunk):
+    """SSE イベント文字列を (event, data) に分解"""
+    lines = chunk.strip().split("\n")
+    event = lines[0].removeprefix("event: ")
+    data = json.loads(lines[1].removeprefix("data: "))
+    return event, data
+
+
+class TestAvailabilityBroadcaster:
+    async def test_updates_are_coalesced_per_stage(self):
+        broadcaster = AvailabilityBroadcaster(interval=0.01)
+        broadcaster.start()
+        subscription = broadcaster.subscribe(1)
+        broadcaster.publish(1, 10, 5, 10)
+        broadcaster.publish(1, 10, 4, 10)
+        broadcaster.publish(1, 11, 7, 8)
+        updates = await subscription.next(timeout=1)
+        assert updates == [
+            {"id": 10, "capacity": 4, "total_capacity": 10},
+            {"id": 11, "capacity": 7, "total_capacity": 8},
+        ]
+        broadcaster.stop()
+
+    async def test_other_stage_is_not_notified(self):
+        broadcaster = AvailabilityBroadcaster(interval=0.01)
+        broadcaster.start()
+        subscription = broadcaster.subscribe(1)
+        broadcaster.publish(2, 20, 3, 5)
+        assert await subscription.next(timeout=0.05) is None
+        broadcaster.stop()
+
+    async def test_unsubscribe(self):
+        broadcaster = AvailabilityBroadcaster(interval=0.01)
+        broadcaster.start()
+        subscription = broadcaster.subscribe(1)
+        assert broadcaster.subscriber_count(1) == 1
+        broadcaster.unsubscribe(subscription)
+        assert broadcaster.subscriber_count() == 0
+
+    def test_publish_without_loop_is_noop(self):
+        broadcaster = AvailabilityBroadcaster()
+        broadcaster.publish(1, 10, 5, 10)
+        assert broadcaster.subscriber_count() == 0
+
+    async def test_event_stream_sends_snapshot_then_updates(self):
+        availability_broadcaster.start()
+        subscription = availability_broadcaster.subscribe(1)
+        snapshot = {"stage_id": 1, "seat_groups": []}
+        stream = availability_event_stream(subscription, snapshot, keepalive=0.05)
+        assert await anext(stream) == format_sse("snapshot", snapshot)
+        assert await anext(stream) == ": keepalive\n\n"
+        availability_broadcaster.publish(1, 10, 2, 10)
+        chunk = await anext(stream)
+        while chunk == ": keepalive\n\n":
+            chunk = await anext(stream)
+        event, data = parse_sse(chunk)
+        assert event == "capacity"
+        assert data == {
+            "stage_id": 1,
+            "seat_groups": [{"id": 10, "capacity": 2, "total_capacity": 10}],
+        }
+        await stream.aclose()
+        assert availability_broadcaster.subscriber_count(1) == 0
+        availability_broadcaster.stop()
+
+
+class TestAvailabilityStreamEndpoint:
+    def test_stream_stage_not_found(self, client):
+        resp = client.get("/stages/9999/availability/stream")
+        assert resp.status_code == 404
+        assert availability_broadcaster.subscriber_count() == 0
+
+    def test_reservation_publishes_capacity(self, client, db, monkeypatch):
+        published = []
+        monkeypatch.setattr(
+            availability_broadcaster,
+            "publish",
+            lambda *args: published.append(args),
+        )
+        create_user(db, email="user@test.com")
+        stage, sg, tt = make_chain(db, capacity=10)
+        client.post("/token", data={"username": "user@test.com", "password": "password123"})
+        resp = client.post(f"/ticket_types/{tt.id}/reservations", json={"num_attendees": 3})
+        assert resp.status_code == 200
+        assert published == [(stage.id, sg.id, 7, 10)]
@@ -1,9 +1,10 @@
 # tests/test_crud.py
 """CRUDレイヤーのテスト"""
+import asyncio
 import pytest
 from datetime import datetime
 
-from models import Event, Stage, SeatGroup, TicketType, User
+from models import Event, Stage, SeatGroup, TicketType, Reservation, User
 from crud.event import CrudEvent
 from crud.user import CrudUser
 from schemas import EventCreate, EventUpdate, UserCreate
@@ -50,6 +51,35 @@ class TestCrudEvent:
         crud.delete(event.id)
         assert crud.read_by_id(event.id) is None
 
+    def test_delete_event_cascades_in_database(self, db):
+        crud = CrudEvent(db)
+        event = crud.create(EventCreate(name="削除対象", description="説明"))
+        user = User(email="cascade@example.com", password_hash="x", nickname="n")
+        stage = Stage(
+            event_id=event.id,
+            start_time=datetime(2025, 1, 1, 10, 0),
+            end_time=datetime(2025, 1, 1, 12, 0),
+        )
+        db.add_all([user, stage])
+        db.commit()
+        seat_group = SeatGroup(stage_id=stage.id, capacity=10)
+        db.add(seat_group)
+        db.commit()
+        ticket_type = TicketType(seat_group_id=seat_group.id, type_name="一般", price=1000)
+        db.add(ticket_type)
+        db.commit()
+        db.add(Reservation(ticket_type_id=ticket_type.id, user_id=user.id, num_attendees=2))
+        db.commit()
+        db.expunge_all()
+
+        crud.delete(event.id)
+        # 子テーブルは ORM に読み込まれず、DB 側の ON DELETE CASCADE で消える
+        assert db.query(Stage).count() == 0
+        assert db.query(SeatGroup).count() == 0
+        assert db.query(TicketType).count() == 0
+        assert db.query(Reservation).count() == 0
+        assert db.query(User).count() == 1
+
     def test_get_event_time_no_stages(self, db):
         crud = CrudEvent(db)
         event = crud.create(EventCreate(name="イベント", description="説明"))
@@ -116,8 +146,21 @@ class TestCrudUser:
             password="password123"
         ))
 
-        user = crud.authenticate_user("test@example.com", "password123")
+        user, stale_hash = asyncio.run(crud.authenticate_user("test@example.com", "password123"))
         assert user.email == "test@example.com"
+        assert stale_hash is None
+
+    def test_authenticate_user_returns_stale_bcrypt_hash(self, db):
+        import bcrypt
+
+        bcrypt_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4)).decode("utf-8")
+        db.add(User(email="legacy@example.com", password_hash=bcrypt_hash, is_admin=False))
+        db.commit()
+
+        crud = CrudUser(db)
+        user, stale_hash = asyncio.run(crud.authenticate_user("legacy@example.com", "password123"))
+        assert user.email == "legacy@example.com"
+        assert stale_hash == bcrypt_hash
 
     def test_authenticate_user_wrong_password(self, db):
         crud = CrudUser(db)
@@ -128,7 +171,7 @@ class TestCrudUser:
 
         from fastapi import HTTPException
         with pytest.raises(HTTPException) as exc_info:
-            crud.authenticate_user("test@example.com", "wrongpassword")
+            asyncio.run(crud.authenticate_user("test@example.com", "wrongpassword"))
         assert exc_info.value.status_code == 400
 
     def test_authenticate_user_not_found(self, db):
@@ -136,5 +179,5 @@ class TestCrudUser:
 
         from fastapi import HTTPException
         with pytest.raises(HTTPException) as exc_info:
-            crud.authenticate_user("notfound@example.com", "password")
+            asyncio.run(crud.authenticate_user("notfound@example.com", "password"))
         assert exc_info.value.status_code == 400
@@ -0,0 +1,78 @@
+# tests/test_generate_data.py
+"""合成データ生成のテスト"""
+import sys
+
+import pytest
+from sqlalchemy import func, select
+
+from benchmarks.generate_data import Volumes, generate, main
+from models import Event, Stage, SeatGroup, TicketType, Reservation, User
+
+
+def test_generate_volumes_and_consistent_capacity(db):
+    volumes = Volumes(
+        events=3,
+        stages_per_event=2,
+        seat_groups_per_stage=2,
+        ticket_types_per_seat_group=2,
+        users=20,
+        reservations=300,
+    )
+    generate(db, volumes, password_hash="$argon2id$dummy", seed=1)
+
+    def count(model):
+        return db.scalar(select(func.count()).select_from(model))
+
+    assert count(Event) == 3
+    assert count(Stage) == 6
+    assert count(SeatGroup) == 12
+    assert count(TicketType) == 24
+    assert count(User) == 20
+    assert count(Reservation) == 300
+    # 残席数 = 総定員 - 予約人数の合計
+    reserved = dict(
+        db.execute(
+            select(TicketType.seat_group_id, func.sum(Reservation.num_attendees))
+            .join(Reservation, Reservation.ticket_type_id == TicketType.id)
+            .group_by(TicketType.seat_group_id)
+        ).all()
+    )
+    for seat_group in db.scalars(select(SeatGroup)):
+        assert seat_group.capacity >= 0
+        assert seat_group.capacity == seat_group.total_capacity - reserved.get(seat_group.id, 0)
+    assert db.scalar(select(func.count(func.distinct(User.password_hash)))) == 1
+
+
+def test_generate_more_ticket_types_than_names(db):
+    # 種別名の数（5）を超えても同じシートグループ内で名前が重複しない
+    volumes = Volumes(
+        events=1,
+        stages_per_event=1,
+        seat_groups_per_stage=1,
+        ticket_types_per_seat_group=12,
+        users=5,
+        reservations=50,
+    )
+    generate(db, volumes, password_hash="$argon2id$dummy", seed=1)
+
+    names = db.scalars(select(TicketType.type_name).order_by(TicketType.id)).all()
+    assert len(names) == len(set(names)) == 12
+    assert names[:6] == ["一般", "学生", "シニア", "子供", "招待", "一般2"]
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        "--events",
+        "--stages-per-event",
+        "--seat-groups-per-stage",
+        "--ticket-types-per-seat-group",
+        "--users",
+    ],
+)
+def test_main_rejects_reservations_without_ticket_types_or_users(option, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["generate_data", "--reservations", "10", option, "0"])
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+    assert exc_info.value.code == 2
+    assert f"--reservations requires {option} to be at least 1" in capsys.readouterr().err
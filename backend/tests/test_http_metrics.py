@@ -0,0 +1,94 @@
+# tests/test_http_metrics.py
+"""Prometheus 形式のメトリクスのテスト"""
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from http_metrics import MetricsRegistry, MultiprocessExporter, _db_usage, registry, render
+from models import Event
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def test_records_templated_route_status_and_db_queries(client, db):
+    event = Event(name="イベント", description="説明")
+    db.add(event)
+    db.commit()
+    assert client.get(f"/events/{event.id}").status_code == 200
+    assert client.get("/events/99999").status_code == 404
+    assert client.get("/no-such-path").status_code == 404
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+    assert 'http_requests_total{method="GET",route="/events/{event_id}",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/events/{event_id}",status="404"} 1' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/events/{event_id}"} 2' in body
+    )
+    queries = next(
+        line
+        for line in body.splitlines()
+        if line.startswith('http_request_db_queries_total{method="GET",route="/events/{event_id}"}')
+    )
+    assert int(queries.rsplit(" ", 1)[1]) >= 2
+
+
+def test_non_standard_methods_share_one_label(client):
+    client.request("PURGE", "/events")
+    client.request("X-RANDOM-1", "/events")
+    body = client.get("/metrics").text
+    assert 'method="other"' in body
+    assert "PURGE" not in body
+    assert "X-RANDOM-1" not in body
+
+
+def test_failed_statement_does_not_leave_start_time(db):
+    usage = [0, 0.0]
+    token = _db_usage.set(usage)
+    try:
+        connection = db.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM no_such_table"))
+        db.rollback()
+        connection = db.connection()
+        connection.execute(text("SELECT 1"))
+    finally:
+        _db_usage.reset(token)
+    assert usage[0] == 1
+
+
+def test_render_cumulative_buckets():
+    local = MetricsRegistry()
+    local.observe("GET", "/events", 200, 0.004, 1, 0.001)
+    local.observe("GET", "/events", 200, 0.3, 3, 0.2)
+    body = render(local.snapshot())
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/events",le="0.005"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/events",le="0.5"} 2' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/events",le="+Inf"} 2' in body
+    assert 'http_request_db_queries_total{method="GET",route="/events"} 4' in body
+
+
+def test_multiprocess_collect_merges_workers(tmp_path):
+    other = MetricsRegistry()
+    other.observe("GET", "/events", 200, 0.01, 1, 0.001)
+    (tmp_path / "worker-1.json").write_text(json.dumps(other.snapshot()))
+
+    local = MetricsRegistry()
+    local.observe("GET", "/events", 200, 0.02, 2, 0.002)
+    exporter = MultiprocessExporter(str(tmp_path))
+    exporter.flush(local)
+    assert exporter.path.exists()
+
+    body = render(exporter.collect(local))
+    assert 'http_requests_total{method="GET",route="/events",status="200"} 2' in body
+    assert 'http_request_db_queries_total{method="GET",route="/events"} 3' in body
@@ -0,0 +1,89 @@
+# tests/test_jobs.py
+"""バックグラウンドジョブのテスト"""
+import bcrypt
+
+from jobs import JobRunner, job_runner
+from models import User
+from tests.helpers import create_user
+
+
+class TestJobRunner:
+    def test_retries_until_success(self):
+        runner = JobRunner(workers=1, max_attempts=3, backoff=0)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RuntimeError("temporary")
+            return "ok"
+
+        job = runner.submit("flaky", flaky)
+        assert job.wait(5)
+        assert job.status == "succeeded"
+        assert job.attempts == 2
+        assert job.result == "ok"
+        runner.shutdown()
+
+    def test_fails_after_max_attempts(self):
+        runner = JobRunner(workers=1, max_attempts=2, backoff=0)
+
+        def broken():
+            raise RuntimeError("boom")
+
+        job = runner.submit("broken", broken)
+        assert job.wait(5)
+        assert job.status == "failed"
+        assert job.attempts == 2
+        assert job.error == "RuntimeError: boom"
+        assert runner.stats()["failed"] == 1
+        runner.shutdown()
+
+    def test_shutdown_cancels_pending_jobs(self):
+        import threading
+
+        runner = JobRunner(workers=1, backoff=0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        running = runner.submit("block", block)
+        assert started.wait(5)
+        pending = runner.submit("pending", lambda: None)
+        runner.shutdown()
+        assert pending.wait(0)
+        assert pending.status == "cancelled"
+        assert pending.attempts == 0
+        assert runner.stats()["cancelled"] == 1
+        release.set()
+        assert running.wait(5)
+        assert running.status == "succeeded"
+
+
+class TestPasswordHashReport:
+    def test_counts_bcrypt_hashes(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        legacy = bcrypt.hashpw(b"legacy-pass", bcrypt.gensalt(rounds=4)).decode("utf-8")
+        db.add(User(email="legacy@test.com", password_hash=legacy, nickname="旧", is_admin=False))
+        db.commit()
+        client.post("/token", data={"username": "admin@test.com", "password": "password123"})
+
+        resp = client.post("/admin/jobs/password-hashes")
+        assert resp.status_code == 202
+        job = job_runner.get(resp.json()["id"])
+        assert job.wait(5)
+
+        resp = client.get(f"/admin/jobs/{job.id}")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["status"] == "succeeded"
+        assert body["result"] == {"bcrypt": 1, "outdated_argon2": 0, "current": 1}
+        assert client.get("/admin/jobs/999999").status_code == 404
+
+    def test_requires_admin(self, client, db):
+        create_user(db, email="user@test.com")
+        client.post("/token", data={"username": "user@test.com", "password": "password123"})
+        assert client.post("/admin/jobs/password-hashes").status_code == 403
@@ -0,0 +1,31 @@
+# tests/test_migrations.py
+"""Alembic マイグレーションのテスト"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+def test_upgrade_and_downgrade_on_sqlite(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migration.sqlite3'}"
+    # alembic.ini を読むとロギングの設定が置き換わるため、ファイルなしで設定する
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.set_main_option("sqlalchemy.url", url)
+
+    command.upgrade(config, "head")
+    engine = create_engine(url)
+    foreign_keys = inspect(engine).get_foreign_keys("reservations")
+    assert {fk["name"] for fk in foreign_keys} == {
+        "reservations_ticket_type_id_fkey",
+        "reservations_user_id_fkey",
+    }
+    assert all(fk["options"].get("ondelete") == "CASCADE" for fk in foreign_keys)
+
+    command.downgrade(config, "base")
+    assert "reservations" not in inspect(engine).get_table_names()
+    command.upgrade(config, "head")
+    engine.dispose()
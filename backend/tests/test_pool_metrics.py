@@ -0,0 +1,56 @@
+# tests/test_pool_metrics.py
+"""DB コネクションプールの計測のテスト"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from pool_metrics import MeteredQueuePool, PoolMetrics, pool_metrics
+from tests.helpers import create_user
+
+
+@pytest.fixture
+def metered_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    metrics = PoolMetrics()
+    metrics.attach(engine.pool)
+    pool_metrics.reset()
+    yield engine, metrics
+    engine.dispose()
+    pool_metrics.reset()
+
+
+def test_tracks_in_use_overflow_and_timeouts(metered_engine):
+    engine, metrics = metered_engine
+    first = engine.connect()
+    second = engine.connect()
+    stats = metrics.stats(engine.pool)
+    assert stats["in_use"] == 2
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    # pool_size + max_overflow を使い切ると pool_timeout で諦める
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+
+    stats = metrics.stats(engine.pool)
+    assert stats["in_use"] == 0
+    assert stats["max_in_use"] == 2
+    assert stats["checkouts"] == 2
+    global_stats = pool_metrics.stats(engine.pool)
+    assert global_stats["timeouts"] == 1
+    assert global_stats["max_wait_ms"] >= 50
+
+
+def test_metrics_endpoint_includes_db_pool(client, db):
+    create_user(db, email="admin@example.com", is_admin=True)
+    client.post("/token", data={"username": "admin@example.com", "password": "password123"})
+    resp = client.get("/admin/metrics")
+    assert resp.status_code == 200
+    assert {"in_use", "max_in_use", "avg_wait_ms", "timeouts"} <= resp.json()["db_pool"].keys()
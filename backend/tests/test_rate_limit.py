@@ -0,0 +1,161 @@
+# tests/test_rate_limit.py
+"""レート制限のテスト"""
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from main import app
+from models import Event, Stage, SeatGroup, TicketType
+from rate_limit import (
+    PRUNE_BATCH,
+    ROUTE_COSTS,
+    MemoryStore,
+    RateLimiter,
+    SqliteStore,
+    rate_limiter,
+)
+from tests.helpers import create_user
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SqliteStore(str(tmp_path / "rate_limit.sqlite3"))
+
+
+class TestRateLimiter:
+    def test_budget_is_consumed_by_cost(self, store):
+        limiter = RateLimiter(store, per_minute=60)
+        # 1 分間の予算 60 単位のうち、コスト 10 は 6 回まで
+        for _ in range(6):
+            assert limiter.check("ip:1", 10) is None
+        retry_after = limiter.check("ip:1", 10)
+        assert retry_after is not None and 0 < retry_after <= 10
+        # 別のキーは別の予算
+        assert limiter.check("ip:2", 10) is None
+        assert limiter.stats()["rejected"] == 1
+
+    def test_shared_between_stores_on_same_file(self, tmp_path):
+        """同じ SQLite ファイルを使うワーカー同士で予算を共有する"""
+        path = str(tmp_path / "shared.sqlite3")
+        first = RateLimiter(SqliteStore(path), per_minute=60)
+        second = RateLimiter(SqliteStore(path), per_minute=60)
+        assert first.check("user:1", 30) is None
+        assert second.check("user:1", 30) is None
+        assert first.check("user:1", 1) is not None
+        assert second.check("user:1", 1) is not None
+
+    def test_cost_above_budget_is_capped(self, store):
+        limiter = RateLimiter(store, per_minute=10)
+        assert limiter.check("ip:1", 100) is None
+        assert limiter.check("ip:1", 1) is not None
+
+    def test_sqlite_fails_open_quickly_when_locked(self, tmp_path):
+        """他のワーカーが書き込みロックを持っていても待たずに許可する"""
+        path = str(tmp_path / "locked.sqlite3")
+        store = SqliteStore(path)
+        assert store.acquire("ip:1", time.time(), 100.0, 60.0) is None
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.perf_counter()
+            assert store.acquire("ip:1", time.time(), 100.0, 60.0) is None
+            assert time.perf_counter() - started < 0.5
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+    def test_sqlite_prunes_in_batches(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "prune.sqlite3"))
+        connection = store._connection()
+        connection.executemany(
+            "INSERT INTO rate_limits (key, tat) VALUES (?, ?)",
+            [(f"ip:{i}", 1.0) for i in range(PRUNE_BATCH + 10)] + [("ip:live", 100.0)],
+        )
+        assert store.prune(50.0) is True
+        assert store.prune(50.0) is False
+        assert connection.execute("SELECT key FROM rate_limits").fetchall() == [("ip:live",)]
+
+
+def test_route_costs_match_registered_routes():
+    """ROUTE_COSTS のキーはすべて実在するルートのテンプレートと一致する"""
+    routes = {
+        (method.upper(), path)
+        for path, operations in app.openapi()["paths"].items()
+        for method in operations
+    }
+    assert set(ROUTE_COSTS) - routes == set()
+
+
+class TestRateLimitEndpoints:
+    @pytest.fixture
+    def limiter(self, monkeypatch):
+        monkeypatch.setattr(rate_limiter, "store", MemoryStore())
+        monkeypatch.setattr(rate_limiter, "enabled", True)
+        return rate_limiter
+
+    def test_reservation_create_uses_route_cost(self, client, db, limiter, monkeypatch):
+        create_user(db)
+        event = Event(name="イベント", description="説明")
+        db.add(event)
+        db.flush()
+        stage = Stage(
+            event_id=event.id,
+            start_time=datetime(2025, 6, 1, 10, 0),
+            end_time=datetime(2025, 6, 1, 12, 0),
+        )
+        db.add(stage)
+        db.flush()
+        seat_group = SeatGroup(stage_id=stage.id, capacity=10)
+        db.add(seat_group)
+        db.flush()
+        ticket_type = TicketType(seat_group_id=seat_group.id, type_name="一般", price=1000.0)
+        db.add(ticket_type)
+        db.commit()
+        client.post("/token", data={"username": "auth@example.com", "password": "password123"})
+
+        costs = []
+        check = limiter.check
+
+        def recording_check(key, cost):
+            costs.append(cost)
+            return check(key, cost)
+
+        monkeypatch.setattr(limiter, "check", recording_check)
+        resp = client.post(
+            f"/ticket_types/{ticket_type.id}/reservations", json={"num_attendees": 1}
+        )
+        assert resp.status_code == 200
+        assert costs == [5]
+
+    def test_login_costs_more_than_reads(self, client, db, limiter):
+        create_user(db)
+        for _ in range(6):
+            resp = client.post(
+                "/token", data={"username": "auth@example.com", "password": "wrong-password"}
+            )
+            assert resp.status_code == 400
+        resp = client.post(
+            "/token", data={"username": "auth@example.com", "password": "wrong-password"}
+        )
+        assert resp.status_code == 429
+        assert int(resp.headers["retry-after"]) >= 1
+        # ヘルスチェックはコスト 0
+        assert client.head("/health").status_code == 200
+
+    def test_authenticated_requests_keyed_by_user(self, client, db, limiter):
+        user = create_user(db)
+        client.post("/token", data={"username": "auth@example.com", "password": "password123"})
+        token = client.cookies["access_token"].strip('"')
+        assert limiter._user_id(token) == user.id
+        for _ in range(50):
+            assert client.get("/users/me").status_code == 200
+        # 未認証のクライアントは IP 単位の予算（ログインで 10 消費済み）を使う
+        client.cookies.clear()
+        for _ in range(50):
+            assert client.get("/events").status_code == 200
+        # テスト中の経過時間分だけ予算が戻るため、数回の余裕を見る
+        assert 429 in {client.get("/events").status_code for _ in range(5)}
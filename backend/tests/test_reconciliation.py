@@ -0,0 +1,165 @@
+# tests/test_reconciliation.py
+"""振込照合のテスト"""
+from datetime import date, datetime
+
+import pytest
+
+from models import Event, Stage, SeatGroup, TicketType, Reservation
+from reconciliation import (
+    OpenReservation,
+    StatementError,
+    StatementLine,
+    normalize_name,
+    parse_statement,
+    reconcile,
+)
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def auth_headers(client, email="admin@test.com", password="password123"):
+    """ログインして Cookie をセット"""
+    client.post("/token", data={"username": email, "password": password})
+    return {}
+
+
+def open_reservation(
+    reservation_id, user_id, nickname, amount, created_at=datetime(2025, 5, 1, 10, 0)
+):
+    return OpenReservation(
+        reservation_id=reservation_id,
+        user_id=user_id,
+        nickname=nickname,
+        amount=amount,
+        created_at=created_at,
+    )
+
+
+def statement_line(line, amount, payer_name):
+    return StatementLine(line=line, amount=amount, payer_name=payer_name, date=date(2025, 5, 10))
+
+
+class TestReconciliationEngine:
+    def test_normalize_name(self):
+        assert normalize_name("ﾔﾏﾀﾞ ﾀﾛｳ") == "ヤマダタロウ"
+        assert normalize_name("やまだ　たろう") == "ヤマダタロウ"
+        assert normalize_name("ｶ)ﾔﾏﾀﾞｼｮｳｼﾞ") == "ヤマダショウジ"
+        assert normalize_name(None) == ""
+
+    def test_parse_statement(self):
+        content = "amount,payer_name,date\n3000,ﾔﾏﾀﾞ ﾀﾛｳ,2025/05/10\n\n\"1,500\",スズキ,2025-05-11\n"
+        lines = parse_statement(content.encode("cp932"))
+        assert [(line.line, line.amount, line.date) for line in lines] == [
+            (2, 3000.0, date(2025, 5, 10)),
+            (4, 1500.0, date(2025, 5, 11)),
+        ]
+        with pytest.raises(StatementError):
+            parse_statement(b"value,name\n1,a\n")
+        with pytest.raises(StatementError):
+            parse_statement(b"amount,payer_name,date\nabc,a,2025-01-01\n")
+        for amount in ("inf", "nan", "-500", "1e400"):
+            with pytest.raises(StatementError):
+                parse_statement(f"amount,payer_name,date\n{amount},a,2025-01-01\n".encode())
+
+    def test_reconcile(self):
+        reservations = [
+            open_reservation(1, 10, "やまだ たろう", 3000),
+            open_reservation(2, 11, "すずき はなこ", 3000),
+            open_reservation(3, 12, "さとう", 1000),
+            open_reservation(4, 12, "さとう", 2000),
+            open_reservation(5, 13, "たなか", 5000),
+        ]
+        lines = [
+            statement_line(2, 3000, "ﾔﾏﾀﾞ ﾀﾛｳ"),
+            # 同じユーザーの未払い予約の合計額
+            statement_line(3, 3000, "ｻﾄｳ"),
+            statement_line(4, 5000, "ｷﾑﾗ"),
+            statement_line(5, 7000, "ﾀﾅｶ"),
+        ]
+        results = {result.statement.line: result for result in reconcile(lines, reservations)}
+        assert results[2].status == "matched"
+        assert results[2].reservation_ids == [1]
+        assert results[3].status == "matched"
+        assert results[3].reservation_ids == [3, 4]
+        assert results[4].status == "review"
+        assert results[4].candidates[0].reservation_ids == [5]
+        assert results[5].status == "unmatched"
+
+    def test_reconcile_conflicting_lines(self):
+        reservations = [open_reservation(1, 10, "やまだ", 3000)]
+        lines = [statement_line(2, 3000, "ﾔﾏﾀﾞ ｼﾞﾛｳ"), statement_line(3, 3000, "ﾔﾏﾀﾞ")]
+        results = {result.statement.line: result for result in reconcile(lines, reservations)}
+        # より名前が近い明細を優先する
+        assert results[3].status == "matched"
+        assert results[2].status == "review"
+
+
+    def test_reconcile_without_created_at(self):
+        """作成日時が NULL の予約も、振込日を問わず照合の候補にする"""
+        reservations = [
+            open_reservation(1, 10, "やまだ", 3000, created_at=None),
+            open_reservation(2, 11, "さとう", 1000, created_at=None),
+            open_reservation(3, 11, "さとう", 2000),
+        ]
+        lines = [statement_line(2, 3000, "ﾔﾏﾀﾞ"), statement_line(3, 3000, "ｻﾄｳ")]
+        results = {result.statement.line: result for result in reconcile(lines, reservations)}
+        assert results[2].status == "matched"
+        assert results[2].reservation_ids == [1]
+        assert results[3].status == "matched"
+        assert results[3].reservation_ids == [2, 3]
+
+
+class TestReconciliationEndpoint:
+    def test_reconcile_and_apply(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com", nickname="やまだ")
+        event = Event(name="イベント", description="説明")
+        db.add(event)
+        db.commit()
+        stage = Stage(
+            event_id=event.id,
+            start_time=datetime(2025, 6, 1, 10, 0),
+            end_time=datetime(2025, 6, 1, 12, 0),
+        )
+        db.add(stage)
+        db.commit()
+        sg = SeatGroup(stage_id=stage.id, capacity=10)
+        db.add(sg)
+        db.commit()
+        tt = TicketType(seat_group_id=sg.id, type_name="一般", price=1500)
+        db.add(tt)
+        db.commit()
+        reservation = Reservation(
+            ticket_type_id=tt.id,
+            user_id=user.id,
+            num_attendees=2,
+            created_at=datetime(2025, 5, 1, 10, 0),
+        )
+        db.add(reservation)
+        db.commit()
+        headers = auth_headers(client)
+        csv_content = "amount,payer_name,date\n3000,ﾔﾏﾀﾞ,2025-05-10\n999,ｽｽﾞｷ,2025-05-10\n"
+        files = {"file": ("statement.csv", csv_content.encode("utf-8"), "text/csv")}
+
+        resp = client.post("/reservations/reconcile", files=files, headers=headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [line["status"] for line in body["lines"]] == ["matched", "unmatched"]
+        assert body["lines"][0]["reservation_ids"] == [reservation.id]
+        assert body["applied_ids"] == []
+
+        resp = client.post(
+            "/reservations/reconcile", params={"apply": "true"}, files=files, headers=headers
+        )
+        assert resp.json()["applied_ids"] == [reservation.id]
+        db.refresh(reservation)
+        assert reservation.is_paid is True
+
+    def test_reconcile_invalid_csv(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        files = {"file": ("statement.csv", b"foo,bar\n1,2\n", "text/csv")}
+        resp = client.post("/reservations/reconcile", files=files, headers=headers)
+        assert resp.status_code == 400
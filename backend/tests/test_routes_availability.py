@@ -0,0 +1,114 @@
+# tests/test_routes_availability.py
+"""残席サマリーエンドポイントのテスト"""
+import pytest
+from datetime import datetime
+
+from availability import availability_cache
+from models import Event, Stage, SeatGroup, TicketType
+from tests.helpers import create_user
+
+
+@pytest.fixture(autouse=True)
+def clear_availability_cache():
+    """テスト間でキャッシュを持ち越さない"""
+    availability_cache.clear()
+    yield
+    availability_cache.clear()
+
+
+# --- ヘルパー関数 ---
+
+
+def make_event(db, name="テストイベント"):
+    """イベントを作成"""
+    event = Event(name=name, description="説明")
+    db.add(event)
+    db.commit()
+    db.refresh(event)
+    return event
+
+
+def make_stage(db, event_id, start_hour=10):
+    """ステージを作成"""
+    stage = Stage(
+        event_id=event_id,
+        start_time=datetime(2025, 6, 1, start_hour, 0),
+        end_time=datetime(2025, 6, 1, start_hour + 2, 0),
+    )
+    db.add(stage)
+    db.commit()
+    db.refresh(stage)
+    return stage
+
+
+def make_seat_group(db, stage_id, capacity, total_capacity):
+    """シートグループを作成"""
+    sg = SeatGroup(stage_id=stage_id, capacity=capacity, total_capacity=total_capacity)
+    db.add(sg)
+    db.commit()
+    db.refresh(sg)
+    return sg
+
+
+class TestAvailabilityEndpoints:
+    def test_event_availability(self, client, db):
+        event = make_event(db)
+        stage1 = make_stage(db, event.id, start_hour=10)
+        stage2 = make_stage(db, event.id, start_hour=14)
+        make_seat_group(db, stage1.id, capacity=3, total_capacity=10)
+        make_seat_group(db, stage1.id, capacity=0, total_capacity=5)
+        make_seat_group(db, stage2.id, capacity=0, total_capacity=8)
+        resp = client.get(f"/events/{event.id}/availability")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["remaining"] == 3
+        assert data["total"] == 23
+        assert data["sold_out"] is False
+        assert data["stages"] == [
+            {"stage_id": stage1.id, "remaining": 3, "total": 15, "sold_out": False},
+            {"stage_id": stage2.id, "remaining": 0, "total": 8, "sold_out": True},
+        ]
+
+    def test_event_without_stages(self, client, db):
+        event = make_event(db)
+        resp = client.get(f"/events/{event.id}/availability")
+        assert resp.status_code == 200
+        assert resp.json() == {
+            "event_id": event.id,
+            "remaining": 0,
+            "total": 0,
+            "sold_out": False,
+            "stages": [],
+        }
+
+    def test_event_availability_not_found(self, client):
+        resp = client.get("/events/9999/availability")
+        assert resp.status_code == 404
+
+    def test_multiple_events_availability(self, client, db):
+        event1 = make_event(db, name="イベント1")
+        event2 = make_event(db, name="イベント2")
+        stage = make_stage(db, event2.id)
+        make_seat_group(db, stage.id, capacity=4, total_capacity=4)
+        resp = client.get(
+            "/availability",
+            params={"event_ids": [event2.id, 9999, event1.id]},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [item["event_id"] for item in data] == [event2.id, event1.id]
+        assert data[0]["remaining"] == 4
+
+    def test_cache_invalidated_by_reservation(self, client, db):
+        create_user(db, email="user@test.com")
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg = make_seat_group(db, stage.id, capacity=5, total_capacity=5)
+        tt = TicketType(seat_group_id=sg.id, type_name="一般", price=1000)
+        db.add(tt)
+        db.commit()
+        assert client.get(f"/events/{event.id}/availability").json()["remaining"] == 5
+        client.post("/token", data={"username": "user@test.com", "password": "password123"})
+        resp = client.post(f"/ticket_types/{tt.id}/reservations", json={"num_attendees": 2})
+        assert resp.status_code == 200
+        assert client.get(f"/events/{event.id}/availability").json()["remaining"] == 3
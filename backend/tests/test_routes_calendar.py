@@ -0,0 +1,73 @@
+# tests/test_routes_calendar.py
+"""カレンダーエンドポイントのテスト"""
+from datetime import datetime, timedelta, timezone
+
+from models import Event, Stage
+
+
+# --- ヘルパー関数 ---
+
+
+def make_event(db, name, stage_times):
+    """イベントと (開始, 終了) ごとのステージを作成（日時は UTC）"""
+    event = Event(name=name, description="説明")
+    db.add(event)
+    db.commit()
+    for start, end in stage_times:
+        db.add(Stage(event_id=event.id, start_time=start, end_time=end))
+    db.commit()
+    db.refresh(event)
+    return event
+
+
+class TestCalendar:
+    def test_calendar_groups_by_local_day(self, client, db):
+        # 2025-06-01 15:30 UTC は JST では 06-02 00:30
+        concert = make_event(
+            db,
+            "コンサート",
+            [
+                (datetime(2025, 6, 1, 1, 0), datetime(2025, 6, 1, 3, 0)),
+                (datetime(2025, 6, 1, 15, 30), datetime(2025, 6, 1, 17, 0)),
+            ],
+        )
+        play = make_event(db, "演劇", [(datetime(2025, 6, 1, 5, 0), datetime(2025, 6, 1, 7, 0))])
+        make_event(db, "範囲外", [(datetime(2025, 7, 1, 5, 0), datetime(2025, 7, 1, 7, 0))])
+
+        resp = client.get("/calendar", params={"from": "2025-06-01", "to": "2025-06-02"})
+        assert resp.status_code == 200
+        days = resp.json()["days"]
+        assert [day["date"] for day in days] == ["2025-06-01", "2025-06-02"]
+        assert [event["event_id"] for event in days[0]["events"]] == [concert.id, play.id]
+        assert days[0]["events"][0]["stages"][0]["start_time"] == "2025-06-01T01:00:00"
+        assert [event["name"] for event in days[1]["events"]] == ["コンサート"]
+
+    def test_calendar_invalid_range(self, client, db):
+        resp = client.get("/calendar", params={"from": "2025-06-02", "to": "2025-06-01"})
+        assert resp.status_code == 400
+        resp = client.get("/calendar", params={"from": "2025-01-01", "to": "2026-12-31"})
+        assert resp.status_code == 400
+
+    def test_event_timeline(self, client, db):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        past_old = make_event(db, "過去1", [(now - timedelta(days=30), now - timedelta(days=29))])
+        past_new = make_event(db, "過去2", [(now - timedelta(days=2), now - timedelta(days=1))])
+        # 開始済みで終了前のイベントも開始済みに含める
+        ongoing = make_event(
+            db,
+            "開催中",
+            [
+                (now - timedelta(hours=1), now + timedelta(hours=1)),
+                (now + timedelta(days=1), now + timedelta(days=1, hours=2)),
+            ],
+        )
+        future_far = make_event(db, "未来2", [(now + timedelta(days=30), now + timedelta(days=31))])
+        future_near = make_event(db, "未来1", [(now + timedelta(days=3), now + timedelta(days=4))])
+        # ステージのないイベントはどちらにも含めない（フロントエンドと同じ）
+        make_event(db, "未定", [])
+
+        resp = client.get("/calendar/events")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [e["id"] for e in body["future"]] == [future_near.id, future_far.id]
+        assert [e["id"] for e in body["past"]] == [ongoing.id, past_new.id, past_old.id]
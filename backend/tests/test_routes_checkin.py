@@ -0,0 +1,226 @@
+# tests/test_routes_checkin.py
+"""チェックインのテスト"""
+from datetime import datetime
+
+import pytest
+
+from checkin import (
+    STATUS_CHECKED_IN,
+    STATUS_PAID,
+    create_checkin_token,
+    decode_manifest,
+    encode_manifest,
+    verify_checkin_token,
+)
+from models import Event, Stage, SeatGroup, TicketType, Reservation
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def auth_headers(client, email="admin@test.com", password="password123"):
+    """ログインして Cookie をセット"""
+    client.post("/token", data={"username": email, "password": password})
+    return {}
+
+
+def make_reservation(db, user_id, num_attendees=2, is_paid=True):
+    """Event -> Stage -> SeatGroup -> TicketType -> Reservation を作成"""
+    event = Event(name="イベント", description="説明")
+    db.add(event)
+    db.commit()
+    stage = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 10, 0),
+        end_time=datetime(2025, 6, 1, 12, 0),
+    )
+    db.add(stage)
+    db.commit()
+    sg = SeatGroup(stage_id=stage.id, capacity=10)
+    db.add(sg)
+    db.commit()
+    tt = TicketType(seat_group_id=sg.id, type_name="一般", price=1000)
+    db.add(tt)
+    db.commit()
+    reservation = Reservation(
+        ticket_type_id=tt.id, user_id=user_id, num_attendees=num_attendees, is_paid=is_paid
+    )
+    db.add(reservation)
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+
+class TestCheckInToken:
+    def test_roundtrip(self):
+        token = create_checkin_token(42)
+        assert token.startswith("42.")
+        assert verify_checkin_token(token) == 42
+
+    def test_tampered_token(self):
+        signature = create_checkin_token(42).split(".")[1]
+        assert verify_checkin_token(f"43.{signature}") is None
+        assert verify_checkin_token("42.") is None
+        assert verify_checkin_token("042." + signature) is None
+        assert verify_checkin_token("abc.def") is None
+        assert verify_checkin_token("42.ｓｉｇ") is None
+
+
+class TestCheckInManifest:
+    def test_encode_decode(self):
+        data = encode_manifest(7, [(1, 2, True, False), (5, 1, False, True), (9, 4, True, True)])
+        assert len(data) == 16 + 3 * (4 + 2 + 1)
+        stage_id, rows = decode_manifest(data)
+        assert stage_id == 7
+        assert rows == [
+            (1, 2, STATUS_PAID),
+            (5, 1, STATUS_CHECKED_IN),
+            (9, 4, STATUS_PAID | STATUS_CHECKED_IN),
+        ]
+
+    def test_decode_rejects_unknown_format(self):
+        data = bytearray(encode_manifest(1, []))
+        data[0:4] = b"XXXX"
+        with pytest.raises(ValueError):
+            decode_manifest(bytes(data))
+
+
+class TestCheckInEndpoints:
+    def test_owner_can_get_token(self, client, db):
+        user = create_user(db, email="user@test.com")
+        reservation = make_reservation(db, user.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.get(f"/reservations/{reservation.id}/checkin-token", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["token"] == create_checkin_token(reservation.id)
+
+    def test_other_user_cannot_get_token(self, client, db):
+        owner = create_user(db, email="owner@test.com")
+        create_user(db, email="other@test.com")
+        reservation = make_reservation(db, owner.id)
+        headers = auth_headers(client, email="other@test.com")
+        resp = client.get(f"/reservations/{reservation.id}/checkin-token", headers=headers)
+        assert resp.status_code == 403
+
+    def test_check_in_then_duplicate_scan(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        reservation = make_reservation(db, admin.id, num_attendees=3, is_paid=False)
+        token = create_checkin_token(reservation.id)
+        headers = auth_headers(client)
+
+        resp = client.post(f"/checkin/{token}", headers=headers)
+        assert resp.status_code == 200
+        first = resp.json()
+        assert first["reservation_id"] == reservation.id
+        assert first["num_attendees"] == 3
+        assert first["is_paid"] is False
+        assert first["already_checked_in"] is False
+
+        resp = client.post(f"/checkin/{token}", headers=headers)
+        assert resp.status_code == 200
+        second = resp.json()
+        assert second["already_checked_in"] is True
+        assert second["checked_in_at"] == first["checked_in_at"]
+
+        resp = client.get(f"/reservations/{reservation.id}", headers=headers)
+        assert resp.json()["checked_in_at"] is not None
+
+    def test_check_in_invalid_token(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        resp = client.post("/checkin/1.invalid", headers=headers)
+        assert resp.status_code == 400
+
+    def test_check_in_unknown_reservation(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        resp = client.post(f"/checkin/{create_checkin_token(9999)}", headers=headers)
+        assert resp.status_code == 404
+
+    def test_check_in_as_user_forbidden(self, client, db):
+        user = create_user(db, email="user@test.com")
+        reservation = make_reservation(db, user.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.post(f"/checkin/{create_checkin_token(reservation.id)}", headers=headers)
+        assert resp.status_code == 403
+
+    def test_manifest_download(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        reservation = make_reservation(db, admin.id, num_attendees=3, is_paid=True)
+        other = Reservation(
+            ticket_type_id=reservation.ticket_type_id, user_id=admin.id, num_attendees=1
+        )
+        db.add(other)
+        db.commit()
+        stage_id = reservation.ticket_type.seat_group.stage_id
+        headers = auth_headers(client)
+        client.post(f"/checkin/{create_checkin_token(other.id)}", headers=headers)
+
+        resp = client.get(f"/stages/{stage_id}/checkin-manifest", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/octet-stream"
+        decoded_stage_id, rows = decode_manifest(resp.content)
+        assert decoded_stage_id == stage_id
+        assert rows == [(reservation.id, 3, STATUS_PAID), (other.id, 1, STATUS_CHECKED_IN)]
+
+        etag = resp.headers["etag"]
+        resp = client.get(
+            f"/stages/{stage_id}/checkin-manifest", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert client.get("/stages/9999/checkin-manifest").status_code == 404
+
+    def test_sync_applies_scans_and_reports_conflicts(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        first = make_reservation(db, admin.id)
+        second = Reservation(ticket_type_id=first.ticket_type_id, user_id=admin.id, num_attendees=1)
+        checked = Reservation(ticket_type_id=first.ticket_type_id, user_id=admin.id, num_attendees=1)
+        db.add_all([second, checked])
+        db.commit()
+        # 別ステージの予約
+        elsewhere = make_reservation(db, admin.id)
+        stage_id = first.ticket_type.seat_group.stage_id
+        headers = auth_headers(client)
+        client.post(f"/checkin/{create_checkin_token(checked.id)}", headers=headers)
+
+        resp = client.post(
+            f"/stages/{stage_id}/checkin-sync",
+            json={
+                "scans": [
+                    {"token": create_checkin_token(first.id), "scanned_at": "2025-06-01T10:05:00Z"},
+                    {"token": create_checkin_token(second.id), "scanned_at": "2025-06-01T10:07:00Z"},
+                    {"token": create_checkin_token(first.id), "scanned_at": "2025-06-01T10:01:00Z"},
+                    {"token": create_checkin_token(checked.id), "scanned_at": "2025-06-01T10:02:00Z"},
+                    {"token": create_checkin_token(elsewhere.id), "scanned_at": "2025-06-01T10:03:00Z"},
+                    {"token": "1.invalid", "scanned_at": "2025-06-01T10:04:00Z"},
+                ]
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["applied"] == sorted([first.id, second.id])
+        reasons = {(c["reservation_id"], c["reason"]) for c in body["conflicts"]}
+        assert reasons == {
+            (first.id, "duplicate_scan"),
+            (checked.id, "already_checked_in"),
+            (elsewhere.id, "not_found"),
+            (None, "invalid_token"),
+        }
+
+        db.expire_all()
+        # 同じ予約の複数スキャンは最も早い日時を採用する
+        assert db.get(Reservation, first.id).checked_in_at == datetime(2025, 6, 1, 10, 1)
+        assert db.get(Reservation, elsewhere.id).checked_in_at is None
+
+    def test_sync_as_user_forbidden(self, client, db):
+        user = create_user(db, email="user@test.com")
+        reservation = make_reservation(db, user.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.post(
+            f"/stages/{reservation.ticket_type.seat_group.stage_id}/checkin-sync",
+            json={"scans": [{"token": create_checkin_token(reservation.id), "scanned_at": "2025-06-01T10:00:00Z"}]},
+            headers=headers,
+        )
+        assert resp.status_code == 403
@@ -0,0 +1,116 @@
+# tests/test_routes_event_duplicate.py
+"""イベント複製エンドポイントのテスト"""
+from datetime import datetime
+
+from models import Event, Stage, SeatGroup, TicketType, Reservation
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def auth_headers(client, email="admin@test.com", password="password123"):
+    """ログインして Cookie をセット"""
+    client.post("/token", data={"username": email, "password": password})
+    return {}
+
+
+def setup_event_tree(db, user_id):
+    """2 ステージ・3 シートグループ・予約ありのイベントを作成"""
+    event = Event(name="元イベント", description="説明")
+    db.add(event)
+    db.commit()
+    stage1 = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 10, 0),
+        end_time=datetime(2025, 6, 1, 12, 0),
+    )
+    stage2 = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 2, 14, 0),
+        end_time=datetime(2025, 6, 2, 16, 0),
+    )
+    db.add_all([stage1, stage2])
+    db.commit()
+    sg1 = SeatGroup(stage_id=stage1.id, name="S席", capacity=7, total_capacity=10)
+    sg2 = SeatGroup(stage_id=stage1.id, name="A席", capacity=20, total_capacity=20)
+    sg3 = SeatGroup(stage_id=stage2.id, name="S席", capacity=5, total_capacity=None)
+    db.add_all([sg1, sg2, sg3])
+    db.commit()
+    tt1 = TicketType(seat_group_id=sg1.id, type_name="一般", price=3000)
+    tt2 = TicketType(seat_group_id=sg1.id, type_name="学生", price=2000)
+    tt3 = TicketType(seat_group_id=sg3.id, type_name="一般", price=2500)
+    db.add_all([tt1, tt2, tt3])
+    db.commit()
+    db.add(Reservation(ticket_type_id=tt1.id, user_id=user_id, num_attendees=3))
+    db.commit()
+    return event
+
+
+class TestDuplicateEvent:
+    def test_duplicate_copies_tree(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        event = setup_event_tree(db, admin.id)
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/events/{event.id}/duplicate", json={"shift_days": 7}, headers=headers
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["id"] != event.id
+        assert data["name"] == "元イベントのコピー"
+        assert data["description"] == "説明"
+        assert [stage["start_time"] for stage in data["stages"]] == [
+            "2025-06-08T10:00:00",
+            "2025-06-09T14:00:00",
+        ]
+        first, second = data["stages"]
+        assert [sg["name"] for sg in first["seat_groups"]] == ["S席", "A席"]
+        # 残席数は総定員に戻る
+        assert first["seat_groups"][0]["capacity"] == 10
+        assert first["seat_groups"][0]["total_capacity"] == 10
+        assert second["seat_groups"][0]["capacity"] == 5
+        assert second["seat_groups"][0]["total_capacity"] == 5
+        assert [tt["type_name"] for tt in first["seat_groups"][0]["ticket_types"]] == [
+            "一般",
+            "学生",
+        ]
+        assert first["seat_groups"][1]["ticket_types"] == []
+        assert second["seat_groups"][0]["ticket_types"][0]["price"] == 2500
+        # 予約は複製されない
+        assert db.query(Reservation).count() == 1
+        assert db.query(Stage).filter(Stage.event_id == data["id"]).count() == 2
+
+    def test_duplicate_with_name(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        event = setup_event_tree(db, admin.id)
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/events/{event.id}/duplicate", json={"name": "再演"}, headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.json()["name"] == "再演"
+        assert resp.json()["stages"][0]["start_time"] == "2025-06-01T10:00:00"
+
+    def test_duplicate_event_without_stages(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        event = Event(name="空イベント", description="説明")
+        db.add(event)
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.post(f"/events/{event.id}/duplicate", json={}, headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["stages"] == []
+
+    def test_duplicate_event_not_found(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        resp = client.post("/events/9999/duplicate", json={}, headers=headers)
+        assert resp.status_code == 404
+
+    def test_duplicate_event_as_user_forbidden(self, client, db):
+        user = create_user(db, email="user@test.com")
+        event = setup_event_tree(db, user.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.post(f"/events/{event.id}/duplicate", json={}, headers=headers)
+        assert resp.status_code == 403
@@ -0,0 +1,121 @@
+# tests/test_routes_export.py
+"""CSV エクスポートエンドポイントのテスト"""
+import csv
+import io
+from datetime import datetime
+
+from models import Event, Stage, SeatGroup, TicketType, Reservation
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def auth_headers(client, email="admin@test.com", password="password123"):
+    """ログインして Cookie をセット"""
+    client.post("/token", data={"username": email, "password": password})
+    return {}
+
+
+def read_csv(resp):
+    """レスポンスを BOM を除いて行リストに変換"""
+    text = resp.content.decode("utf-8-sig")
+    return list(csv.reader(io.StringIO(text)))
+
+
+def setup_reservations(db, user_ids):
+    """1 ステージに予約を作成"""
+    event = Event(name="イベント", description="説明")
+    db.add(event)
+    db.commit()
+    stage = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 10, 0),
+        end_time=datetime(2025, 6, 1, 12, 0),
+    )
+    db.add(stage)
+    db.commit()
+    sg = SeatGroup(stage_id=stage.id, name="S席", capacity=10)
+    db.add(sg)
+    db.commit()
+    tt = TicketType(seat_group_id=sg.id, type_name="一般", price=3000)
+    db.add(tt)
+    db.commit()
+    for i, user_id in enumerate(user_ids):
+        db.add(
+            Reservation(
+                ticket_type_id=tt.id,
+                user_id=user_id,
+                num_attendees=i + 1,
+                is_paid=i % 2 == 0,
+            )
+        )
+    db.commit()
+    return event, stage
+
+
+class TestCsvExport:
+    def test_event_reservations_csv(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True, nickname="管理者")
+        user = create_user(db, email="user@test.com", nickname="=HYPERLINK()")
+        event, stage = setup_reservations(db, [admin.id, user.id])
+        headers = auth_headers(client)
+        resp = client.get(f"/events/{event.id}/reservations.csv", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert "attachment" in resp.headers["content-disposition"]
+        rows = read_csv(resp)
+        assert rows[0][0] == "reservation_id"
+        assert len(rows) == 3
+        header = rows[0]
+        first = dict(zip(header, rows[1]))
+        second = dict(zip(header, rows[2]))
+        assert first["nickname"] == "管理者"
+        assert first["email"] == "admin@test.com"
+        assert first["seat_group"] == "S席"
+        assert first["amount"] == "3000.0"
+        assert first["is_paid"] == "True"
+        assert second["num_attendees"] == "2"
+        assert second["amount"] == "6000.0"
+        # 数式として解釈される値はエスケープされる
+        assert second["nickname"] == "'=HYPERLINK()"
+
+    def test_stage_attendees_csv(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com", nickname="ゲスト")
+        event, stage = setup_reservations(db, [user.id, admin.id])
+        headers = auth_headers(client)
+        resp = client.get(f"/stages/{stage.id}/attendees.csv", headers=headers)
+        assert resp.status_code == 200
+        rows = read_csv(resp)
+        assert rows[0] == [
+            "reservation_id",
+            "nickname",
+            "email",
+            "seat_group",
+            "ticket_type",
+            "num_attendees",
+            "is_paid",
+        ]
+        assert rows[1][1:] == ["ゲスト", "user@test.com", "S席", "一般", "1", "True"]
+
+    def test_csv_empty(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        event, stage = setup_reservations(db, [])
+        headers = auth_headers(client)
+        resp = client.get(f"/events/{event.id}/reservations.csv", headers=headers)
+        assert resp.status_code == 200
+        assert len(read_csv(resp)) == 1
+
+    def test_csv_not_found(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        assert client.get("/events/9999/reservations.csv", headers=headers).status_code == 404
+        assert client.get("/stages/9999/attendees.csv", headers=headers).status_code == 404
+
+    def test_csv_as_user_forbidden(self, client, db):
+        user = create_user(db, email="user@test.com")
+        event, stage = setup_reservations(db, [user.id])
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.get(f"/events/{event.id}/reservations.csv", headers=headers)
+        assert resp.status_code == 403
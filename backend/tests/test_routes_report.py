@@ -0,0 +1,109 @@
+# tests/test_routes_report.py
+"""売上レポートエンドポイントのテスト"""
+from datetime import datetime
+
+from models import Event, Stage, SeatGroup, TicketType, Reservation
+from tests.helpers import create_user
+
+
+# --- ヘルパー関数 ---
+
+
+def auth_headers(client, email="admin@test.com", password="password123"):
+    """ログインして Cookie をセット"""
+    client.post("/token", data={"username": email, "password": password})
+    return {}
+
+
+def setup_sales(db, user_id):
+    """2 ステージ分の予約を作成"""
+    event = Event(name="イベント", description="説明")
+    db.add(event)
+    db.commit()
+    stage1 = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 10, 0),
+        end_time=datetime(2025, 6, 1, 12, 0),
+    )
+    stage2 = Stage(
+        event_id=event.id,
+        start_time=datetime(2025, 6, 1, 14, 0),
+        end_time=datetime(2025, 6, 1, 16, 0),
+    )
+    db.add_all([stage1, stage2])
+    db.commit()
+    sg1 = SeatGroup(stage_id=stage1.id, name="S席", capacity=10)
+    sg2 = SeatGroup(stage_id=stage2.id, name="S席", capacity=10)
+    db.add_all([sg1, sg2])
+    db.commit()
+    general = TicketType(seat_group_id=sg1.id, type_name="一般", price=3000)
+    student = TicketType(seat_group_id=sg1.id, type_name="学生", price=2000)
+    unsold = TicketType(seat_group_id=sg2.id, type_name="一般", price=3000)
+    db.add_all([general, student, unsold])
+    db.commit()
+    db.add_all(
+        [
+            Reservation(ticket_type_id=general.id, user_id=user_id, num_attendees=2, is_paid=True),
+            Reservation(ticket_type_id=general.id, user_id=user_id, num_attendees=1, is_paid=False),
+            Reservation(ticket_type_id=student.id, user_id=user_id, num_attendees=3, is_paid=True),
+        ]
+    )
+    db.commit()
+    return event, stage1, stage2, general, student, unsold
+
+
+class TestEventReport:
+    def test_event_report(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        event, stage1, stage2, general, student, unsold = setup_sales(db, admin.id)
+        headers = auth_headers(client)
+        resp = client.get(f"/events/{event.id}/report", headers=headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["event_id"] == event.id
+        assert data["reservations"] == 3
+        assert data["attendees"] == 6
+        assert data["revenue"] == 15000
+        assert data["paid_revenue"] == 12000
+        assert data["unpaid_revenue"] == 3000
+        assert data["paid_reservations"] == 2
+        assert data["unpaid_attendees"] == 1
+
+        first, second = data["stages"]
+        assert first["stage_id"] == stage1.id
+        assert first["revenue"] == 15000
+        tickets = first["seat_groups"][0]["ticket_types"]
+        assert [t["ticket_type_id"] for t in tickets] == [general.id, student.id]
+        assert tickets[0]["revenue"] == 9000
+        assert tickets[0]["paid_attendees"] == 2
+        assert tickets[0]["unpaid_attendees"] == 1
+        assert tickets[1]["revenue"] == 6000
+
+        # 予約の無いチケットタイプも 0 件で含まれる
+        assert second["revenue"] == 0
+        assert second["seat_groups"][0]["ticket_types"][0]["ticket_type_id"] == unsold.id
+        assert second["seat_groups"][0]["ticket_types"][0]["reservations"] == 0
+
+    def test_event_report_without_stages(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        event = Event(name="空", description="説明")
+        db.add(event)
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.get(f"/events/{event.id}/report", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["stages"] == []
+        assert resp.json()["revenue"] == 0
+
+    def test_event_report_not_found(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        resp = client.get("/events/9999/report", headers=headers)
+        assert resp.status_code == 404
+
+    def test_event_report_as_user_forbidden(self, client, db):
+        user = create_user(db, email="user@test.com")
+        event, *_ = setup_sales(db, user.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.get(f"/events/{event.id}/report", headers=headers)
+        assert resp.status_code == 403
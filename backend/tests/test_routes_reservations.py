@@ -245,3 +245,192 @@ class TestReservationEndpoints:
         headers = auth_headers(client, email="nf@test.com")
         resp = client.get("/reservations/9999", headers=headers)
         assert resp.status_code == 404
+
+
+class TestReservationQuery:
+    """予約検索エンドポイントのテスト"""
+
+    def setup_reservations(self, db, admin_id, user_id):
+        """2 ステージに作成日時の異なる予約を作成"""
+        event, stage, sg, tt = setup_full_chain(db)
+        other_stage = make_stage(db, event.id, start_hour=14, end_hour=16)
+        other_sg = make_seat_group(db, other_stage.id)
+        other_tt = make_ticket_type(db, other_sg.id)
+        rows = [
+            (tt.id, admin_id, True, datetime(2025, 5, 1, 9, 0)),
+            (tt.id, user_id, False, datetime(2025, 5, 2, 9, 0)),
+            (other_tt.id, user_id, True, datetime(2025, 5, 3, 9, 0)),
+            (tt.id, user_id, True, datetime(2025, 5, 4, 9, 0)),
+        ]
+        reservations = []
+        for ticket_type_id, owner_id, is_paid, created_at in rows:
+            reservation = Reservation(
+                ticket_type_id=ticket_type_id,
+                user_id=owner_id,
+                num_attendees=1,
+                is_paid=is_paid,
+                created_at=created_at,
+            )
+            db.add(reservation)
+            reservations.append(reservation)
+        db.commit()
+        return event, stage, [r.id for r in reservations]
+
+    def test_query_filters(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com")
+        event, stage, ids = self.setup_reservations(db, admin.id, user.id)
+        headers = auth_headers(client)
+
+        def query(**params):
+            resp = client.get("/reservations/query", params=params, headers=headers)
+            assert resp.status_code == 200
+            return [r["id"] for r in resp.json()["items"]]
+
+        assert query(event_id=event.id) == [ids[3], ids[2], ids[1], ids[0]]
+        assert query(stage_id=stage.id, order="created_at") == [ids[0], ids[1], ids[3]]
+        assert query(stage_id=stage.id, user_id=user.id, is_paid=True) == [ids[3]]
+        assert query(
+            created_from="2025-05-02T00:00:00", created_to="2025-05-04T00:00:00"
+        ) == [ids[2], ids[1]]
+        assert query(event_id=event.id + 1) == []
+
+    def test_query_unpaid_includes_null(self, client, db):
+        """is_paid が NULL の予約は未払いとして絞り込まれる"""
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com")
+        event, _, ids = self.setup_reservations(db, admin.id, user.id)
+        reservation = db.get(Reservation, ids[3])
+        reservation.is_paid = None
+        db.commit()
+        headers = auth_headers(client)
+
+        def query(**params):
+            resp = client.get("/reservations/query", params=params, headers=headers)
+            assert resp.status_code == 200
+            return [r["id"] for r in resp.json()["items"]]
+
+        assert query(event_id=event.id, is_paid=False) == [ids[3], ids[1]]
+        assert query(event_id=event.id, is_paid=True) == [ids[2], ids[0]]
+
+    def test_query_keyset_pagination(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com")
+        _, _, ids = self.setup_reservations(db, admin.id, user.id)
+        headers = auth_headers(client)
+        seen = []
+        params = {"limit": 3, "order": "-created_at"}
+        while True:
+            body = client.get("/reservations/query", params=params, headers=headers).json()
+            seen.extend(r["id"] for r in body["items"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        assert seen == list(reversed(ids))
+
+    def test_query_invalid_cursor(self, client, db):
+        create_user(db, email="admin@test.com", is_admin=True)
+        headers = auth_headers(client)
+        resp = client.get("/reservations/query", params={"cursor": "!!"}, headers=headers)
+        assert resp.status_code == 400
+
+    def test_query_as_user_forbidden(self, client, db):
+        create_user(db, email="user@test.com")
+        headers = auth_headers(client, email="user@test.com")
+        assert client.get("/reservations/query", headers=headers).status_code == 403
+
+
+class TestReservationDetails:
+    """予約詳細エンドポイントのテスト"""
+
+    def test_user_reservation_details(self, client, db):
+        user = create_user(db, email="user@test.com", nickname="ゲスト")
+        event, stage, sg, tt = setup_full_chain(db)
+        db.add(Reservation(ticket_type_id=tt.id, user_id=user.id, num_attendees=2, is_paid=True))
+        db.commit()
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.get(f"/users/{user.id}/reservations/detailed", headers=headers)
+        assert resp.status_code == 200
+        [detail] = resp.json()
+        assert detail["num_attendees"] == 2
+        assert detail["is_paid"] is True
+        assert detail["event"] == {"id": event.id, "name": "テストイベント"}
+        assert detail["stage"]["id"] == stage.id
+        assert detail["stage"]["start_time"] == "2025-06-01T10:00:00"
+        assert detail["seat_group"]["id"] == sg.id
+        assert detail["ticket_type"] == {"id": tt.id, "type_name": "一般", "price": 1000.0}
+        assert detail["user"] == {"id": user.id, "nickname": "ゲスト", "email": "user@test.com"}
+
+    def test_user_reservation_details_other_forbidden(self, client, db):
+        owner = create_user(db, email="owner@test.com")
+        create_user(db, email="other@test.com")
+        headers = auth_headers(client, email="other@test.com")
+        resp = client.get(f"/users/{owner.id}/reservations/detailed", headers=headers)
+        assert resp.status_code == 403
+
+    def test_admin_reservation_details(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        user = create_user(db, email="user@test.com")
+        event, stage, sg, tt = setup_full_chain(db)
+        for owner_id in (admin.id, user.id, user.id):
+            db.add(Reservation(ticket_type_id=tt.id, user_id=owner_id, num_attendees=1))
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.get(
+            "/reservations/detailed",
+            params={"event_id": event.id, "user_id": user.id, "order": "id", "limit": 1},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["items"]) == 1
+        assert body["items"][0]["user"]["email"] == "user@test.com"
+        resp = client.get(
+            "/reservations/detailed",
+            params={"event_id": event.id, "user_id": user.id, "order": "id", "cursor": body["next_cursor"]},
+            headers=headers,
+        )
+        body = resp.json()
+        assert len(body["items"]) == 1
+        assert body["next_cursor"] is None
+
+    def test_admin_reservation_details_as_user_forbidden(self, client, db):
+        create_user(db, email="user@test.com")
+        headers = auth_headers(client, email="user@test.com")
+        assert client.get("/reservations/detailed", headers=headers).status_code == 403
+
+
+class TestReservationPaidBulkUpdate:
+    """支払状況一括更新のテスト"""
+
+    def test_bulk_update_paid(self, client, db):
+        admin = create_user(db, email="admin@test.com", is_admin=True)
+        _, _, sg, tt = setup_full_chain(db)
+        reservations = [
+            Reservation(ticket_type_id=tt.id, user_id=admin.id, num_attendees=2, is_paid=False)
+            for _ in range(3)
+        ]
+        db.add_all(reservations)
+        db.commit()
+        ids = [r.id for r in reservations]
+        headers = auth_headers(client)
+        resp = client.post(
+            "/reservations/paid",
+            json={"reservation_ids": [ids[0], ids[2], ids[0], 9999], "is_paid": True},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert resp.json()["updated_ids"] == [ids[0], ids[2]]
+        db.expire_all()
+        assert [db.get(Reservation, i).is_paid for i in ids] == [True, False, True]
+        # 残席数は変わらない
+        db.refresh(sg)
+        assert sg.capacity == 10
+
+    def test_bulk_update_paid_as_user_forbidden(self, client, db):
+        create_user(db, email="user@test.com")
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.post(
+            "/reservations/paid", json={"reservation_ids": [1], "is_paid": True}, headers=headers
+        )
+        assert resp.status_code == 403
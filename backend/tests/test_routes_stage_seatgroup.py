@@ -240,6 +240,115 @@ class TestSeatGroupEndpoints:
         assert resp.status_code == 204
 
 
+class TestSeatGroupCapacityAdjustment:
+    """残席数一括調整エンドポイントのテスト"""
+
+    def test_adjust_by_delta_preserves_sold(self, client, db):
+        make_user(db, is_admin=True)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg1 = SeatGroup(stage_id=stage.id, capacity=6, total_capacity=10)
+        sg2 = make_seat_group(db, stage.id, capacity=5)
+        db.add(sg1)
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/stages/{stage.id}/seat_groups/capacity",
+            json={
+                "adjustments": [
+                    {"seat_group_id": sg1.id, "delta": 5},
+                    {"seat_group_id": sg2.id, "delta": -2},
+                ]
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        data = {sg["id"]: sg for sg in resp.json()}
+        assert (data[sg1.id]["capacity"], data[sg1.id]["total_capacity"]) == (11, 15)
+        assert (data[sg2.id]["capacity"], data[sg2.id]["total_capacity"]) == (3, 3)
+
+    def test_adjust_by_total_capacity(self, client, db):
+        make_user(db, is_admin=True)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg = SeatGroup(stage_id=stage.id, capacity=6, total_capacity=10)
+        db.add(sg)
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/stages/{stage.id}/seat_groups/capacity",
+            json={"adjustments": [{"seat_group_id": sg.id, "total_capacity": 8}]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert resp.json()[0]["capacity"] == 4
+        assert resp.json()[0]["total_capacity"] == 8
+
+    def test_adjust_below_sold_is_rejected(self, client, db):
+        make_user(db, is_admin=True)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg1 = SeatGroup(stage_id=stage.id, capacity=2, total_capacity=10)
+        sg2 = SeatGroup(stage_id=stage.id, capacity=5, total_capacity=5)
+        db.add_all([sg1, sg2])
+        db.commit()
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/stages/{stage.id}/seat_groups/capacity",
+            json={
+                "adjustments": [
+                    {"seat_group_id": sg2.id, "delta": 1},
+                    {"seat_group_id": sg1.id, "total_capacity": 7},
+                ]
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 400
+        # どちらも変更されない
+        resp = client.get(f"/stages/{stage.id}/seat_groups")
+        assert sorted(sg["capacity"] for sg in resp.json()) == [2, 5]
+
+    def test_adjust_seat_group_of_other_stage(self, client, db):
+        make_user(db, is_admin=True)
+        event = make_event(db)
+        stage1 = make_stage(db, event.id, start_hour=10)
+        stage2 = make_stage(db, event.id, start_hour=14)
+        sg = make_seat_group(db, stage2.id)
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/stages/{stage1.id}/seat_groups/capacity",
+            json={"adjustments": [{"seat_group_id": sg.id, "delta": 1}]},
+            headers=headers,
+        )
+        assert resp.status_code == 404
+
+    def test_adjust_requires_delta_or_total(self, client, db):
+        make_user(db, is_admin=True)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg = make_seat_group(db, stage.id)
+        headers = auth_headers(client)
+        resp = client.post(
+            f"/stages/{stage.id}/seat_groups/capacity",
+            json={"adjustments": [{"seat_group_id": sg.id, "delta": 1, "total_capacity": 3}]},
+            headers=headers,
+        )
+        assert resp.status_code == 422
+
+    def test_adjust_as_user_forbidden(self, client, db):
+        make_user(db, email="user@test.com", is_admin=False)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg = make_seat_group(db, stage.id)
+        headers = auth_headers(client, email="user@test.com")
+        resp = client.post(
+            f"/stages/{stage.id}/seat_groups/capacity",
+            json={"adjustments": [{"seat_group_id": sg.id, "delta": 1}]},
+            headers=headers,
+        )
+        assert resp.status_code == 403
+
+
 class TestTicketTypeEndpoints:
     """チケット種別エンドポイントのテスト"""
 
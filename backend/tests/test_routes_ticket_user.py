@@ -2,7 +2,7 @@
 """チケットタイプ・ユーザーエンドポイントのテスト"""
 import pytest
 from datetime import datetime
-from models import User, Event, Stage, SeatGroup, TicketType
+from models import User, Event, Stage, SeatGroup, TicketType, Reservation
 from security import hash_password
 
 
@@ -268,3 +268,123 @@ class TestUserEndpoints:
         # 残席10に復帰
         sg_resp = client.get(f"/seat_groups/{sg.id}")
         assert sg_resp.json()["capacity"] == 10
+
+    def test_delete_user_restores_capacity_per_seat_group(self, client, db):
+        make_user(db, email="dcadm@test.com", is_admin=True)
+        user = make_user(db, email="dcusr@test.com", is_admin=False)
+        other = make_user(db, email="other@test.com", is_admin=False)
+        event = make_event(db)
+        stage = make_stage(db, event.id)
+        sg1 = make_seat_group(db, stage.id, capacity=4)
+        sg2 = make_seat_group(db, stage.id, capacity=8)
+        tt1a = make_ticket_type(db, sg1.id, type_name="一般")
+        tt1b = make_ticket_type(db, sg1.id, type_name="学生")
+        tt2 = make_ticket_type(db, sg2.id)
+        db.add_all(
+            [
+                Reservation(ticket_type_id=tt1a.id, user_id=user.id, num_attendees=2),
+                Reservation(ticket_type_id=tt1b.id, user_id=user.id, num_attendees=3),
+                Reservation(ticket_type_id=tt2.id, user_id=user.id, num_attendees=1),
+                Reservation(ticket_type_id=tt2.id, user_id=other.id, num_attendees=2),
+            ]
+        )
+        db.commit()
+        user_id, other_id = user.id, other.id
+        headers = auth_headers(client, email="dcadm@test.com")
+        resp = client.delete(f"/users/{user_id}", headers=headers)
+        assert resp.status_code == 204
+        assert client.get(f"/seat_groups/{sg1.id}").json()["capacity"] == 9
+        assert client.get(f"/seat_groups/{sg2.id}").json()["capacity"] == 9
+        db.expire_all()
+        assert db.query(Reservation).filter(Reservation.user_id == user_id).count() == 0
+        assert db.query(Reservation).filter(Reservation.user_id == other_id).count() == 1
+        assert db.query(User).filter(User.id == user_id).first() is None
+
+    def test_bulk_delete_users(self, client, db):
+        make_user(db, email="bdadm@test.com", is_admin=True)
+        user1 = make_user(db, email="bd1@test.com", is_admin=False)
+        user2 = make_user(db, email="bd2@test.com", is_admin=False)
+        _, _, sg, tt = setup_full_chain(db)
+        db.add_all(
+            [
+                Reservation(ticket_type_id=tt.id, user_id=user1.id, num_attendees=2),
+                Reservation(ticket_type_id=tt.id, user_id=user2.id, num_attendees=3),
+            ]
+        )
+        db.commit()
+        headers = auth_headers(client, email="bdadm@test.com")
+        resp = client.post(
+            "/users/bulk_delete",
+            json={"user_ids": [user2.id, user1.id]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {"deleted_user_ids": sorted([user1.id, user2.id])}
+        assert client.get(f"/seat_groups/{sg.id}").json()["capacity"] == 15
+        db.expire_all()
+        assert db.query(Reservation).count() == 0
+
+    def test_bulk_delete_rejects_admin(self, client, db):
+        admin = make_user(db, email="bdadm@test.com", is_admin=True)
+        user = make_user(db, email="bd1@test.com", is_admin=False)
+        headers = auth_headers(client, email="bdadm@test.com")
+        resp = client.post(
+            "/users/bulk_delete",
+            json={"user_ids": [user.id, admin.id]},
+            headers=headers,
+        )
+        assert resp.status_code == 400
+        db.expire_all()
+        assert db.query(User).count() == 2
+
+    def test_bulk_delete_unknown_user(self, client, db):
+        make_user(db, email="bdadm@test.com", is_admin=True)
+        headers = auth_headers(client, email="bdadm@test.com")
+        resp = client.post("/users/bulk_delete", json={"user_ids": [9999]}, headers=headers)
+        assert resp.status_code == 404
+
+    def test_bulk_delete_as_user_forbidden(self, client, db):
+        user = make_user(db, email="bd1@test.com", is_admin=False)
+        headers = auth_headers(client, email="bd1@test.com")
+        resp = client.post("/users/bulk_delete", json={"user_ids": [user.id]}, headers=headers)
+        assert resp.status_code == 403
+
+
+class TestUserSearch:
+    """ユーザー検索のテスト"""
+
+    def test_search_prefix_first_case_insensitive(self, client, db):
+        make_user(db, email="adm@test.com", is_admin=True)
+        make_user(db, email="xsato@test.com", is_admin=False)
+        make_user(db, email="Sato@test.com", is_admin=False)
+        make_user(db, email="other@test.com", is_admin=False)
+        headers = auth_headers(client, email="adm@test.com")
+        resp = client.get("/users/search", params={"q": "SATO"}, headers=headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [u["email"] for u in body["items"]] == ["Sato@test.com", "xsato@test.com"]
+        assert body["next_offset"] is None
+
+    def test_search_pagination_and_wildcards(self, client, db):
+        make_user(db, email="adm@test.com", is_admin=True)
+        for i in range(3):
+            make_user(db, email=f"user{i}@test.com", is_admin=False)
+        make_user(db, email="per%cent@test.com", is_admin=False)
+        headers = auth_headers(client, email="adm@test.com")
+        resp = client.get("/users/search", params={"q": "user", "limit": 2}, headers=headers)
+        body = resp.json()
+        assert [u["email"] for u in body["items"]] == ["user0@test.com", "user1@test.com"]
+        assert body["next_offset"] == 2
+        resp = client.get(
+            "/users/search", params={"q": "user", "limit": 2, "offset": 2}, headers=headers
+        )
+        assert [u["email"] for u in resp.json()["items"]] == ["user2@test.com"]
+        # LIKE のワイルドカードは文字として扱う
+        resp = client.get("/users/search", params={"q": "%"}, headers=headers)
+        assert [u["email"] for u in resp.json()["items"]] == ["per%cent@test.com"]
+
+    def test_search_as_user_forbidden(self, client, db):
+        make_user(db, email="usr@test.com", is_admin=False)
+        headers = auth_headers(client, email="usr@test.com")
+        resp = client.get("/users/search", params={"q": "a"}, headers=headers)
+        assert resp.status_code == 403
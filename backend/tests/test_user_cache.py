@@ -0,0 +1,88 @@
+# tests/test_user_cache.py
+"""認証ユーザーキャッシュのテスト"""
+from unittest.mock import patch
+
+from schemas import UserResponse
+from tests.helpers import create_user
+from user_cache import UserCache, user_cache
+
+
+def login(client, email="auth@example.com", password="password123"):
+    """ログインして Cookie をセット"""
+    return client.post("/token", data={"username": email, "password": password})
+
+
+def make_response(user_id):
+    return UserResponse(id=user_id, email=f"u{user_id}@example.com", nickname=None, is_admin=False)
+
+
+class TestUserCache:
+    def test_lru_eviction(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.put(make_response(1))
+        cache.put(make_response(2))
+        assert cache.get(1) is not None
+        cache.put(make_response(3))
+        # 最も長く使われていない 2 が捨てられる
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+        assert cache.get(3) is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 3
+        assert stats["misses"] == 1
+
+    def test_ttl_expiry(self):
+        cache = UserCache(max_size=10, ttl=5)
+        with patch("user_cache.time.monotonic", return_value=100.0):
+            cache.put(make_response(1))
+        with patch("user_cache.time.monotonic", return_value=104.0):
+            assert cache.get(1) is not None
+        with patch("user_cache.time.monotonic", return_value=105.0):
+            assert cache.get(1) is None
+        assert cache.stats()["size"] == 0
+
+    def test_disabled(self):
+        cache = UserCache(max_size=10, ttl=0)
+        cache.put(make_response(1))
+        assert cache.get(1) is None
+
+
+class TestCurrentUserCache:
+    def test_authenticated_reads_use_cache(self, client, db):
+        user = create_user(db)
+        login(client)
+        assert client.get("/users/me").status_code == 200
+        with patch("routes.auth.CrudUser.read_by_id") as read_by_id:
+            resp = client.get("/users/me")
+        assert resp.status_code == 200
+        assert resp.json()["id"] == user.id
+        read_by_id.assert_not_called()
+
+    def test_update_invalidates_cache(self, client, db):
+        create_user(db, nickname="before")
+        login(client)
+        me = client.get("/users/me").json()
+        resp = client.put(f"/users/{me['id']}", json={"nickname": "after"})
+        assert resp.status_code == 200
+        assert client.get("/users/me").json()["nickname"] == "after"
+
+    def test_delete_invalidates_cache(self, client, db):
+        create_user(db, email="admin@example.com", is_admin=True)
+        user = create_user(db, email="user@example.com")
+        login(client, email="user@example.com")
+        assert client.get("/users/me").status_code == 200
+        assert user_cache.get(user.id) is not None
+        login(client, email="admin@example.com")
+        assert client.delete(f"/users/{user.id}").status_code == 204
+        assert user_cache.get(user.id) is None
+
+    def test_metrics_endpoint(self, client, db):
+        create_user(db, email="admin@example.com", is_admin=True)
+        login(client, email="admin@example.com")
+        client.get("/users/me")
+        resp = client.get("/admin/metrics")
+        assert resp.status_code == 200
+        stats = resp.json()["user_cache"]
+        assert stats["hits"] >= 1
+        assert stats["size"] == 1
@@ -0,0 +1,119 @@
+# backend/token_revocation.py
+"""アクセストークンの無効化リスト。
+
+無効化は revoked_tokens テーブルに書き込み、各ワーカーはその内容をメモリ上の
+dict に持つ。リクエストごとの判定は dict の参照だけで、DB は読まない。
+テーブルは TOKEN_REVOCATION_REFRESH_INTERVAL 秒に 1 回だけ、前回読んだ id より
+後の行を差分で読み込む。そのため他のワーカーでの無効化は最大でその秒数だけ遅れて
+反映される（無効化したワーカー自身には即時に反映する）。
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from config import TOKEN_REVOCATION_REFRESH_INTERVAL
+from crud.revoked_token import CrudRevokedToken
+
+# 差分読み込みで前回の位置から遡って読み直す件数
+# 採番後にコミットが遅れた行（id の小さい行が後から見える）を取りこぼさないため
+REFRESH_OVERLAP = 100
+
+
+def _timestamp(value: datetime) -> float:
+    # DB の日時はタイムゾーンなしの UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TokenRevocationList:
+    def __init__(self, refresh_interval: float = TOKEN_REVOCATION_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        # jti -> トークンの有効期限（UNIX 時刻）
+        self._tokens: dict[str, float] = {}
+        # user_id -> (この時刻より前に発行されたトークンは無効, 行の有効期限)
+        self._users: dict[int, tuple[float, float]] = {}
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def is_revoked(self, jti: str | None, user_id: int, issued_at: float | None) -> bool:
+        if jti is not None and jti in self._tokens:
+            return True
+        cutoff = self._users.get(user_id)
+        # iat のない古いトークンは、ユーザー単位の無効化があれば無効とみなす
+        return cutoff is not None and (issued_at is None or issued_at < cutoff[0])
+
+    def add_token(self, jti: str, expires_at: datetime) -> None:
+        self._tokens[jti] = _timestamp(expires_at)
+
+    def add_user(self, user_id: int, revoked_at: datetime, expires_at: datetime) -> None:
+        # iat は小数の UNIX 時刻なので、無効化の時刻もそのままの精度で比べる
+        # （秒単位の iat を持つ以前のトークンは切り捨てられている分、無効とみなされる側に倒れる）
+        cutoff = _timestamp(revoked_at)
+        current = self._users.get(user_id)
+        if current is None or current[0] < cutoff:
+            self._users[user_id] = (cutoff, _timestamp(expires_at))
+
+    def refresh_if_due(self, db: Session) -> None:
+        """前回の読み込みから refresh_interval 秒以上経っていれば差分を読み込む。"""
+        if time.monotonic() < self._next_refresh:
+            return
+        # 他のスレッドが読み込み中なら、その結果を待たずに現在の内容で判定する
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() >= self._next_refresh:
+                self._refresh(db)
+        finally:
+            self._lock.release()
+
+    def refresh(self, db: Session) -> None:
+        with self._lock:
+            self._refresh(db)
+
+    def _refresh(self, db: Session) -> None:
+        rows = CrudRevokedToken(db).read_after(max(0, self._last_id - REFRESH_OVERLAP))
+        for row in rows:
+            if row.jti is not None:
+                self.add_token(row.jti, row.expires_at)
+            elif row.user_id is not None:
+                self.add_user(row.user_id, row.revoked_at, row.expires_at)
+            self._last_id = max(self._last_id, row.id)
+        self._prune(time.time())
+        self.refreshes += 1
+        self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def _prune(self, now: float) -> None:
+        # 失効済みのトークンは署名の検証で弾かれるため、リストから外してよい
+        # 判定側はロックを取らないので、dict は作り直して差し替える
+        if any(expires_at <= now for expires_at in self._tokens.values()):
+            self._tokens = {
+                jti: expires_at for jti, expires_at in self._tokens.items() if expires_at > now
+            }
+        if any(expires_at <= now for _, expires_at in self._users.values()):
+            self._users = {
+                user_id: entry for user_id, entry in self._users.items() if entry[1] > now
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens = {}
+            self._users = {}
+            self._last_id = 0
+            self._next_refresh = 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "last_id": self._last_id,
+            "refreshes": self.refreshes,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+revocation_list = TokenRevocationList()
@@ -0,0 +1,80 @@
+# backend/user_cache.py
+"""認証済みユーザーのプロセス内キャッシュ。
+
+get_current_user は毎リクエストで users テーブルを読むため、UserResponse を
+ユーザーID単位で USER_CACHE_TTL 秒だけ保持する。件数が USER_CACHE_MAX_SIZE を
+超えたら最も長く使われていないものから捨てる（LRU）。
+
+ユーザーを更新・削除する CRUD は commit 後に invalidate() を呼ぶ。キャッシュは
+プロセスごとなので、他のワーカーの古いエントリは TTL が切れるまで残る。
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL
+from schemas import UserResponse
+
+
+class UserCache:
+    """TTL 付きの LRU キャッシュ。同期ルートのスレッドから同時に使われるためロックで守る。"""
+
+    def __init__(self, max_size: int = USER_CACHE_MAX_SIZE, ttl: float = USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, UserResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, user_id: int) -> UserResponse | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: UserResponse) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *user_ids: int) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache()